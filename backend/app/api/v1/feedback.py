@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, File, UploadFile, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import json
@@ -8,7 +8,7 @@ from pathlib import Path
 import logging
 from fastapi.responses import FileResponse
 from app.core.database import get_db
-from app.services.feedback_service import FeedbackService
+from app.services.feedback_service import FeedbackService, encode_feedback_cursor, decode_feedback_cursor
 from app.schemas.feedback import (
     FeedbackCreate, FeedbackResponse, FeedbackDetail, FeedbackList, 
     FeedbackStats, FeedbackStatusUpdate, FileUploadResponse
@@ -66,6 +66,7 @@ async def save_uploaded_file(file: UploadFile) -> dict:
 
 @router.post("/feedback", response_model=FeedbackResponse)
 async def submit_feedback(
+    background_tasks: BackgroundTasks,
     # Form data fields
     type: str = Form(...),
     severity: Optional[str] = Form("Medium"),
@@ -113,6 +114,7 @@ async def submit_feedback(
         feedback_service = FeedbackService(db)
         feedback = feedback_service.create_feedback(
             feedback_data, 
+            background_tasks,
             user_id=current_user.id if current_user else None
         )
         
@@ -167,14 +169,22 @@ async def list_feedback(
     per_page: int = 20,
     status: Optional[str] = None,
     feedback_type: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)  # Require authentication
 ):
-    """List feedback - requires authentication"""
+    """List feedback - requires authentication. Use next_cursor from the response to page forward."""
     feedback_service = FeedbackService(db)
     
+    after = None
+    if cursor:
+        try:
+            after = decode_feedback_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     # For now, return user's own feedback. In production, add admin role check
-    feedback_list = feedback_service.get_user_feedback(current_user.id, limit=per_page)
+    feedback_list = feedback_service.get_user_feedback(current_user.id, limit=per_page, after=after)
     
     # Convert to response format
     items = []
@@ -204,7 +214,8 @@ async def list_feedback(
         items=items,
         total=len(items),
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        next_cursor=encode_feedback_cursor(feedback_list[-1]) if feedback_list and len(feedback_list) == per_page else None
     )
 
 @router.get("/feedback/stats", response_model=FeedbackStats)
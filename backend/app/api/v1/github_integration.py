@@ -262,8 +262,9 @@ async def fetch_file_content(
                 detail="Repository not found"
             )
         
-        # Parse owner/repo
-        owner, repo_name = repository.full_name.split("/")
+        # owner_login is NULL on rows add_repository_owner_login.py has not backfilled yet
+        owner = repository.owner_login or repository.full_name.split("/", 1)[0]
+        repo_name = repository.name
         branch = request.branch or repository.default_branch or "main"
         
         # Fetch file content
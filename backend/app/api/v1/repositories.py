@@ -78,7 +78,7 @@ async def get_available_github_repositories(
         )
     
     github_service = GitHubService()
-    repos = github_service.get_user_repositories(current_user.github_access_token)
+    repos = await github_service.get_user_repositories_async(current_user.github_access_token)
     
     active_workspace_id = current_user.active_team_id
     
@@ -592,7 +592,7 @@ async def get_repository_content(
                 )
             
             github_service = GitHubService()
-            content = github_service.get_repository_content(
+            content = await github_service.get_repository_content(
                 current_user.github_access_token,
                 repository.full_name,
                 clean_path
@@ -3,8 +3,17 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.settings import settings
 
+# Size the connection pool for server databases; SQLite (local dev) keeps SQLAlchemy's default pool
+pool_kwargs = {}
+if not settings.DATABASE_URL.startswith("sqlite"):
+    pool_kwargs = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
 engine = create_engine(
     settings.DATABASE_URL,
+    **pool_kwargs,
     pool_pre_ping=True,   # ✅ detects dead/stale connections and reconnects
     pool_recycle=1800,    # ✅ recycle connections to avoid idle timeouts (30 min)
 )
@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config.settings import settings  
 from app.api.v1.api import api_router
 from app.core.database import Base, engine
+from app.services.github_service import close_github_client
+from app.services.custom_scanner_service import shutdown_rule_pool
 from app.api.v1 import ai
 from app.api.v1 import slack_oauth
 from app.api.v1 import slack_interactions
@@ -45,6 +47,11 @@ app.include_router(
     tags=["slack-commands"]
 )
 
+@app.on_event("shutdown")
+async def close_http_clients():
+    await close_github_client()
+    shutdown_rule_pool()
+
 @app.get("/")
 async def root():
     return {"message": "SecureThread API", "version": "1.0.0"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -48,5 +48,11 @@ class Feedback(Base):
     # Relationships
     user = relationship("User", back_populates="feedback_submissions")
     
+    # Keyset pagination walks (created_at, id) newest first, overall and per user
+    __table_args__ = (
+        Index('ix_feedbacks_created_at_id', 'created_at', 'id'),
+        Index('ix_feedbacks_user_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+    
     def __repr__(self):
         return f"<Feedback(tracking_id='{self.tracking_id}', type='{self.type}', status='{self.status}')>"
\ No newline at end of file
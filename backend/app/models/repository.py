@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -24,6 +24,7 @@ class Repository(Base):
     # Common repository fields
     name = Column(String, nullable=False)
     full_name = Column(String, nullable=False)
+    owner_login = Column(String, index=True, nullable=True)  # Owner/workspace part of full_name, kept in sync by _sync_owner_login
     description = Column(Text, nullable=True)
     html_url = Column(String, nullable=False)
     clone_url = Column(String, nullable=False)
@@ -45,6 +46,12 @@ class Repository(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    @validates("full_name")
+    def _sync_owner_login(self, key, full_name):
+        """Keep owner_login in step with full_name, so callers and listings need not split it"""
+        self.owner_login = full_name.split("/", 1)[0] if full_name else None
+        return full_name
+
     @property
     def source_type(self) -> str:
         """Determine the source type of this repository"""
@@ -71,6 +71,7 @@ class FeedbackList(BaseModel):
     total: int
     page: int
     per_page: int
+    next_cursor: Optional[str] = None  # pass as ?cursor= to fetch the next page
 
 class FeedbackStats(BaseModel):
     total_feedback: int
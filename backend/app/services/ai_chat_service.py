@@ -154,7 +154,9 @@ Always prioritize the user's security posture and maintain your professional cyb
                     # Analyze file with LLM service
                     file_path = attachment.get("original_name", "uploaded_file")
                     file_extension = attachment.get("extension", "")
-                    content = attachment.get("text_content", "")
+                    # Take the decoded text out of the attachment so each file's content is
+                    # released once analyzed instead of living until the request ends
+                    content = attachment.pop("text_content", "")
                     
                     # Use LLM service to analyze the code
                     vulnerabilities = await self.llm_service.analyze_code_for_vulnerabilities(
@@ -188,9 +190,9 @@ Always prioritize the user's security posture and maintain your professional cyb
             )
             
             # Clean up temporary files
-            file_ids = [att.get("file_id") for att in attachments if att.get("file_id")]
-            if file_ids:
-                self.file_service.cleanup_temporary_files(file_ids)
+            temp_paths = [att["temp_path"] for att in attachments if att.get("temp_path")]
+            if temp_paths:
+                self.file_service.cleanup_temporary_files(temp_paths)
             
             return {
                 "response": ai_response,
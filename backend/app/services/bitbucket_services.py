@@ -14,6 +14,14 @@ class BitbucketService:
         self.client_secret = settings.BITBUCKET_CLIENT_SECRET
         self.redirect_uri = settings.BITBUCKET_REDIRECT_URI
         self.api_base_url = "https://api.bitbucket.org/2.0"
+        
+        # Keep-alive connection pool for per-file fetches during scans
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        
+        # (workspace, repo_slug) -> default branch, so a scan looks it up once, not per file
+        self._default_branches: Dict[tuple, str] = {}
 
     @classmethod
     def get_authorization_url(cls) -> str:
@@ -399,15 +407,21 @@ class BitbucketService:
             headers = {"Authorization": f"Bearer {access_token}"}
             
             # If no branch specified, get the default branch from repository info
+            branch_confirmed = False  # True when the branch is the repo's actual main branch
+            if not branch:
+                branch = self._default_branches.get((workspace, repo_slug))
+                branch_confirmed = branch is not None
             if not branch:
                 logger.info(f"DEBUG: Getting default branch for {workspace}/{repo_slug}")
-                repo_response = requests.get(
+                repo_response = self.session.get(
                     f"{self.api_base_url}/repositories/{workspace}/{repo_slug}",
                     headers=headers
                 )
                 if repo_response.status_code == 200:
                     repo_data = repo_response.json()
                     branch = repo_data.get("mainbranch", {}).get("name", "master")  # Try master as fallback instead of main
+                    self._default_branches[(workspace, repo_slug)] = branch
+                    branch_confirmed = "mainbranch" in repo_data
                     logger.info(f"DEBUG: Using default branch '{branch}' for {workspace}/{repo_slug}")
                 else:
                     branch = "master"  # Default to master first
@@ -418,7 +432,7 @@ class BitbucketService:
             
             url = f"{self.api_base_url}/repositories/{workspace}/{repo_slug}/src/{branch}/{encoded_path}"
             logger.info(f"DEBUG: Fetching file from: {url}")
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
 
             if response.status_code == 200:
                 # Bitbucket returns file content directly, not base64 encoded
@@ -427,6 +441,13 @@ class BitbucketService:
                 logger.info(f"DEBUG: First 200 chars: {content[:200]}")
                 return content
             
+            # Only a 404 on a guessed branch can be fixed by another branch. Auth errors,
+            # rate limits and server errors fail the same way everywhere, and a 404 on
+            # the repo's main branch means the file doesn't exist.
+            if response.status_code != 404 or branch_confirmed:
+                logger.error(f"Failed to fetch file '{file_path}' from branch '{branch}': {response.status_code} - {response.text[:500]}")
+                return None
+            
             # If the first attempt failed, try alternative branches
             alternative_branches = ["main", "master", "develop", "dev"]
             current_branch = branch
@@ -437,13 +458,15 @@ class BitbucketService:
                     
                 alt_url = f"{self.api_base_url}/repositories/{workspace}/{repo_slug}/src/{alt_branch}/{encoded_path}"
                 logger.info(f"DEBUG: Trying alternative branch '{alt_branch}': {alt_url}")
-                alt_response = requests.get(alt_url, headers=headers)
+                alt_response = self.session.get(alt_url, headers=headers)
                 
                 if alt_response.status_code == 200:
                     content = alt_response.text
                     logger.info(f"DEBUG: Alternative branch '{alt_branch}' worked! Content length: {len(content)}")
                     logger.info(f"DEBUG: First 200 chars: {content[:200]}")
                     return content
+                if alt_response.status_code != 404:
+                    break  # not a missing-branch problem; other branches won't help
             
             logger.error(f"Failed to fetch file '{file_path}' from any branch. Main response: {response.status_code} - {response.text[:500]}")
             return None
@@ -16,10 +16,33 @@ class SanitizedContent:
     sanitized: str
 
 
-def _mask(text: str, start: int, end: int) -> str:
-    chunk = text[start:end]
-    masked = "".join("\n" if c == "\n" else " " for c in chunk)
-    return text[:start] + masked + text[end:]
+# Patterns are compiled once at import; each is applied in a single re.sub pass.
+BLOCK_COMMENT_RE = re.compile(r"/\*[\s\S]*?\*/")
+SLASH_LINE_COMMENT_RE = re.compile(r"//.*?$", re.MULTILINE)
+HASH_LINE_COMMENT_RE = re.compile(r"#.*?$", re.MULTILINE)
+HTML_COMMENT_RE = re.compile(r"<!--[\s\S]*?-->")
+QUOTED_STRING_RE = re.compile(r"""(["'])(?:\\.|(?!\1)[^\\])*\1""")
+TEMPLATE_STRING_RE = re.compile(r"`(?:\\.|[^\\`])*`")
+TRIPLE_SINGLE_QUOTED_RE = re.compile(r"'''[\s\S]*?'''")
+TRIPLE_DOUBLE_QUOTED_RE = re.compile(r'"""[\s\S]*?"""')
+
+COMMENT_PATTERNS = {
+    "javascript": (BLOCK_COMMENT_RE, SLASH_LINE_COMMENT_RE),
+    "typescript": (BLOCK_COMMENT_RE, SLASH_LINE_COMMENT_RE),
+    "python": (HASH_LINE_COMMENT_RE,),
+    "html": (HTML_COMMENT_RE,),
+}
+
+STRING_PATTERNS = {
+    "javascript": (QUOTED_STRING_RE, TEMPLATE_STRING_RE),
+    "typescript": (QUOTED_STRING_RE, TEMPLATE_STRING_RE),
+    "python": (TRIPLE_SINGLE_QUOTED_RE, TRIPLE_DOUBLE_QUOTED_RE, QUOTED_STRING_RE),
+}
+
+
+def _mask(match: re.Match) -> str:
+    """Blank out a match, keeping its newlines so offsets and line numbers don't move."""
+    return "\n".join(" " * len(line) for line in match.group(0).split("\n"))
 
 
 def sanitize_code(
@@ -36,35 +59,11 @@ def sanitize_code(
     sanitized = content
 
     if strip_comments:
-        if lang in ("javascript", "typescript"):
-            # /* ... */
-            for m in list(re.finditer(r"/\*[\s\S]*?\*/", sanitized)):
-                sanitized = _mask(sanitized, m.start(), m.end())
-            # // ...
-            for m in list(re.finditer(r"//.*?$", sanitized, flags=re.MULTILINE)):
-                sanitized = _mask(sanitized, m.start(), m.end())
-
-        elif lang == "python":
-            for m in list(re.finditer(r"#.*?$", sanitized, flags=re.MULTILINE)):
-                sanitized = _mask(sanitized, m.start(), m.end())
-
-        elif lang == "html":
-            for m in list(re.finditer(r"<!--[\s\S]*?-->", sanitized)):
-                sanitized = _mask(sanitized, m.start(), m.end())
+        for pattern in COMMENT_PATTERNS.get(lang, ()):
+            sanitized = pattern.sub(_mask, sanitized)
 
     if strip_strings:
-        if lang in ("javascript", "typescript"):
-            for m in list(re.finditer(r"""(["'])(?:\\.|(?!\1)[^\\])*\1""", sanitized)):
-                sanitized = _mask(sanitized, m.start(), m.end())
-            for m in list(re.finditer(r"`(?:\\.|[^\\`])*`", sanitized)):
-                sanitized = _mask(sanitized, m.start(), m.end())
-
-        elif lang == "python":
-            for m in list(re.finditer(r"'''[\s\S]*?'''", sanitized)):
-                sanitized = _mask(sanitized, m.start(), m.end())
-            for m in list(re.finditer(r'"""[\s\S]*?"""', sanitized)):
-                sanitized = _mask(sanitized, m.start(), m.end())
-            for m in list(re.finditer(r"""(["'])(?:\\.|(?!\1)[^\\])*\1""", sanitized)):
-                sanitized = _mask(sanitized, m.start(), m.end())
-
-    return SanitizedContent(original=content, sanitized=sanitized)
\ No newline at end of file
+        for pattern in STRING_PATTERNS.get(lang, ()):
+            sanitized = pattern.sub(_mask, sanitized)
+
+    return SanitizedContent(original=content, sanitized=sanitized)
@@ -6,15 +6,26 @@ Custom Scanner Service - Rule-based vulnerability scanning with AI enhancement
 """
 import re
 import asyncio
-from typing import List, Dict, Any, Optional
+import heapq
+import time
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from operator import itemgetter
 from datetime import datetime, timezone
 import logging
 import os
 import shutil
 import tempfile
 import subprocess
+import pickle
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import String, func, insert
 from app.models.user import User
 from app.services.code_sanitizer import sanitize_code
 from app.models.repository import Repository
@@ -24,15 +35,46 @@ from app.services.bitbucket_services import BitbucketService
 from app.services.vulnerability_triage import VulnerabilityTriage
 from app.services.llm_service import LLMService
 from app.services.slack_service import slack_service
-from app.services.rule_parser import rule_parser
+from app.services.rule_parser import rule_parser, evaluate_condition
 
 logger = logging.getLogger(__name__)
 
 
+# How much of a file to inspect for NUL bytes when deciding it is binary
+BINARY_SNIFF_BYTES = 8192
+
+# Path keywords that bump a file's scan priority (auth/security related code)
+SECURITY_PATH_KEYWORDS_RE = re.compile(
+    'auth|login|password|token|security|admin|api', re.IGNORECASE
+)
+
+# VARCHAR limits of the vulnerabilities table, read from the model so row truncation
+# can't drift from the schema
+VULNERABILITY_COLUMN_LIMITS = {
+    column.name: column.type.length
+    for column in Vulnerability.__table__.columns
+    if isinstance(column.type, String) and column.type.length
+}
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # LANGUAGE DETECTION & FILTERING FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════
 
+def get_file_extension(file_path: str) -> str:
+    """
+    Lower-cased extension including the dot ('' if none).
+    Dotfiles such as '.env' count as their own extension.
+    """
+    root, ext = os.path.splitext(file_path)
+    if not ext:
+        basename = os.path.basename(root)
+        if basename.startswith('.'):
+            ext = basename
+    return ext.lower()
+
+
+@lru_cache(maxsize=4096)
 def detect_file_language(file_path: str) -> str:
     """
     Detect programming language from file extension
@@ -40,7 +82,7 @@ def detect_file_language(file_path: str) -> str:
     if not file_path:
         return 'unknown'
     
-    file_ext = file_path.lower().split('.')[-1] if '.' in file_path else ''
+    file_ext = get_file_extension(file_path)[1:]
     
     language_map = {
         'py': 'python', 'pyw': 'python', 'pyx': 'python', 'pyi': 'python',
@@ -75,6 +117,18 @@ def detect_file_language(file_path: str) -> str:
     return detected_language
 
 
+def _newline_offsets(content: str) -> List[int]:
+    """
+    Offsets of every newline in content, so line numbers can be found with bisect
+    """
+    offsets = []
+    pos = content.find('\n')
+    while pos != -1:
+        offsets.append(pos)
+        pos = content.find('\n', pos + 1)
+    return offsets
+
+
 def filter_rules_by_language(file_path: str, all_rules: List) -> List:
     """
     Filter scan rules based on file language for 10x faster scanning
@@ -103,6 +157,349 @@ def filter_rules_by_language(file_path: str, all_rules: List) -> List:
     return applicable_rules
 
 
+class _LiteralSearch:
+    """
+    Substring search for literal ("...") rule strings over one file's content.
+    str.find beats an escaped-literal regex, and for nocase literals one shared
+    lower-cased copy replaces an IGNORECASE regex scan per literal (~15x faster).
+    Case-insensitive search is only used on ASCII text, where lower() matches
+    re.IGNORECASE exactly and keeps offsets aligned.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self._lowered: Optional[str] = None
+        self._is_ascii: Optional[bool] = None
+
+    def supports(self, literal: str, nocase: bool) -> bool:
+        if not nocase:
+            return True
+        if self._is_ascii is None:
+            self._is_ascii = self.content.isascii()
+        return self._is_ascii and literal.isascii()
+
+    def find(self, literal: str, nocase: bool) -> Optional[Tuple[int, str]]:
+        if nocase:
+            if self._lowered is None:
+                self._lowered = self.content.lower()
+            start = self._lowered.find(literal.lower())
+        else:
+            start = self.content.find(literal)
+        if start < 0:
+            return None
+        return start, self.content[start:start + len(literal)]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# RULE EVALUATION (shared by the service and the rule worker processes)
+# ═══════════════════════════════════════════════════════════════════════════
+
+SEVERITY_RISK_SCORES = {
+    'critical': 9.5,
+    'high': 7.5,
+    'medium': 5.0,
+    'low': 2.5
+}
+
+
+def calculate_risk_score(severity: str) -> float:
+    """Calculate numerical risk score from severity"""
+    return SEVERITY_RISK_SCORES.get(severity.lower(), 5.0)
+
+
+def compile_rule_gates(condition: Dict[str, Any], meta: Dict[str, Any], patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce a rule's parsed condition and requires_keywords meta to the values
+    evaluate_rules_on_content checks per file, so they are worked out once per
+    rule instead of once per file.
+    """
+    cond_type = (condition.get("type") or "any").lower()
+    expression = None
+    if cond_type == "expression":
+        # Boolean condition: parsed once by rule_parser, evaluated per file against the hit variables
+        min_patterns_hit = 1
+        condition_label = "expression"
+        expression = condition.get("expr")
+    elif cond_type == "all":
+        min_patterns_hit = len(patterns)
+        condition_label = "all"
+    elif cond_type == "n_of_them":
+        min_patterns_hit = int(condition.get("n") or 1)
+        condition_label = f"n_of_them(n={min_patterns_hit})"
+    else:
+        min_patterns_hit = 1
+        condition_label = cond_type
+
+    req_kw = meta.get("requires_keywords")
+    keywords = [k.strip().lower() for k in str(req_kw).split(",") if k.strip()] if req_kw else []
+
+    return {
+        "min_patterns_hit": min_patterns_hit,
+        "condition_label": condition_label,
+        "expression": expression,
+        "variables": [p.get("variable", "?").lower() for p in patterns],
+        "requires_keywords": req_kw,
+        "required_keywords": keywords,
+    }
+
+
+def evaluate_rules_on_content(
+    file_content: str,
+    file_path: str,
+    applicable_rules: List[Dict[str, Any]],
+    repository_id: int,
+    triage: VulnerabilityTriage,
+    debug_log_path: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    UNIFIED SCANNING CORE:
+    Applies rules to file content, evaluates YARA conditions, generates evidence,
+    and runs through the Triage Engine.
+    Returns a list of vulnerability dictionaries ready for the save buffer.
+    Module-level so it can also run inside the rule worker processes.
+    """
+    vulnerabilities = []
+    language = detect_file_language(file_path)
+
+    # 1. Sanitize code (strip comments, preserve lines for accuracy)
+    try:
+        sanitized_content = sanitize_code(
+            file_content,
+            language,
+            strip_comments=True,
+            strip_strings=False,
+        ).sanitized
+    except Exception as sanitize_err:
+        logger.warning(f"Sanitization failed for {file_path}, fallback to raw: {sanitize_err}")
+        sanitized_content = file_content
+
+    raw_lower = file_content.lower()
+    newline_offsets = None  # built on first match, shared by all rules
+    lines = None
+    # Rules often share patterns; search each distinct pattern once per file
+    search_results: Dict[Any, Optional[Tuple[int, str]]] = {}
+    literal_search = _LiteralSearch(sanitized_content)
+
+    for rule in applicable_rules:
+        try:
+            rule_id = rule.get("id")
+            rule_name = rule.get("name", "Unknown Rule")
+            rule_category = rule.get("category", "general")
+
+            # 2. Optional Meta Gating (requires_keywords)
+            gates = rule["gates"]
+            req_kw = gates["requires_keywords"]
+            requires_keywords_matched = None
+
+            keywords = gates["required_keywords"]
+            if keywords:
+                for k in keywords:
+                    if k in raw_lower:
+                        requires_keywords_matched = k
+                        break
+                if not requires_keywords_matched:
+                    continue  # Gated out - required keyword not found
+
+            # 3. Pattern Matching
+            patterns = rule.get("patterns") or []
+            if not patterns:
+                continue
+
+            patterns_hit = 0
+            earliest_start = None
+            earliest_match_text = None
+            matched_variables = []
+
+            for p in patterns:
+                cre = p.get("compiled")
+                if not cre:
+                    continue
+                literal = p.get("literal")
+                nocase = bool(p.get("flags", 0) & re.IGNORECASE)
+                if literal and literal_search.supports(literal, nocase):
+                    key = (literal, nocase)
+                    if key not in search_results:
+                        search_results[key] = literal_search.find(literal, nocase)
+                else:
+                    key = cre
+                    if key not in search_results:
+                        m = cre.search(sanitized_content)
+                        search_results[key] = (m.start(), m.group(0)) if m else None
+                hit = search_results[key]
+                if hit:
+                    patterns_hit += 1
+                    matched_variables.append(p.get("variable", "?"))
+                    if earliest_start is None or hit[0] < earliest_start:
+                        earliest_start, earliest_match_text = hit
+
+            if patterns_hit == 0:
+                continue
+
+            # 4. Evaluate YARA Condition (any, all, n_of_them), reduced to a threshold at compile time
+            if patterns_hit < gates["min_patterns_hit"]:
+                continue
+            if gates["expression"] is not None and not evaluate_condition(
+                gates["expression"],
+                {variable.lower() for variable in matched_variables},
+                gates["variables"],
+            ):
+                continue
+
+            # 5. Extract Context Snippet
+            if earliest_start is None: earliest_start = 0
+            if newline_offsets is None:
+                newline_offsets = _newline_offsets(file_content)
+            line_number = bisect_right(newline_offsets, earliest_start) + 1
+            if lines is None:
+                lines = file_content.split("\n")
+
+            start_line = max(0, line_number - 4)
+            end_line = min(len(lines), line_number + 4)
+            context_snippet = "\n".join(lines[start_line:end_line])
+
+            # 6. Triage Engine (False Positive Reduction)
+            decision = triage.decide(
+                rule=rule,
+                file_path=file_path,
+                language=language,
+                matched_text=earliest_match_text or "",
+                context_snippet=context_snippet,
+            )
+
+            if not decision.should_report:
+                continue  # Suppressed by AI/Triage logic!
+
+            # 7. Generate Evidence String
+            matched_vars_str = ",".join(matched_variables[:10])
+            evidence = (
+                f"[evidence] rule_id={rule_id} "
+                f"patterns_hit={patterns_hit}/{len(patterns)} "
+                f"condition={gates['condition_label']}"
+            )
+            evidence += f" matched_patterns={matched_vars_str}"
+            if req_kw:
+                evidence += f" requires_keywords={req_kw} matched_keyword={requires_keywords_matched}"
+
+            recommendation = f"Review and fix the {rule_category} issue in {file_path}\n{evidence}"
+
+            # 8. Construct Vulnerability Dictionary (Ready for Micro-batching)
+            vuln_dict = {
+                "repository_id": repository_id,
+                "title": rule_name[:255],
+                "description": rule.get("description") or "No description",
+                "severity": (rule.get("severity") or "medium").lower(),
+                "category": rule_category,
+                "cwe_id": rule.get("cwe_id"),
+                "owasp_category": rule.get("owasp_category"),
+                "file_path": file_path,
+                "line_number": line_number,
+                "line_end_number": line_number,
+                "code_snippet": context_snippet[:500],
+                "recommendation": recommendation[:2000],
+                "fix_suggestion": "Apply appropriate security controls and validation",
+                "risk_score": calculate_risk_score(rule.get("severity", "medium")),
+                "exploitability": "medium",
+                "impact": (rule.get("severity") or "medium").lower(),
+                "rule_id": rule_id,
+                "pattern_matches_count": patterns_hit,
+                "ai_enhanced": False,
+                "triage": {
+                    "decision": "reported",
+                    "reason": decision.reason,
+                    "confidence": decision.confidence,
+                }
+            }
+            vulnerabilities.append(vuln_dict)
+
+            if debug_log_path:
+                try:
+                    with open(debug_log_path, "a", encoding="utf-8") as f:
+                        f.write(f"   ✅ MATCH: {rule_name} | hit={patterns_hit}/{len(patterns)} | cond={gates['condition_label']} | vars={matched_vars_str}\n")
+                except Exception:
+                    pass
+
+        except Exception as e:
+            logger.warning(f"Error applying rule {rule.get('name')} to {file_path}: {e}")
+            continue
+
+    return vulnerabilities
+
+
+# One rule worker pool per process, shared by all scans and shut down with the app. Workers come
+# from a forkserver, never a fork of the multithreaded server process (a fork could inherit a
+# lock held by another thread and deadlock on it)
+RULE_POOL_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+_rule_pool: Optional[ProcessPoolExecutor] = None
+_rule_pool_lock = threading.Lock()
+
+
+def get_rule_pool() -> ProcessPoolExecutor:
+    global _rule_pool
+    with _rule_pool_lock:
+        if _rule_pool is None:
+            _rule_pool = ProcessPoolExecutor(
+                max_workers=RULE_POOL_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+        return _rule_pool
+
+
+def discard_rule_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next scan starts a fresh one"""
+    global _rule_pool
+    with _rule_pool_lock:
+        if _rule_pool is pool:
+            _rule_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_rule_pool() -> None:
+    """Shut down the shared rule worker pool (FastAPI shutdown hook)"""
+    global _rule_pool
+    with _rule_pool_lock:
+        pool, _rule_pool = _rule_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Per-worker state: each scan publishes its compiled rules to a pickle file once, and a worker
+# loads a rule set the first time it sees that file, keeping the last few scans' sets
+WORKER_RULE_SETS_SIZE = 4
+_worker_rule_sets: "OrderedDict[str, Dict[Any, Dict[str, Any]]]" = OrderedDict()
+_worker_triage: Optional[VulnerabilityTriage] = None
+
+
+def _worker_rules(rules_path: str) -> Dict[Any, Dict[str, Any]]:
+    rules_by_id = _worker_rule_sets.get(rules_path)
+    if rules_by_id is None:
+        with open(rules_path, "rb") as f:
+            rules_by_id = {rule["id"]: rule for rule in pickle.load(f)}
+        _worker_rule_sets[rules_path] = rules_by_id
+        if len(_worker_rule_sets) > WORKER_RULE_SETS_SIZE:
+            _worker_rule_sets.popitem(last=False)
+    else:
+        _worker_rule_sets.move_to_end(rules_path)
+    return rules_by_id
+
+
+def _evaluate_rules_worker(
+    rules_path: str,
+    file_content: str,
+    file_path: str,
+    rule_ids: List[Any],
+    repository_id: int,
+    debug_log_path: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    global _worker_triage
+    if _worker_triage is None:
+        _worker_triage = VulnerabilityTriage()
+    rules_by_id = _worker_rules(rules_path)
+    rules = [rules_by_id[rule_id] for rule_id in rule_ids]
+    return evaluate_rules_on_content(
+        file_content, file_path, rules, repository_id, _worker_triage, debug_log_path
+    )
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # CUSTOM SCANNER SERVICE CLASS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -118,6 +515,9 @@ class CustomScannerService:
         self.MAX_FILE_SIZE = 500 * 1024
         self.BATCH_SIZE = 10
         self.VULN_SAVE_BATCH_SIZE = 5
+        self.VULN_INSERT_CHUNK_SIZE = 1000
+        self.BLOB_CACHE_SIZE = 200
+        self.AI_ENHANCEMENT_BATCH_SIZE = 4  # files per AI request
         
         self.scannable_extensions = {
             '.py', '.js', '.jsx', '.ts', '.tsx', '.php', '.asp', '.aspx',
@@ -130,10 +530,40 @@ class CustomScannerService:
             '.graphql', '.proto', '.thrift'
         }
         
+        priority_map = {
+            # Critical security files
+            '.py': 10, '.php': 10, '.java': 9, '.js': 9, '.ts': 9,
+            '.jsx': 9, '.tsx': 9, '.sql': 10, '.sh': 9, '.bash': 9,
+            
+            # Config files
+            '.yaml': 8, '.yml': 8, '.json': 7, '.xml': 7, '.env': 10,
+            '.config': 8, '.conf': 8, '.ini': 7,
+            
+            # Backend languages
+            '.go': 8, '.rs': 8, '.rb': 8, '.cs': 8, '.cpp': 7,
+            '.c': 7, '.h': 7, '.swift': 7, '.kt': 7,
+            
+            # Others
+            '.html': 5, '.htm': 5, '.asp': 8, '.aspx': 8, '.jsp': 8
+        }
+        # Scannable extension -> scan priority (3 for anything not listed above)
+        self.extension_priorities = {
+            ext: priority_map.get(ext, 3) for ext in self.scannable_extensions
+        }
+        
+        self.important_files = {
+            'dockerfile', 'makefile', 'requirements.txt', 'package.json',
+            'composer.json', 'pom.xml', 'build.gradle', '.env', 'web.config'
+        }
+        
         self.excluded_paths = {
             'node_modules', '.git', '__pycache__', '.venv', 'venv',
             'vendor', 'dist', 'build', '.next', 'target'
         }
+        # One alternation regex instead of a substring scan per excluded path
+        self.excluded_paths_re = re.compile(
+            '|'.join(re.escape(excluded) for excluded in self.excluded_paths)
+        )
         
         self.compiled_patterns_cache: Dict[int, List[re.Pattern]] = {}
         self.vulnerability_buffer: List[Dict[str, Any]] = []
@@ -143,10 +573,22 @@ class CustomScannerService:
         self.MAX_INDIVIDUAL_ALERTS = 3
 
         self.triage = VulnerabilityTriage()
+        self._rule_pool: Optional[ProcessPoolExecutor] = None
+        self._rules_path: Optional[str] = None
+        self._rules_by_language: Dict[str, List[Dict[str, Any]]] = {}
+        self._rules_by_language_source: Optional[List[Dict[str, Any]]] = None
+
+        # LRU of fetched file contents keyed by (provider, repo, blob sha), so the
+        # AI enhancement phase does not download files the rule scan already read
+        self._blob_cache: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._file_shas: Dict[Tuple[str, str], str] = {}
+        
+        # Content of files that produced findings in the current scan, reused by the
+        # AI enhancement phase; clean files are never kept
+        self._vulnerable_file_contents: Dict[str, str] = {}
 
     def _clone_repository(self, repo_url: str, access_token: str) -> Optional[str]:
-        import time
-        start_time = time.time()
+        start_time = time.monotonic()
         
         try:
             temp_dir = tempfile.mkdtemp(prefix="securethread_scan_")
@@ -165,7 +607,7 @@ class CustomScannerService:
                 timeout=120
             )
             
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             if result.returncode == 0:
                 logger.info(f"✅ Repository cloned successfully in {elapsed:.2f} seconds")
                 return temp_dir
@@ -219,9 +661,21 @@ class CustomScannerService:
             return []
         
     def _read_local_file_content(self, file_path: str) -> Optional[Dict[str, Any]]:
+        binary_result = {
+            'content': 'Binary file',
+            'encoding': 'binary',
+            'path': file_path,
+            'is_binary': True
+        }
         try: 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with open(file_path, 'rb') as f:
+                raw_content = f.read()
+            # Classic text-vs-binary sniff: a NUL byte in the first 8KB
+            if b'\x00' in raw_content[:BINARY_SNIFF_BYTES]:
+                logger.debug(f"Skipping binary file: {file_path}")
+                return binary_result
+            # Same newline translation text-mode open() used to apply
+            content = raw_content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
             return {
                 'content': content,
                 'encoding': 'utf-8',
@@ -230,12 +684,7 @@ class CustomScannerService:
             }
         except UnicodeDecodeError:
             logger.debug(f"Skipping binary file: {file_path}")
-            return {
-                'content': 'Binary file',
-                'encoding': 'binary',
-                'path': file_path,
-                'is_binary': True
-            }
+            return binary_result
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
             return None
@@ -249,167 +698,74 @@ class CustomScannerService:
         debug_log_path: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        UNIFIED SCANNING CORE:
-        Applies rules to file content, evaluates YARA conditions, generates evidence,
-        and runs through the Triage Engine.
-        Returns a list of vulnerability dictionaries ready for the save buffer.
+        Run the unified scanning core in-process
         """
-        vulnerabilities = []
-        language = detect_file_language(file_path)
+        return evaluate_rules_on_content(
+            file_content, file_path, applicable_rules, repository_id,
+            self.triage, debug_log_path
+        )
 
-        # 1. Sanitize code (strip comments, preserve lines for accuracy)
-        try:
-            sanitized_content = sanitize_code(
-                file_content,
-                language,
-                strip_comments=True,
-                strip_strings=False,
-            ).sanitized
-        except Exception as sanitize_err:
-            logger.warning(f"Sanitization failed for {file_path}, fallback to raw: {sanitize_err}")
-            sanitized_content = file_content
-
-        raw_lower = file_content.lower()
-
-        for rule in applicable_rules:
+    async def _evaluate_rules_async(
+        self,
+        file_content: str,
+        file_path: str,
+        applicable_rules: List[Dict[str, Any]],
+        repository_id: int,
+        debug_log_path: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate rules in the worker process pool (true multi-core regex matching).
+        Falls back to a worker thread when no pool is running or it broke.
+        """
+        if self._rule_pool is not None:
             try:
-                rule_id = rule.get("id")
-                rule_name = rule.get("name", "Unknown Rule")
-                rule_category = rule.get("category", "general")
-                
-                # 2. Optional Meta Gating (requires_keywords)
-                meta = rule.get("meta") or {}
-                req_kw = meta.get("requires_keywords")
-                requires_keywords_matched = None
-                
-                if req_kw:
-                    keywords = [k.strip().lower() for k in str(req_kw).split(",") if k.strip()]
-                    if keywords:
-                        for k in keywords:
-                            if k in raw_lower:
-                                requires_keywords_matched = k
-                                break
-                        if not requires_keywords_matched:
-                            continue  # Gated out - required keyword not found
-
-                # 3. Pattern Matching
-                patterns = rule.get("patterns") or []
-                if not patterns:
-                    continue
-
-                patterns_hit = 0
-                earliest_start = None
-                earliest_match_text = None
-                matched_variables = []
-
-                for p in patterns:
-                    cre = p.get("compiled")
-                    if not cre:
-                        continue
-                    m = cre.search(sanitized_content)
-                    if m:
-                        patterns_hit += 1
-                        matched_variables.append(p.get("variable", "?"))
-                        if earliest_start is None or m.start() < earliest_start:
-                            earliest_start = m.start()
-                            earliest_match_text = m.group(0)
-
-                if patterns_hit == 0:
-                    continue
-
-                # 4. Evaluate YARA Condition (any, all, n_of_them)
-                condition = rule.get("condition") or {"type": "any", "n": None}
-                cond_type = (condition.get("type") or "any").lower()
-
-                matched = False
-                if cond_type == "all":
-                    matched = (patterns_hit == len(patterns))
-                elif cond_type == "n_of_them":
-                    n = int(condition.get("n") or 1)
-                    matched = patterns_hit >= n
-                else:
-                    matched = patterns_hit >= 1
-
-                if not matched:
-                    continue
-
-                # 5. Extract Context Snippet
-                if earliest_start is None: earliest_start = 0
-                line_number = file_content[:earliest_start].count("\n") + 1
-                lines = file_content.split("\n")
-                
-                start_line = max(0, line_number - 4)
-                end_line = min(len(lines), line_number + 4)
-                context_snippet = "\n".join(lines[start_line:end_line])
-
-                # 6. Triage Engine (False Positive Reduction)
-                decision = self.triage.decide(
-                    rule=rule,
-                    file_path=file_path,
-                    language=language,
-                    matched_text=earliest_match_text or "",
-                    context_snippet=context_snippet,
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._rule_pool,
+                    _evaluate_rules_worker,
+                    self._rules_path,
+                    file_content,
+                    file_path,
+                    [rule["id"] for rule in applicable_rules],
+                    repository_id,
+                    debug_log_path
                 )
+            except BrokenProcessPool as e:
+                logger.warning(f"Rule worker pool broke, falling back to in-process matching: {e}")
+                if self._rule_pool is not None:
+                    discard_rule_pool(self._rule_pool)
+                self._shutdown_rule_pool()
 
-                if not decision.should_report:
-                    continue  # Suppressed by AI/Triage logic!
+        # Rule matching is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(
+            self._evaluate_rules_on_content,
+            file_content, file_path, applicable_rules, repository_id, debug_log_path
+        )
 
-                # 7. Generate Evidence String
-                matched_vars_str = ",".join(matched_variables[:10])
-                evidence = (
-                    f"[evidence] rule_id={rule_id} "
-                    f"patterns_hit={patterns_hit}/{len(patterns)} "
-                    f"condition={cond_type}"
-                )
-                if cond_type == "n_of_them":
-                    evidence += f"(n={int(condition.get('n') or 1)})"
-                evidence += f" matched_patterns={matched_vars_str}"
-                if req_kw:
-                    evidence += f" requires_keywords={req_kw} matched_keyword={requires_keywords_matched}"
-                
-                recommendation = f"Review and fix the {rule_category} issue in {file_path}\n{evidence}"
-
-                # 8. Construct Vulnerability Dictionary (Ready for Micro-batching)
-                vuln_dict = {
-                    "repository_id": repository_id,
-                    "title": rule_name[:255],
-                    "description": rule.get("description") or "No description",
-                    "severity": (rule.get("severity") or "medium").lower(),
-                    "category": rule_category,
-                    "cwe_id": rule.get("cwe_id"),
-                    "owasp_category": rule.get("owasp_category"),
-                    "file_path": file_path,
-                    "line_number": line_number,
-                    "line_end_number": line_number,
-                    "code_snippet": context_snippet[:500],
-                    "recommendation": recommendation[:2000],
-                    "fix_suggestion": "Apply appropriate security controls and validation",
-                    "risk_score": self._calculate_risk_score(rule.get("severity", "medium")),
-                    "exploitability": "medium",
-                    "impact": (rule.get("severity") or "medium").lower(),
-                    "rule_id": rule_id,
-                    "pattern_matches_count": patterns_hit,
-                    "ai_enhanced": False,
-                    "triage": {
-                        "decision": "reported",
-                        "reason": decision.reason,
-                        "confidence": decision.confidence,
-                    }
-                }
-                vulnerabilities.append(vuln_dict)
-
-                if debug_log_path:
-                    try:
-                        with open(debug_log_path, "a", encoding="utf-8") as f:
-                            f.write(f"   ✅ MATCH: {rule_name} | hit={patterns_hit}/{len(patterns)} | cond={cond_type} | vars={matched_vars_str}\n")
-                    except Exception:
-                        pass
-
-            except Exception as e:
-                logger.warning(f"Error applying rule {rule.get('name')} to {file_path}: {e}")
-                continue
+    def _start_rule_pool(self, compiled_rules: List[Dict[str, Any]]) -> None:
+        """
+        Attach this scan to the shared rule worker pool; the compiled rules are written to a
+        pickle file once and each worker loads them on its first file of this scan
+        """
+        try:
+            fd, rules_path = tempfile.mkstemp(prefix="securethread_rules_", suffix=".pkl")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(compiled_rules, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._rules_path = rules_path
+            self._rule_pool = get_rule_pool()
+        except Exception as e:
+            logger.warning(f"Could not start rule worker pool, matching in-process: {e}")
+            self._shutdown_rule_pool()
 
-        return vulnerabilities
+    def _shutdown_rule_pool(self) -> None:
+        """Detach from the shared pool (it stays up for other scans) and remove this scan's rule file"""
+        self._rule_pool = None
+        if self._rules_path is not None:
+            try:
+                os.unlink(self._rules_path)
+            except OSError:
+                pass
+            self._rules_path = None
 
     async def _scan_single_file_local(
         self,
@@ -445,53 +801,30 @@ class CustomScannerService:
             applicable_rules = self._filter_rules_by_language(compiled_rules, language)
 
             # ✅ USE UNIFIED ENGINE
-            vuln_dicts = self._evaluate_rules_on_content(
+            vuln_dicts = await self._evaluate_rules_async(
                 file_content, file_path, applicable_rules, repository_id, debug_log_path
             )
 
-            # Convert dictionaries to SQLAlchemy ORM models for the local DB save
-            vulnerabilities = []
-            for vd in vuln_dicts:
-                vuln = Vulnerability(
-                    scan_id=scan_id,
-                    repository_id=vd["repository_id"],
-                    title=vd["title"],
-                    description=vd["description"],
-                    severity=vd["severity"],
-                    category=vd["category"],
-                    cwe_id=vd.get("cwe_id"),
-                    owasp_category=vd.get("owasp_category"),
-                    file_path=vd["file_path"],
-                    line_number=vd["line_number"],
-                    code_snippet=vd.get("code_snippet"),
-                    recommendation=vd["recommendation"],
-                    risk_score=vd["risk_score"],
-                    status="open",
-                    rule_id=vd["rule_id"]
-                )
-                vulnerabilities.append(vuln)
+            # Same bulk insert path as the buffered API scan
+            rows = [self._build_vulnerability_row(scan_id, vd) for vd in vuln_dicts]
 
             if debug_log_path:
                 with open(debug_log_path, "a", encoding="utf-8") as f:
-                    f.write(f"   Total vulnerabilities found: {len(vulnerabilities)}\n")
+                    f.write(f"   Total vulnerabilities found: {len(rows)}\n")
 
-            if vulnerabilities:
-                try:
-                    self.db.add_all(vulnerabilities)
-                    self.db.commit()
-                    if debug_log_path:
-                        with open(debug_log_path, "a", encoding="utf-8") as f:
-                            f.write(f"   ✅ Saved {len(vulnerabilities)} vulnerabilities to database\n")
-                except Exception as e:
-                    logger.error(f"Failed to save vulnerabilities for {file_path}: {e}")
-                    self.db.rollback()
-                    if debug_log_path:
-                        with open(debug_log_path, "a", encoding="utf-8") as f:
-                            f.write(f"   ❌ FAILED TO SAVE: {str(e)}\n")
+            if rows:
+                self._vulnerable_file_contents[file_path] = file_content
+                saved_count = len(self._insert_vulnerability_rows(rows))
+                if debug_log_path:
+                    with open(debug_log_path, "a", encoding="utf-8") as f:
+                        if saved_count == len(rows):
+                            f.write(f"   ✅ Saved {saved_count} vulnerabilities to database\n")
+                        else:
+                            f.write(f"   ❌ FAILED TO SAVE {len(rows) - saved_count} of {len(rows)} vulnerabilities\n")
 
             return {
                 "file": file_path,
-                "vulnerabilities_count": len(vulnerabilities),
+                "vulnerabilities_count": len(rows),
                 "language": language,
             }
 
@@ -513,8 +846,7 @@ class CustomScannerService:
         scan_id: int,
         repository_id: int
     ) -> Dict[str, Any]:
-        import time
-        start_time = time.time()
+        start_time = time.monotonic()
         
         files_scanned = 0
         vulnerabilities_found = 0
@@ -561,7 +893,7 @@ class CustomScannerService:
             
             logger.info(f"Progress: {files_scanned}/{len(files)} files scanned, {vulnerabilities_found} vulnerabilities found")
         
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         logger.info(f"✅ Scanning completed in {elapsed:.2f} seconds")
         
         return {
@@ -600,6 +932,9 @@ class CustomScannerService:
         scan_id_value = scan.id
         repository_id_value = repository.id
         
+        # Monotonic clock for the duration; wall-clock datetimes only for persisted timestamps
+        scan_start_ns = time.monotonic_ns()
+        
         try:
             scan.status = "running"
             scan.scan_metadata = scan.scan_metadata or {}
@@ -655,12 +990,14 @@ class CustomScannerService:
             scannable_files = self._filter_scannable_files(file_tree)
             logger.info(f"✅ {len(scannable_files)} files are scannable")
             
-            files_to_scan = scannable_files[:self.MAX_FILES_TO_SCAN]
+            files_to_scan = self._select_files_to_scan(scannable_files, self.MAX_FILES_TO_SCAN)
             logger.info(f"🎯 Will scan {len(files_to_scan)} files (limit: {self.MAX_FILES_TO_SCAN})")
             
             logger.info("⚙️ Step 4: Compiling rule patterns...")
             compiled_rules = self._compile_all_rules(rules)
             logger.info(f"✅ {len(compiled_rules)} rules compiled successfully")
+            self._start_rule_pool(compiled_rules)
+            self._vulnerable_file_contents.clear()
             
             language_stats = {}
             for rule in compiled_rules:
@@ -753,13 +1090,7 @@ class CustomScannerService:
                 'file_scan_results': scan_results.get('file_results', [])
             })
             
-            if scan.started_at.tzinfo is None:
-                start_time = scan.started_at.replace(tzinfo=timezone.utc)
-            else:
-                start_time = scan.started_at
-            
-            duration = current_time - start_time
-            scan.scan_duration = self._format_duration(duration)
+            scan.scan_duration = self._format_duration_ns(time.monotonic_ns() - scan_start_ns)
             
             self.db.commit()
             self.db.refresh(scan)
@@ -797,14 +1128,7 @@ class CustomScannerService:
                     scan.status = "failed"
                     scan.error_message = str(e)
                     scan.completed_at = datetime.now(timezone.utc)
-                    
-                    if scan.started_at.tzinfo is None:
-                        start_time = scan.started_at.replace(tzinfo=timezone.utc)
-                    else:
-                        start_time = scan.started_at
-                    
-                    duration = datetime.now(timezone.utc) - start_time
-                    scan.scan_duration = self._format_duration(duration)
+                    scan.scan_duration = self._format_duration_ns(time.monotonic_ns() - scan_start_ns)
                     
                     self.db.commit()
             except Exception as db_error:
@@ -813,6 +1137,8 @@ class CustomScannerService:
             raise
         
         finally:
+            self._shutdown_rule_pool()
+            self._vulnerable_file_contents.clear()
             if 'clone_dir' in locals() and clone_dir and os.path.exists(clone_dir):
                 try:
                     shutil.rmtree(clone_dir)
@@ -830,8 +1156,7 @@ class CustomScannerService:
         Get ALL files from repository (complete tree)
         """
         # ✅✅✅ ADD THESE LINES ✅✅✅
-        import time
-        start_time = time.time()
+        start_time = time.monotonic()
         print(f"\n{'='*80}")
         print(f"📁 FETCHING FILES at {time.strftime('%H:%M:%S')}")
         print(f"   Repository: {repo_full_name}")
@@ -876,7 +1201,7 @@ class CustomScannerService:
             logger.info(f"Retrieved {len(files)} files from {provider_type} repository")
 
             # ✅✅✅ ADD THESE LINES RIGHT BEFORE "return files" ✅✅✅
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             print(f"\n{'='*80}")
             print(f"✅ FILES FETCHED at {time.strftime('%H:%M:%S')}")
             print(f"   Took: {elapsed:.2f} seconds")
@@ -902,7 +1227,7 @@ class CustomScannerService:
             
             # Skip excluded paths
             path_lower = file_path.lower()
-            if any(excluded in path_lower for excluded in self.excluded_paths):
+            if self.excluded_paths_re.search(path_lower):
                 continue
             
             # Skip very large files
@@ -910,59 +1235,37 @@ class CustomScannerService:
                 logger.debug(f"Skipping large file: {file_path} ({file_size} bytes)")
                 continue
             
-            # Check extension
-            file_extension = '.' + file_path.split('.')[-1] if '.' in file_path else ''
-            if file_extension.lower() in self.scannable_extensions:
-                file_info['priority'] = self._calculate_file_priority(file_path, file_extension)
-                scannable.append(file_info)
-            
-            # Important config files (no extension)
+            # Check extension (one lookup answers both "scannable?" and "priority")
+            file_extension = get_file_extension(file_path)
             filename = file_path.split('/')[-1].lower()
-            important_files = {
-                'dockerfile', 'makefile', 'requirements.txt', 'package.json',
-                'composer.json', 'pom.xml', 'build.gradle', '.env', 'web.config'
-            }
             
-            if filename in important_files:
+            # Important config files (no extension) - checked first so files that
+            # also have a scannable extension (package.json, .env) are added once
+            if filename in self.important_files:
                 file_info['priority'] = 10  # High priority
                 scannable.append(file_info)
-        
-        # Sort by priority (high to low)
-        scannable.sort(key=lambda x: x.get('priority', 0), reverse=True)
+            elif file_extension in self.extension_priorities:
+                file_info['priority'] = self._calculate_file_priority(file_path, file_extension)
+                scannable.append(file_info)
         
         return scannable
     
+    def _select_files_to_scan(self, scannable: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        """
+        Pick the `limit` highest-priority files (high to low, stable for ties)
+        without sorting the whole scannable list
+        """
+        return heapq.nlargest(limit, scannable, key=itemgetter('priority'))
+    
     def _calculate_file_priority(self, file_path: str, extension: str) -> int:
         """
         Calculate scan priority for a file (1-10, higher = more important)
         """
-        priority_map = {
-            # Critical security files
-            '.py': 10, '.php': 10, '.java': 9, '.js': 9, '.ts': 9,
-            '.jsx': 9, '.tsx': 9, '.sql': 10, '.sh': 9, '.bash': 9,
-            
-            # Config files
-            '.yaml': 8, '.yml': 8, '.json': 7, '.xml': 7, '.env': 10,
-            '.config': 8, '.conf': 8, '.ini': 7,
-            
-            # Backend languages
-            '.go': 8, '.rs': 8, '.rb': 8, '.cs': 8, '.cpp': 7,
-            '.c': 7, '.h': 7, '.swift': 7, '.kt': 7,
-            
-            # Others
-            '.html': 5, '.htm': 5, '.asp': 8, '.aspx': 8, '.jsp': 8
-        }
-        
-        base_priority = priority_map.get(extension.lower(), 3)
+        base_priority = self.extension_priorities.get(extension.lower(), 3)
         
         # Boost priority for authentication/security related files
-        security_keywords = ['auth', 'login', 'password', 'token', 'security', 'admin', 'api']
-        path_lower = file_path.lower()
-        
-        for keyword in security_keywords:
-            if keyword in path_lower:
-                base_priority = min(10, base_priority + 2)
-                break
+        if SECURITY_PATH_KEYWORDS_RE.search(file_path):
+            base_priority = min(10, base_priority + 2)
         
         return base_priority
     
@@ -975,22 +1278,14 @@ class CustomScannerService:
             if not rule_id or not rule_content:
                 continue
 
-            patterns = rule_parser.parse_yara_rule(rule_content)
-            if not patterns:
-                continue
-
-            # compile patterns
-            compiled_patterns = []
-            for p in patterns:
-                compiled = rule_parser.compile_pattern(p)
-                if compiled:
-                    compiled_patterns.append({**p, "compiled": compiled})
-
-            if not compiled_patterns:
+            # Parsed + compiled once per distinct rule text (memoized across scans)
+            parsed = rule_parser.parse_rule(rule_content)
+            if not parsed:
                 continue
 
-            meta = rule_parser.extract_metadata(rule_content)
-            condition = rule_parser.parse_condition(rule_content)
+            compiled_patterns = parsed["patterns"]
+            meta = parsed["meta"]
+            condition = parsed["condition"]
 
             # Merge DB fields + meta (DB wins if present)
             compiled_rules.append({
@@ -1008,6 +1303,7 @@ class CustomScannerService:
                 "meta": meta,
                 "condition": condition,
                 "patterns": compiled_patterns,
+                "gates": compile_rule_gates(condition, meta, compiled_patterns),
             })
 
         logger.info(f"✅ Compiled {len(compiled_rules)} rules (from {len(rules)} total)")
@@ -1027,8 +1323,6 @@ class CustomScannerService:
         Scan all files using compiled rules
         ✅ WITH LANGUAGE-BASED RULE FILTERING + STREAMING SAVES
         """
-        import time
-
         files_scanned = 0
         vulnerable_files_count = 0
         file_results = []
@@ -1042,63 +1336,51 @@ class CustomScannerService:
         logger.info(f"🎯 Language filtering: ENABLED")
         logger.info(f"💾 Streaming saves: ENABLED")
         
-        # Process files in batches for performance
-        for i in range(0, len(files), self.BATCH_SIZE):
-            batch = files[i: i + self.BATCH_SIZE]
-            batch_num = i//self.BATCH_SIZE + 1
-            total_batches = (len(files) + self.BATCH_SIZE - 1)//self.BATCH_SIZE
-            
-            # ✅✅✅ ADD DETAILED LOGGING ✅✅✅
-            print(f"\n{'='*80}")
-            print(f"🔄 BATCH {batch_num}/{total_batches} STARTING at {time.strftime('%H:%M:%S')}")
-            print(f"   Files in batch: {len(batch)}")
-            print(f"   Files:  {[f['path'] for f in batch]}")
-            print(f"{'='*80}\n")
-            # ✅✅✅ END ✅✅✅
-            
-            logger.info(f"Processing batch {batch_num}/{total_batches}")
-            
-            # ✅ CHECK IF SCAN WAS STOPPED
-            if self._check_if_scan_stopped(scan_id):
-                logger.info(f"⏹️ Stopping scan {scan_id} - user requested stop")
-                break  # Exit the scanning loop
-            
-            # Scan batch concurrently
-            batch_tasks = [
-                self._scan_single_file(
+        # Scan files concurrently, at most BATCH_SIZE in flight at once
+        semaphore = asyncio.Semaphore(self.BATCH_SIZE)
+        files_started = 0
+        stop_requested = False
+
+        async def scan_one(file_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            nonlocal files_started, stop_requested
+            async with semaphore:
+                if stop_requested:
+                    return None
+
+                # ✅ CHECK IF SCAN WAS STOPPED (once per BATCH_SIZE files)
+                if files_started % self.BATCH_SIZE == 0:
+                    logger.info(f"Progress: {files_started}/{len(files)} files started")
+                    if self._check_if_scan_stopped(scan_id):
+                        logger.info(f"⏹️ Stopping scan {scan_id} - user requested stop")
+                        stop_requested = True
+                        return None
+                files_started += 1
+
+                return await self._scan_single_file(
                     file_info, access_token, repo_full_name,
                     provider_type, compiled_rules, repository_id, scan_id  # ✅ pass scan_id
                 )
-                for file_info in batch
-            ]
-            
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            
-            # ✅✅✅ ADD THIS ✅✅✅
-            print(f"\n{'='*80}")
-            print(f"✅ BATCH {batch_num}/{total_batches} COMPLETE at {time.strftime('%H:%M:%S')}")
-            print(f"   Results: {len(batch_results)}")
-            print(f"{'='*80}\n")
-            # ✅✅✅ END ✅✅✅
 
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    logger.error(f"Error in batch scan: {result}")
-                    continue
-                
-                if result:
-                    files_scanned += 1
-                    file_results.append(result)
-                    
-                    # Track filtering stats
-                    total_rule_checks += result.get('total_rules_checked', 0)
-                    filtered_rule_checks += result.get('applicable_rules_count', 0)
-                    
-                    if result.get('vulnerabilities_count', 0) > 0:
-                        vulnerable_files_count += 1
-            
-            # Small delay between batches
-            await asyncio.sleep(0.5)
+        results = await asyncio.gather(
+            *(scan_one(file_info) for file_info in files),
+            return_exceptions=True
+        )
+
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error in file scan: {result}")
+                continue
+
+            if result:
+                files_scanned += 1
+                file_results.append(result)
+
+                # Track filtering stats
+                total_rule_checks += result.get('total_rules_checked', 0)
+                filtered_rule_checks += result.get('applicable_rules_count', 0)
+
+                if result.get('vulnerabilities_count', 0) > 0:
+                    vulnerable_files_count += 1
         
         # Calculate and log filtering efficiency
         if total_rule_checks > 0:
@@ -1140,7 +1422,8 @@ class CustomScannerService:
         try:
             # Get file content
             file_content_data = await self._get_file_content(
-                access_token, repo_full_name, file_path, provider_type
+                access_token, repo_full_name, file_path, provider_type,
+                sha=file_info.get('sha')
             )
             
             if not file_content_data or file_content_data.get('is_binary'):
@@ -1166,7 +1449,9 @@ class CustomScannerService:
                 }
             
             # ✅ CRITICAL: Filter rules by file language
-            applicable_rules = filter_rules_by_language(file_path, compiled_rules)
+            applicable_rules = self._filter_rules_by_language(
+                compiled_rules, detect_file_language(file_path)
+            )
             
             # Track statistics
             total_rules = len(compiled_rules)
@@ -1175,12 +1460,13 @@ class CustomScannerService:
             # Scan with ONLY applicable rules (HUGE performance boost!)
             vulnerabilities_count = 0
             
-            vulnerabilities = self._evaluate_rules_on_content(
+            vulnerabilities = await self._evaluate_rules_async(
                 file_content, file_path, applicable_rules, repository_id
             )
             
             # ✅ SAVE IMMEDIATELY to buffer (micro-batching)
             if vulnerabilities:
+                self._vulnerable_file_contents[file_path] = file_content
                 await self._add_to_vulnerability_buffer(scan_id, vulnerabilities)
                 vulnerabilities_count += len(vulnerabilities)
             
@@ -1209,15 +1495,42 @@ class CustomScannerService:
     
     def _calculate_risk_score(self, severity: str) -> float:
         """Calculate numerical risk score from severity"""
-        severity_scores = {
-            'critical': 9.5,
-            'high': 7.5,
-            'medium': 5.0,
-            'low': 2.5
-        }
-        return severity_scores.get(severity.lower(), 5.0)
+        return calculate_risk_score(severity)
     
     async def _get_file_content(
+        self,
+        access_token: str,
+        repo_full_name: str,
+        file_path: str,
+        provider_type: str,
+        sha: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get file content, served from the blob cache when the blob SHA is known.
+        Git blobs are content-addressed, so a cached (repo, sha) entry never goes stale.
+        """
+        sha = sha or self._file_shas.get((repo_full_name, file_path))
+        cache_key = (provider_type, repo_full_name, sha) if sha else None
+        
+        if cache_key:
+            self._file_shas[(repo_full_name, file_path)] = sha
+            cached = self._blob_cache.get(cache_key)
+            if cached is not None:
+                self._blob_cache.move_to_end(cache_key)
+                return cached
+        
+        file_content_data = await self._fetch_file_content(
+            access_token, repo_full_name, file_path, provider_type
+        )
+        
+        if cache_key and file_content_data is not None:
+            self._blob_cache[cache_key] = file_content_data
+            if len(self._blob_cache) > self.BLOB_CACHE_SIZE:
+                self._blob_cache.popitem(last=False)
+        
+        return file_content_data
+    
+    async def _fetch_file_content(
         self,
         access_token: str,
         repo_full_name: str,
@@ -1226,19 +1539,24 @@ class CustomScannerService:
     ) -> Optional[Dict[str, Any]]:
         """Get file content from provider"""
         try:
+            # Provider clients are blocking; run them in a worker thread so
+            # concurrent file scans actually overlap their network I/O
             if provider_type == "github":
-                return self.github_service.get_file_content(
+                return await asyncio.to_thread(
+                    self.github_service.get_file_content,
                     access_token, repo_full_name, file_path
                 )
             
             elif provider_type == "bitbucket":
                 workspace, repo_slug = repo_full_name.split("/", 1)
-                content = self.bitbucket_service.get_file_content(
+                content = await asyncio.to_thread(
+                    self.bitbucket_service.get_file_content,
                     access_token, workspace, repo_slug, file_path
                 )
                 
                 if content:
-                    return {'content': content, 'is_binary': False}
+                    is_binary = '\x00' in content[:BINARY_SNIFF_BYTES]
+                    return {'content': content, 'is_binary': is_binary}
             
             return None
             
@@ -1261,15 +1579,16 @@ class CustomScannerService:
         """
         async with self.buffer_lock:
             self.vulnerability_buffer.extend(vulnerabilities)
-            
-            # Flush when buffer reaches batch size
-            if len(self.vulnerability_buffer) >= self.VULN_SAVE_BATCH_SIZE:
-                await self._flush_vulnerability_buffer(scan_id)
+            should_flush = len(self.vulnerability_buffer) >= self.VULN_SAVE_BATCH_SIZE
+        
+        # Flush when buffer reaches batch size (outside the lock: flush takes it too)
+        if should_flush:
+            await self._flush_vulnerability_buffer(scan_id)
     
     async def _flush_vulnerability_buffer(self, scan_id: int):
         """
         Flush vulnerability buffer to database
-        ✅ SAVES IN MICRO-BATCHES (5 at a time)
+        ✅ SAVES IN MICRO-BATCHES with one multi-row INSERT per flush
         """
         async with self.buffer_lock:
             if not self.vulnerability_buffer:
@@ -1278,97 +1597,149 @@ class CustomScannerService:
             batch_to_save = self.vulnerability_buffer.copy()
             self.vulnerability_buffer.clear()
         
-        # Save batch
-        saved_count = 0
+        # Build plain row mappings; no ORM instances are needed for the insert
+        rows = []
+        row_vulns = []
         for vuln_data in batch_to_save:
             try:
-                # Truncate long fields
-                recommendation = vuln_data.get('recommendation', 'Review this issue')
-                fix_suggestion = vuln_data.get('fix_suggestion', '')
-                description = vuln_data.get('description', 'No description')
-                
-                # Limit sizes
-                if len(recommendation) > 2000:
-                    recommendation = recommendation[:1997] + "..."
-                if len(fix_suggestion) > 2000:
-                    fix_suggestion = fix_suggestion[:1997] + "..."
-                if len(description) > 1000:
-                    description = description[:997] + "..."
+                rows.append(self._build_vulnerability_row(scan_id, vuln_data))
+                row_vulns.append(vuln_data)
+            except Exception as e:
+                logger.error(f"Failed to prepare vulnerability: {vuln_data.get('title', 'Unknown')} - {str(e)[:100]}")
+                continue
+        
+        saved_indexes = self._insert_vulnerability_rows(rows)
+        if saved_indexes:
+            logger.debug(f"💾 Saved micro-batch: {len(saved_indexes)} vulnerabilities")
+        
+        # ✅ SEND SLACK ALERT FOR CRITICAL/HIGH (with limiting)
+        for index in saved_indexes:
+            vuln_data = row_vulns[index]
+            if vuln_data.get('severity', '').lower() in ['critical', 'high']:
+                await self._send_critical_alert(scan_id, vuln_data)
+    
+    def _build_vulnerability_row(self, scan_id: int, vuln_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a vulnerability dict to a vulnerabilities table row (with field truncation)"""
+        # Truncate long TEXT fields
+        recommendation = vuln_data.get('recommendation') or 'Review this issue'
+        fix_suggestion = vuln_data.get('fix_suggestion') or ''
+        description = vuln_data.get('description') or 'No description'
+        code_snippet = vuln_data.get('code_snippet') or ''
+        file_path = vuln_data.get('file_path', 'Unknown')
+        
+        # Limit sizes (only strings that are actually too long get sliced)
+        if len(recommendation) > 2000:
+            recommendation = recommendation[:1997] + "..."
+        if len(fix_suggestion) > 2000:
+            fix_suggestion = fix_suggestion[:1997] + "..."
+        if len(description) > 1000:
+            description = description[:997] + "..."
+        if len(code_snippet) > 1000:
+            code_snippet = code_snippet[:1000]
+        if len(file_path) > 500:
+            file_path = file_path[:500]
+        
+        row = {
+            'scan_id': scan_id,
+            'repository_id': vuln_data.get('repository_id'),
+            'rule_id': vuln_data.get('rule_id'),
+            'title': vuln_data.get('title', 'Unknown'),
+            'description': description,
+            'severity': vuln_data.get('severity', 'low'),
+            'category': vuln_data.get('category', 'other'),
+            'cwe_id': vuln_data.get('cwe_id'),
+            'owasp_category': vuln_data.get('owasp_category'),
+            'file_path': file_path,
+            'line_number': vuln_data.get('line_number'),
+            'line_end_number': vuln_data.get('line_end_number'),
+            'code_snippet': code_snippet or None,
+            'recommendation': recommendation,
+            'fix_suggestion': fix_suggestion,
+            'risk_score': vuln_data.get('risk_score', 0.0),
+            'exploitability': vuln_data.get('exploitability', 'low'),
+            'impact': vuln_data.get('impact', 'low'),
+            'status': 'open'
+        }
+        
+        # VARCHAR columns (title, severity, category, ...) are cut to their schema length
+        for name, limit in VULNERABILITY_COLUMN_LIMITS.items():
+            value = row.get(name)
+            if isinstance(value, str) and len(value) > limit:
+                row[name] = value[:limit]
+        
+        return row
+    
+    def _insert_vulnerability_rows(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Bulk insert vulnerability rows, VULN_INSERT_CHUNK_SIZE rows per statement/commit.
+        If a chunk fails it is retried row by row so one bad row doesn't lose the
+        rest and gets logged on its own.
+        Returns the indexes of the rows that were saved.
+        """
+        saved_indexes: List[int] = []
+        
+        for chunk_start in range(0, len(rows), self.VULN_INSERT_CHUNK_SIZE):
+            chunk = rows[chunk_start:chunk_start + self.VULN_INSERT_CHUNK_SIZE]
+            try:
+                self.db.execute(insert(Vulnerability), chunk)
+                self.db.commit()
+                saved_indexes.extend(range(chunk_start, chunk_start + len(chunk)))
+                continue
+            except Exception as e:
+                logger.error(f"Failed to bulk insert {len(chunk)} vulnerabilities, retrying row by row: {str(e)[:200]}")
+                self.db.rollback()
+            
+            for offset, row in enumerate(chunk):
+                try:
+                    self.db.execute(insert(Vulnerability), [row])
+                    self.db.commit()
+                    saved_indexes.append(chunk_start + offset)
+                except Exception as e:
+                    logger.error(f"Failed to save vulnerability: {row.get('title')} in {row.get('file_path')} - {str(e)[:200]}")
+                    self.db.rollback()
+        
+        return saved_indexes
+    
+    async def _send_critical_alert(self, scan_id: int, vuln_data: Dict[str, Any]):
+        """
+        Send an individual Slack alert, at most MAX_INDIVIDUAL_ALERTS per scan
+        """
+        # Check if we've already sent max alerts for this scan
+        alerts_sent = self.critical_alerts_sent.get(scan_id, 0)
+        
+        if alerts_sent < self.MAX_INDIVIDUAL_ALERTS:
+            try:
+                # Get repository name
+                repo = self.db.query(Repository).filter(Repository.id == vuln_data.get('repository_id')).first()
+                repo_name = repo.full_name if repo else "Unknown Repository"
                 
-                vulnerability = Vulnerability(
-                    scan_id=scan_id,
-                    repository_id=vuln_data.get('repository_id'),
-                    title=vuln_data.get('title', 'Unknown')[:255],
-                    description=description,
-                    severity=vuln_data.get('severity', 'low'),
-                    category=vuln_data.get('category', 'other'),
-                    cwe_id=vuln_data.get('cwe_id'),
-                    owasp_category=vuln_data.get('owasp_category'),
-                    file_path=vuln_data.get('file_path', 'Unknown')[:500],
+                # Get user object
+                user = self.db.query(User).filter(User.id == repo.owner_id).first() if repo else None
+
+                await slack_service.send_critical_vulnerability_alert(
+                    user=user,  # ✅ Keeps your Slack Integration fix intact!
+                    vulnerability_title=vuln_data.get('title', 'Unknown'),
+                    severity=vuln_data.get('severity', 'unknown'),
+                    repository_name=repo_name,
+                    file_path=vuln_data.get('file_path', 'Unknown'),
                     line_number=vuln_data.get('line_number'),
-                    line_end_number=vuln_data.get('line_end_number'),
-                    code_snippet=vuln_data.get('code_snippet', '')[:1000] or None,
-                    recommendation=recommendation,
-                    fix_suggestion=fix_suggestion,
-                    risk_score=vuln_data.get('risk_score', 0.0),
-                    exploitability=vuln_data.get('exploitability', 'low'),
-                    impact=vuln_data.get('impact', 'low'),
-                    status='open'
+                    code_snippet=vuln_data.get('code_snippet'),
+                    description=vuln_data.get('description', 'No description'),
+                    recommendation=vuln_data.get('recommendation', 'Review this issue'),
+                    cwe_id=vuln_data.get('cwe_id'),
+                    owasp_category=vuln_data.get('owasp_category')
                 )
                 
-                self.db.add(vulnerability)
-                saved_count += 1
-                
-                # ✅ SEND SLACK ALERT FOR CRITICAL/HIGH (with limiting)
-                if vuln_data.get('severity', '').lower() in ['critical', 'high']:
-                    # Check if we've already sent max alerts for this scan
-                    alerts_sent = self.critical_alerts_sent.get(scan_id, 0)
-                    
-                    if alerts_sent < self.MAX_INDIVIDUAL_ALERTS:
-                        try:
-                            # Get repository name
-                            repo = self.db.query(Repository).filter(Repository.id == vuln_data.get('repository_id')).first()
-                            repo_name = repo.full_name if repo else "Unknown Repository"
-                            
-                            # Get user object
-                            user = self.db.query(User).filter(User.id == repo.owner_id).first() if repo else None
-
-                            await slack_service.send_critical_vulnerability_alert(
-                                user=user,  # ✅ Keeps your Slack Integration fix intact!
-                                vulnerability_title=vuln_data.get('title', 'Unknown'),
-                                severity=vuln_data.get('severity', 'unknown'),
-                                repository_name=repo_name,
-                                file_path=vuln_data.get('file_path', 'Unknown'),
-                                line_number=vuln_data.get('line_number'),
-                                code_snippet=vuln_data.get('code_snippet'),
-                                description=vuln_data.get('description', 'No description'),
-                                recommendation=vuln_data.get('recommendation', 'Review this issue'),
-                                cwe_id=vuln_data.get('cwe_id'),
-                                owasp_category=vuln_data.get('owasp_category')
-                            )
-                            
-                            # Increment counter
-                            self.critical_alerts_sent[scan_id] = alerts_sent + 1
-                            logger.info(f"🚨 Sent Slack alert #{alerts_sent + 1} for {vuln_data.get('severity')} vulnerability")
-                            
-                        except Exception as slack_error:
-                            logger.error(f"Failed to send Slack alert: {slack_error}")
-                    elif alerts_sent == self.MAX_INDIVIDUAL_ALERTS:
-                        # Log once when we hit the limit
-                        logger.info(f"⏸️ Reached limit of {self.MAX_INDIVIDUAL_ALERTS} individual alerts. Remaining critical/high vulnerabilities will be in final summary.")
-                        self.critical_alerts_sent[scan_id] = alerts_sent + 1  # Increment so this message only shows once
+                # Increment counter
+                self.critical_alerts_sent[scan_id] = alerts_sent + 1
+                logger.info(f"🚨 Sent Slack alert #{alerts_sent + 1} for {vuln_data.get('severity')} vulnerability")
                 
-            except Exception as e:
-                logger.error(f"Failed to prepare vulnerability: {vuln_data.get('title', 'Unknown')} - {str(e)[:100]}")
-                continue
-        
-        # Commit batch
-        try:
-            self.db.commit()
-            logger.debug(f"💾 Saved micro-batch: {saved_count} vulnerabilities")
-        except Exception as e:
-            logger.error(f"Failed to commit micro-batch: {str(e)[:200]}")
-            self.db.rollback()
+            except Exception as slack_error:
+                logger.error(f"Failed to send Slack alert: {slack_error}")
+        elif alerts_sent == self.MAX_INDIVIDUAL_ALERTS:
+            # Log once when we hit the limit
+            logger.info(f"⏸️ Reached limit of {self.MAX_INDIVIDUAL_ALERTS} individual alerts. Remaining critical/high vulnerabilities will be in final summary.")
+            self.critical_alerts_sent[scan_id] = alerts_sent + 1  # Increment so this message only shows once
     
     # ═══════════════════════════════════════════════════════════════════════════
     # AI ENHANCEMENT (Runs AFTER scanning is complete)
@@ -1404,47 +1775,69 @@ class CustomScannerService:
                 vulns_by_file[vuln.file_path] = []
             vulns_by_file[vuln.file_path].append(vuln)
         
-        # Enhance each file's vulnerabilities
-        for file_path, file_vulns in vulns_by_file.items():
-            try:
-                # Get file content
-                file_content_data = await self._get_file_content(
-                    access_token, repo_full_name, file_path, provider_type
-                )
-                
-                if not file_content_data:
-                    continue
-                
-                file_content = file_content_data.get('content', '')
-                
-                # Prepare vuln data for AI
-                vuln_data = [{
+        # Reuse the content kept from the rule scan; only download what is missing
+        async def load_file(file_path: str) -> Optional[Dict[str, Any]]:
+            file_content = self._vulnerable_file_contents.get(file_path)
+            if file_content is not None:
+                return {'content': file_content}
+            return await self._get_file_content(
+                access_token, repo_full_name, file_path, provider_type
+            )
+        
+        file_paths = list(vulns_by_file)
+        file_contents = await asyncio.gather(*[
+            load_file(file_path) for file_path in file_paths
+        ], return_exceptions=True)
+        
+        contexts = []
+        for file_path, file_content_data in zip(file_paths, file_contents):
+            if isinstance(file_content_data, Exception):
+                logger.error(f"Error enhancing vulnerabilities for {file_path}: {file_content_data}")
+                continue
+            if not file_content_data:
+                continue
+            
+            # Prepare vuln data for AI
+            contexts.append({
+                'file_path': file_path,
+                'file_content': file_content_data.get('content', ''),
+                'vulnerabilities': [{
                     'title': v.title,
                     'description': v.description,
                     'severity': v.severity,
                     'line_number': v.line_number,
                     'code_snippet': v.code_snippet
-                } for v in file_vulns]
-                
-                # Get AI enhancement
-                ai_analysis = await self.llm_service.enhance_vulnerability_explanation(
-                    file_content, file_path, vuln_data
-                )
-                
-                if ai_analysis:
-                    # Update vulnerabilities in database
-                    for vuln in file_vulns:
-                        vuln.recommendation = ai_analysis.get('explanation', vuln.recommendation)[:2000]
-                        vuln.fix_suggestion = ai_analysis.get('fix_suggestion', vuln.fix_suggestion)[:2000]
-                    
-                    self.db.commit()
-                
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error enhancing vulnerabilities for {file_path}: {e}")
+                } for v in vulns_by_file[file_path]]
+            })
+        
+        # One AI request per batch of files instead of one per file
+        batches = [
+            contexts[i:i + self.AI_ENHANCEMENT_BATCH_SIZE]
+            for i in range(0, len(contexts), self.AI_ENHANCEMENT_BATCH_SIZE)
+        ]
+        batch_results = await asyncio.gather(*[
+            self.llm_service.enhance_vulnerability_explanations_batch(batch)
+            for batch in batches
+        ], return_exceptions=True)
+        
+        for batch, ai_analyses in zip(batches, batch_results):
+            if isinstance(ai_analyses, Exception):
+                logger.error(f"Error enhancing vulnerabilities for {len(batch)} files: {ai_analyses}")
                 continue
+            
+            for context, ai_analysis in zip(batch, ai_analyses):
+                if not ai_analysis:
+                    continue
+                # Update vulnerabilities in database
+                for vuln in vulns_by_file[context['file_path']]:
+                    vuln.recommendation = ai_analysis.get('explanation', vuln.recommendation)[:2000]
+                    vuln.fix_suggestion = ai_analysis.get('fix_suggestion', vuln.fix_suggestion)[:2000]
+        
+        try:
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save AI enhancements: {e}")
+            self.db.rollback()
     
     # ═══════════════════════════════════════════════════════════════════════════
     # METRICS CALCULATION
@@ -1507,6 +1900,14 @@ class CustomScannerService:
             # For unknown languages, return all rules
             return compiled_rules
         
+        # Same answer for every file of a language; compute it once per rule set
+        if compiled_rules is not self._rules_by_language_source:
+            self._rules_by_language = {}
+            self._rules_by_language_source = compiled_rules
+        cached = self._rules_by_language.get(language)
+        if cached is not None:
+            return cached
+        
         applicable_rules = []
         
         for rule in compiled_rules: 
@@ -1519,14 +1920,14 @@ class CustomScannerService:
             if rule_lang == language or rule_lang in ['multi', 'all'] or rule_lang is None:
                 applicable_rules.append(rule)
         
+        self._rules_by_language[language] = applicable_rules
         return applicable_rules
     
-    def _format_duration(self, duration) -> str:
-        """Format scan duration"""
-        total_seconds = int(duration.total_seconds())
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
+    def _format_duration_ns(self, duration_ns: int) -> str:
+        """Format scan duration given in nanoseconds"""
+        total_seconds = duration_ns // 1_000_000_000
+        minutes, seconds = divmod(total_seconds, 60)
+        hours, minutes = divmod(minutes, 60)
         
         if hours > 0:
             return f"{hours}h {minutes}m {seconds}s"
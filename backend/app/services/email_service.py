@@ -1,14 +1,144 @@
+import asyncio
 import smtplib
 import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional
 from datetime import datetime
+from jinja2 import Template
 
 logger = logging.getLogger(__name__)
 
+# One authenticated SMTP connection shared by every EmailService instance, so
+# consecutive emails skip the TCP + STARTTLS + AUTH handshake. The lock makes
+# the connection safe to use from the background email threads.
+_smtp_lock = threading.Lock()
+_smtp_connection: Optional[smtplib.SMTP] = None
+_smtp_connection_key: Optional[tuple] = None
+_smtp_last_used = 0.0
+
+# Port 465 is implicit TLS (SMTP_SSL): no plaintext greeting + STARTTLS upgrade
+SMTP_SSL_PORT = 465
+# A connection idle longer than this is checked with NOOP before reuse
+SMTP_IDLE_CHECK_SECONDS = 60
+
+# Email bodies are parsed/compiled once at import and only rendered per email
+FEEDBACK_EMAIL_TEMPLATE = Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }
+                .container { max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+                .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; text-align: center; margin-bottom: 30px; }
+                .header h1 { margin: 0; font-size: 24px; }
+                .tracking-id { background-color: #f8f9fa; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0; }
+                .field { margin: 15px 0; }
+                .field-label { font-weight: bold; color: #495057; display: inline-block; min-width: 120px; }
+                .field-value { color: #212529; }
+                .severity { padding: 4px 12px; border-radius: 20px; color: white; font-weight: bold; display: inline-block; }
+                .description-box { background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0; line-height: 1.6; }
+                .steps-box { background-color: #fff3cd; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #ffc107; }
+                .footer { text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #dee2e6; color: #6c757d; }
+                .attachments { background-color: #e7f3ff; padding: 15px; border-radius: 8px; margin: 15px 0; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>🔔 New Feedback Received</h1>
+                    <p style="margin: 5px 0 0 0; opacity: 0.9;">SecureThread Platform</p>
+                </div>
+                
+                <div class="tracking-id">
+                    <strong>Tracking ID:</strong> {{ feedback.tracking_id }}
+                </div>
+                
+                <div class="field">
+                    <span class="field-label">Type:</span>
+                    <span class="field-value">{{ type_label }}</span>
+                </div>
+                
+                {% if feedback.severity %}<div class="field">
+                    <span class="field-label">Severity:</span>
+                    <span class="severity" style="background-color: {{ severity_color }};">{{ feedback.severity }}</span>
+                </div>{% endif %}
+                
+                <div class="field">
+                    <span class="field-label">Submitted:</span>
+                    <span class="field-value">{{ submitted_at }}</span>
+                </div>
+                
+                {% if feedback.user_email %}<div class="field">
+                    <span class="field-label">User Email:</span>
+                    <span class="field-value">{{ feedback.user_email }}</span>
+                </div>{% endif %}
+                
+                <div class="description-box">
+                    <strong style="color: #495057;">Description:</strong><br><br>
+                    {{ feedback.description | replace("\n", "<br>") }}
+                </div>
+                
+                {% if feedback.steps_to_reproduce %}<div class="steps-box">
+                    <strong style="color: #856404;">Steps to Reproduce:</strong><br><br>
+                    {{ feedback.steps_to_reproduce | replace("\n", "<br>") }}
+                </div>{% endif %}
+                
+                {% if feedback.attachments %}<div class="attachments">
+                    <strong>📎 Attachments:</strong> {{ feedback.attachments | length }} file(s) uploaded
+                    <ul>
+                    {% for att in feedback.attachments %}<li><a href='http://localhost:8000/api/v1/feedback/files/{{ att.get('saved_filename', att.get('filename', 'Unknown')) }}'>{{ att.get('filename', 'Unknown file') }}</a> ({{ att.get('size', 0) }} bytes)</li>{% endfor %}
+                    </ul>
+                </div>{% endif %}
+                
+                <div class="footer">
+                    <p>This is an automated notification from SecureThread Feedback System</p>
+                    <p>Please respond to this feedback at your earliest convenience.</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """, keep_trailing_newline=True)
+
+CONFIRMATION_EMAIL_TEMPLATE = Template("""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <style>
+                    body { font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }
+                    .container { max-width: 500px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+                    .header { background: linear-gradient(135deg, #28a745 0%, #20c997 100%); color: white; padding: 20px; border-radius: 8px; text-align: center; margin-bottom: 30px; }
+                    .tracking-id { background-color: #f8f9fa; padding: 15px; border-left: 4px solid #28a745; margin: 20px 0; text-align: center; }
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h1>✅ Feedback Received</h1>
+                        <p style="margin: 5px 0 0 0; opacity: 0.9;">Thank you for your feedback!</p>
+                    </div>
+                    
+                    <p>We've successfully received your feedback and our team will review it shortly.</p>
+                    
+                    <div class="tracking-id">
+                        <strong>Your Tracking ID:</strong><br>
+                        <code style="font-size: 18px; color: #28a745;">{{ tracking_id }}</code>
+                    </div>
+                    
+                    <p>You can reference this tracking ID if you need to follow up on your feedback.</p>
+                    
+                    <p style="text-align: center; margin-top: 30px; color: #6c757d;">
+                        <em>SecureThread Team</em>
+                    </p>
+                </div>
+            </body>
+            </html>
+            """, keep_trailing_newline=True)
+
 class EmailService:
     def __init__(self):
         load_dotenv()
@@ -32,8 +162,9 @@ class EmailService:
             # Create HTML email body
             html_body = self._create_feedback_email_html(feedback_data)
             
-            # Send email
-            success = self._send_email(
+            # Send email (blocking SMTP I/O runs in a worker thread, off the event loop)
+            success = await asyncio.to_thread(
+                self._send_email,
                 to_email=self.admin_email,
                 subject=subject,
                 html_body=html_body
@@ -69,151 +200,98 @@ class EmailService:
         }
         type_label = type_labels.get(feedback_data['type'], feedback_data['type'].title())
         
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-                .container {{ max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; text-align: center; margin-bottom: 30px; }}
-                .header h1 {{ margin: 0; font-size: 24px; }}
-                .tracking-id {{ background-color: #f8f9fa; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0; }}
-                .field {{ margin: 15px 0; }}
-                .field-label {{ font-weight: bold; color: #495057; display: inline-block; min-width: 120px; }}
-                .field-value {{ color: #212529; }}
-                .severity {{ padding: 4px 12px; border-radius: 20px; color: white; font-weight: bold; display: inline-block; }}
-                .description-box {{ background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0; line-height: 1.6; }}
-                .steps-box {{ background-color: #fff3cd; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #ffc107; }}
-                .footer {{ text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #dee2e6; color: #6c757d; }}
-                .attachments {{ background-color: #e7f3ff; padding: 15px; border-radius: 8px; margin: 15px 0; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🔔 New Feedback Received</h1>
-                    <p style="margin: 5px 0 0 0; opacity: 0.9;">SecureThread Platform</p>
-                </div>
-                
-                <div class="tracking-id">
-                    <strong>Tracking ID:</strong> {feedback_data['tracking_id']}
-                </div>
-                
-                <div class="field">
-                    <span class="field-label">Type:</span>
-                    <span class="field-value">{type_label}</span>
-                </div>
-                
-                {f'''<div class="field">
-                    <span class="field-label">Severity:</span>
-                    <span class="severity" style="background-color: {severity_color};">{feedback_data.get('severity', 'Medium')}</span>
-                </div>''' if feedback_data.get('severity') else ''}
-                
-                <div class="field">
-                    <span class="field-label">Submitted:</span>
-                    <span class="field-value">{datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}</span>
-                </div>
-                
-                {f'''<div class="field">
-                    <span class="field-label">User Email:</span>
-                    <span class="field-value">{feedback_data['user_email']}</span>
-                </div>''' if feedback_data.get('user_email') else ''}
-                
-                <div class="description-box">
-                    <strong style="color: #495057;">Description:</strong><br><br>
-                    {feedback_data['description'].replace(chr(10), '<br>')}
-                </div>
-                
-                {f'''<div class="steps-box">
-                    <strong style="color: #856404;">Steps to Reproduce:</strong><br><br>
-                    {feedback_data['steps_to_reproduce'].replace(chr(10), '<br>')}
-                </div>''' if feedback_data.get('steps_to_reproduce') else ''}
-                
-                {f'''<div class="attachments">
-                    <strong>📎 Attachments:</strong> {len(feedback_data.get('attachments', []))} file(s) uploaded
-                    <ul>
-                    {''.join([f"<li><a href='http://localhost:8000/api/v1/feedback/files/{att.get('saved_filename', att.get('filename', 'Unknown'))}'>{att.get('filename', 'Unknown file')}</a> ({att.get('size', 0)} bytes)</li>" for att in feedback_data.get('attachments', [])])}
-                    </ul>
-                </div>''' if feedback_data.get('attachments') else ''}
-                
-                <div class="footer">
-                    <p>This is an automated notification from SecureThread Feedback System</p>
-                    <p>Please respond to this feedback at your earliest convenience.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return FEEDBACK_EMAIL_TEMPLATE.render(
+            feedback=feedback_data,
+            severity_color=severity_color,
+            type_label=type_label,
+            submitted_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
+        )
+    
+    def _render_message(self, to_email: str, subject: str, html_body: str) -> bytes:
+        """Build the MIME message and serialize it once, ready for sendmail"""
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = f"SecureThread Feedback System <{self.sender_email}>"
+        message["To"] = to_email
         
-        return html_body
+        # Add HTML body
+        html_part = MIMEText(html_body, "html")
+        message.attach(html_part)
+        
+        return message.as_bytes()
     
     def _send_email(self, to_email: str, subject: str, html_body: str) -> bool:
         """Send email using SMTP"""
         try:
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"SecureThread Feedback System <{self.sender_email}>"
-            message["To"] = to_email
-            
-            # Add HTML body
-            html_part = MIMEText(html_body, "html")
-            message.attach(html_part)
+            # Serialized before taking the lock, and reused if the send is retried
+            rendered = self._render_message(to_email, subject, html_body)
             
-            # Connect to server and send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()  # Enable encryption
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, to_email, message.as_string())
+            with _smtp_lock:
+                try:
+                    self._get_smtp_connection().sendmail(self.sender_email, to_email, rendered)
+                except smtplib.SMTPServerDisconnected:
+                    # Server dropped the idle connection; reconnect once and retry
+                    self._close_smtp_connection()
+                    self._get_smtp_connection().sendmail(self.sender_email, to_email, rendered)
             
             return True
             
         except Exception as e:
             logger.error(f"SMTP error: {str(e)}")
+            with _smtp_lock:
+                self._close_smtp_connection()
             return False
     
+    def _get_smtp_connection(self) -> smtplib.SMTP:
+        """Return the shared SMTP connection, connecting and logging in if needed (caller holds _smtp_lock)"""
+        global _smtp_connection, _smtp_connection_key, _smtp_last_used
+        
+        key = (self.smtp_server, self.smtp_port, self.sender_email)
+        if _smtp_connection is not None and _smtp_connection_key != key:
+            self._close_smtp_connection()
+        
+        # Servers drop idle sessions; probe with NOOP instead of failing mid-send
+        if _smtp_connection is not None and time.monotonic() - _smtp_last_used > SMTP_IDLE_CHECK_SECONDS:
+            try:
+                alive = _smtp_connection.noop()[0] == 250
+            except smtplib.SMTPException:
+                alive = False
+            if not alive:
+                self._close_smtp_connection()
+        
+        if _smtp_connection is None:
+            if self.smtp_port == SMTP_SSL_PORT:
+                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=30)
+            else:
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+                server.starttls()  # Enable encryption
+            server.login(self.sender_email, self.sender_password)
+            _smtp_connection = server
+            _smtp_connection_key = key
+        
+        _smtp_last_used = time.monotonic()
+        return _smtp_connection
+    
+    def _close_smtp_connection(self):
+        """Drop the shared SMTP connection (caller holds _smtp_lock)"""
+        global _smtp_connection, _smtp_connection_key
+        
+        if _smtp_connection is not None:
+            try:
+                _smtp_connection.quit()
+            except Exception:
+                pass
+        _smtp_connection = None
+        _smtp_connection_key = None
+    
     async def send_feedback_confirmation(self, user_email: str, tracking_id: str) -> bool:
         """Send confirmation email to the user who submitted feedback"""
         try:
             subject = f"Feedback Received - {tracking_id}"
             
-            html_body = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-                    .container {{ max-width: 500px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                    .header {{ background: linear-gradient(135deg, #28a745 0%, #20c997 100%); color: white; padding: 20px; border-radius: 8px; text-align: center; margin-bottom: 30px; }}
-                    .tracking-id {{ background-color: #f8f9fa; padding: 15px; border-left: 4px solid #28a745; margin: 20px 0; text-align: center; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>✅ Feedback Received</h1>
-                        <p style="margin: 5px 0 0 0; opacity: 0.9;">Thank you for your feedback!</p>
-                    </div>
-                    
-                    <p>We've successfully received your feedback and our team will review it shortly.</p>
-                    
-                    <div class="tracking-id">
-                        <strong>Your Tracking ID:</strong><br>
-                        <code style="font-size: 18px; color: #28a745;">{tracking_id}</code>
-                    </div>
-                    
-                    <p>You can reference this tracking ID if you need to follow up on your feedback.</p>
-                    
-                    <p style="text-align: center; margin-top: 30px; color: #6c757d;">
-                        <em>SecureThread Team</em>
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
+            html_body = CONFIRMATION_EMAIL_TEMPLATE.render(tracking_id=tracking_id)
             
-            return await self._send_email(user_email, subject, html_body)
+            return await asyncio.to_thread(self._send_email, user_email, subject, html_body)
             
         except Exception as e:
             logger.error(f"Error sending confirmation email: {str(e)}")
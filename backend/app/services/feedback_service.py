@@ -1,25 +1,45 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import String, func, insert, literal, tuple_, update
+from typing import Iterator, Optional, List, Tuple
+from fastapi import BackgroundTasks
 from app.models.feedback import Feedback, FeedbackType, SeverityLevel, FeedbackStatus
 from app.models.user import User
 from app.services.email_service import EmailService
-import uuid
+import time
+import base64
+import secrets
 from datetime import datetime
 import json
 import logging
-import asyncio
 
 logger = logging.getLogger(__name__)
 
+
+def encode_feedback_cursor(feedback: Feedback) -> str:
+    """Opaque cursor for the page after this feedback (its created_at + id)"""
+    raw = f"{feedback.created_at.isoformat()}|{feedback.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_feedback_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_feedback_cursor; raises ValueError on a malformed cursor"""
+    try:
+        created_at, feedback_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(feedback_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 class FeedbackService:
+    FEEDBACK_STREAM_BATCH_SIZE = 500
+    
     def __init__(self, db: Session):
         self.db = db
         self.email_service = EmailService()
     
     def generate_tracking_id(self) -> str:
         """Generate unique tracking ID for feedback"""
-        timestamp = int(datetime.now().timestamp())
-        unique_id = str(uuid.uuid4())[:8].upper()
+        timestamp = time.time_ns() // 1_000_000_000
+        unique_id = secrets.token_hex(4).upper()
         return f"FBK-{timestamp}-{unique_id}"
     
     async def create_feedback_async(self, feedback_data: dict, user_id: Optional[int] = None) -> Feedback:
@@ -28,17 +48,7 @@ class FeedbackService:
             tracking_id = self.generate_tracking_id()
             
             # Create feedback object
-            feedback = Feedback(
-                tracking_id=tracking_id,
-                type=FeedbackType(feedback_data["type"]),
-                severity=SeverityLevel(feedback_data.get("severity", "Medium")),
-                description=feedback_data["description"],
-                steps_to_reproduce=feedback_data.get("stepsToReproduce"),
-                user_id=user_id,
-                user_email=feedback_data.get("userEmail"),
-                status=FeedbackStatus.submitted,
-                attachments=json.dumps(feedback_data.get("attachments", []))
-            )
+            feedback = Feedback(**self._build_feedback_row(feedback_data, tracking_id, user_id))
             
             self.db.add(feedback)
             self.db.commit()
@@ -56,23 +66,21 @@ class FeedbackService:
             self.db.rollback()
             raise e
     
-    def create_feedback(self, feedback_data: dict, user_id: Optional[int] = None) -> Feedback:
-        """Create new feedback submission and send email notification (sync version with background email)"""
+    def create_feedback(
+        self,
+        feedback_data: dict,
+        background_tasks: BackgroundTasks,
+        user_id: Optional[int] = None
+    ) -> Feedback:
+        """
+        Create new feedback submission and send email notification (sync version with background email).
+        The emails run on the app's event loop after the response is sent.
+        """
         try:
             tracking_id = self.generate_tracking_id()
             
             # Create feedback object
-            feedback = Feedback(
-                tracking_id=tracking_id,
-                type=FeedbackType(feedback_data["type"]),
-                severity=SeverityLevel(feedback_data.get("severity", "Medium")),
-                description=feedback_data["description"],
-                steps_to_reproduce=feedback_data.get("stepsToReproduce"),
-                user_id=user_id,
-                user_email=feedback_data.get("userEmail"),
-                status=FeedbackStatus.submitted,
-                attachments=json.dumps(feedback_data.get("attachments", []))
-            )
+            feedback = Feedback(**self._build_feedback_row(feedback_data, tracking_id, user_id))
             
             self.db.add(feedback)
             self.db.commit()
@@ -80,8 +88,8 @@ class FeedbackService:
             
             logger.info(f"Created feedback with tracking ID: {tracking_id}")
             
-            # Send email notification in background thread (non-blocking)
-            self._send_email_notifications_background(feedback_data, tracking_id)
+            # Send email notification in the background (non-blocking)
+            background_tasks.add_task(self._send_email_notifications_async, feedback_data, tracking_id)
             
             return feedback
             
@@ -90,6 +98,44 @@ class FeedbackService:
             self.db.rollback()
             raise e
     
+    def create_feedback_bulk(self, items: List[dict], user_id: Optional[int] = None) -> List[str]:
+        """
+        Insert many feedback submissions in one executemany INSERT and one commit (e.g. admin imports).
+        No notification emails are sent; returns the generated tracking IDs in input order.
+        """
+        try:
+            tracking_ids = [self.generate_tracking_id() for _ in items]
+            rows = [
+                self._build_feedback_row(feedback_data, tracking_id, user_id)
+                for feedback_data, tracking_id in zip(items, tracking_ids)
+            ]
+            if rows:
+                self.db.execute(insert(Feedback), rows)
+                self.db.commit()
+            
+            logger.info(f"Bulk-created {len(rows)} feedback entries")
+            return tracking_ids
+            
+        except Exception as e:
+            logger.error(f"Error bulk-creating feedback: {str(e)}")
+            self.db.rollback()
+            raise e
+    
+    @staticmethod
+    def _build_feedback_row(feedback_data: dict, tracking_id: str, user_id: Optional[int]) -> dict:
+        """Column values for a new feedback submission"""
+        return {
+            "tracking_id": tracking_id,
+            "type": FeedbackType(feedback_data["type"]),
+            "severity": SeverityLevel(feedback_data.get("severity", "Medium")),
+            "description": feedback_data["description"],
+            "steps_to_reproduce": feedback_data.get("stepsToReproduce"),
+            "user_id": user_id,
+            "user_email": feedback_data.get("userEmail"),
+            "status": FeedbackStatus.submitted,
+            "attachments": json.dumps(feedback_data.get("attachments", [])),
+        }
+    
     async def _send_email_notifications_async(self, feedback_data: dict, tracking_id: str):
         """Send email notifications (async version)"""
         try:
@@ -123,74 +169,40 @@ class FeedbackService:
             logger.error(f"Error sending email notifications: {str(e)}")
             # Don't raise exception - feedback should still be saved even if email fails
     
-    def _send_email_notifications_background(self, feedback_data: dict, tracking_id: str):
-        """Send email notifications in background thread to avoid event loop conflicts"""
-        import threading
-        
-        def send_emails():
-            try:
-                # Prepare email data
-                email_data = {
-                    'tracking_id': tracking_id,
-                    'type': feedback_data["type"],
-                    'severity': feedback_data.get("severity", "Medium"),
-                    'description': feedback_data["description"],
-                    'steps_to_reproduce': feedback_data.get("stepsToReproduce"),
-                    'user_email': feedback_data.get("userEmail"),
-                    'attachments': feedback_data.get("attachments", [])
-                }
-                
-                # Create new event loop for this thread
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                try:
-                    # Send notification to admin
-                    admin_success = loop.run_until_complete(
-                        self.email_service.send_feedback_notification(email_data)
-                    )
-                    
-                    # Send confirmation to user if email provided
-                    if feedback_data.get("userEmail"):
-                        user_success = loop.run_until_complete(
-                            self.email_service.send_feedback_confirmation(
-                                feedback_data["userEmail"], 
-                                tracking_id
-                            )
-                        )
-                        if user_success:
-                            logger.info(f"Confirmation email sent to user for {tracking_id}")
-                    
-                    if admin_success:
-                        logger.info(f"Admin notification email sent for {tracking_id}")
-                        
-                finally:
-                    loop.close()
-                    
-            except Exception as e:
-                logger.error(f"Error sending email notifications in background: {str(e)}")
-        
-        # Start email sending in background thread
-        thread = threading.Thread(target=send_emails, daemon=True)
-        thread.start()
-    
     def get_feedback_by_tracking_id(self, tracking_id: str) -> Optional[Feedback]:
         """Get feedback by tracking ID"""
         return self.db.query(Feedback).filter(
             Feedback.tracking_id == tracking_id
         ).first()
     
-    def get_user_feedback(self, user_id: int, limit: int = 50) -> List[Feedback]:
-        """Get all feedback submitted by a user"""
-        return self.db.query(Feedback).filter(
-            Feedback.user_id == user_id
-        ).order_by(Feedback.created_at.desc()).limit(limit).all()
+    def get_user_feedback(self, user_id: int, limit: int = 50,
+                          after: Optional[Tuple[datetime, int]] = None) -> List[Feedback]:
+        """Get feedback submitted by a user, newest first; `after` is the (created_at, id) of the previous page's last item"""
+        query = self.db.query(Feedback).filter(Feedback.user_id == user_id)
+        return self._paginate(query, limit, after)
     
     def get_all_feedback(self, 
                         status: Optional[FeedbackStatus] = None,
                         feedback_type: Optional[FeedbackType] = None,
-                        limit: int = 100) -> List[Feedback]:
-        """Get all feedback with optional filtering"""
+                        limit: int = 100,
+                        after: Optional[Tuple[datetime, int]] = None) -> List[Feedback]:
+        """Get all feedback with optional filtering, newest first (keyset-paginated like get_user_feedback)"""
+        return self._paginate(self._filtered_feedback_query(status, feedback_type), limit, after)
+    
+    def iter_all_feedback(self,
+                          status: Optional[FeedbackStatus] = None,
+                          feedback_type: Optional[FeedbackType] = None) -> Iterator[Feedback]:
+        """
+        Stream every matching feedback, newest first, for exports/reports.
+        Rows are fetched FEEDBACK_STREAM_BATCH_SIZE at a time, so memory stays bounded.
+        """
+        query = self._filtered_feedback_query(status, feedback_type).order_by(
+            Feedback.created_at.desc(), Feedback.id.desc()
+        ).yield_per(self.FEEDBACK_STREAM_BATCH_SIZE)
+        yield from query
+    
+    def _filtered_feedback_query(self, status: Optional[FeedbackStatus],
+                                 feedback_type: Optional[FeedbackType]):
         query = self.db.query(Feedback)
         
         if status:
@@ -199,16 +211,30 @@ class FeedbackService:
         if feedback_type:
             query = query.filter(Feedback.type == feedback_type)
         
-        return query.order_by(Feedback.created_at.desc()).limit(limit).all()
+        return query
+    
+    def _paginate(self, query, limit: int, after: Optional[Tuple[datetime, int]]) -> List[Feedback]:
+        """Keyset pagination on (created_at, id): each page is an index seek, however deep"""
+        if after is not None:
+            after_created_at, after_id = after
+            if self.db.get_bind().dialect.name == "sqlite":
+                # SQLite (local dev) keeps DateTime as text and now() writes 'YYYY-MM-DD HH:MM:SS', but a
+                # bound datetime always gets '.ffffff', so compare against the cursor in the stored form
+                after_created_at = literal(after_created_at.replace(tzinfo=None).isoformat(sep=" "), String)
+            query = query.filter(tuple_(Feedback.created_at, Feedback.id) < tuple_(after_created_at, after_id))
+        return query.order_by(Feedback.created_at.desc(), Feedback.id.desc()).limit(limit).all()
     
     def update_feedback_status(self, tracking_id: str, status: FeedbackStatus) -> Optional[Feedback]:
-        """Update feedback status"""
+        """Update feedback status (a single UPDATE ... RETURNING on the unique tracking_id index)"""
         try:
-            feedback = self.get_feedback_by_tracking_id(tracking_id)
+            feedback = self.db.execute(
+                update(Feedback)
+                .where(Feedback.tracking_id == tracking_id)
+                .values(status=status)
+                .returning(Feedback)
+            ).scalar_one_or_none()
+            self.db.commit()
             if feedback:
-                feedback.status = status
-                self.db.commit()
-                self.db.refresh(feedback)
                 logger.info(f"Updated feedback {tracking_id} status to {status}")
             return feedback
         except Exception as e:
@@ -219,23 +245,20 @@ class FeedbackService:
     def get_feedback_stats(self) -> dict:
         """Get feedback statistics"""
         try:
-            total_feedback = self.db.query(Feedback).count()
-            
-            # Count by type
-            type_counts = {}
-            for feedback_type in FeedbackType:
-                count = self.db.query(Feedback).filter(
-                    Feedback.type == feedback_type
-                ).count()
-                type_counts[feedback_type.value] = count
-            
-            # Count by status
-            status_counts = {}
-            for status in FeedbackStatus:
-                count = self.db.query(Feedback).filter(
-                    Feedback.status == status
-                ).count()
-                status_counts[status.value] = count
+            # One GROUP BY (type, status) gives the total and both breakdowns
+            rows = self.db.query(
+                Feedback.type, Feedback.status, func.count(Feedback.id)
+            ).group_by(Feedback.type, Feedback.status).all()
+            
+            type_counts = {feedback_type.value: 0 for feedback_type in FeedbackType}
+            status_counts = {status.value: 0 for status in FeedbackStatus}
+            total_feedback = 0
+            for feedback_type, status, count in rows:
+                total_feedback += count
+                if feedback_type is not None:
+                    type_counts[feedback_type.value] += count
+                if status is not None:
+                    status_counts[status.value] += count
             
             return {
                 "total_feedback": total_feedback,
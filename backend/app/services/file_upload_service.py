@@ -2,16 +2,75 @@
 
 import os
 import uuid
+import asyncio
+import codecs
 import hashlib
 import tempfile
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from fastapi import UploadFile, HTTPException
 from app.core.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Line prefixes used for the code-file metadata in process_uploaded_files
+COMMENT_LINE_PREFIXES = ('#', '//', '/*', '*', '<--')
+IMPORT_LINE_PREFIXES = ('import ', 'from ', 'include ', '#include', 'require', 'use ')
+
+# Uploads are hashed, written and decoded chunk by chunk (see _UploadSink) instead of read whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Upper bound on uploads saved concurrently by process_uploaded_files
+MAX_CONCURRENT_UPLOADS = 8
+
+class _UploadSink:
+    """Writes an upload to disk chunk by chunk, hashing (for integrity) and
+    decoding it as UTF-8 (for code analysis) in the same pass"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.size = 0
+        self._file = open(path, "wb")
+        self._hasher = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._text_parts: Optional[List[str]] = []
+    
+    def write(self, chunk: bytes):
+        self._hasher.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+        if self._text_parts is not None:
+            try:
+                self._text_parts.append(self._decoder.decode(chunk))
+            except UnicodeDecodeError:
+                self._text_parts = None
+    
+    def close(self):
+        self._file.close()
+    
+    def discard(self):
+        """Close and delete a partially written upload"""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+    
+    def finish(self) -> Tuple[int, str, str, int]:
+        """Return (size, sha256 hex digest, text content, line count) once closed"""
+        text_content = None
+        if self._text_parts is not None:
+            try:
+                self._text_parts.append(self._decoder.decode(b"", final=True))
+                text_content = "".join(self._text_parts)
+            except UnicodeDecodeError:
+                pass  # Truncated UTF-8 sequence at the end of the file
+            self._text_parts = None
+        if text_content is None:
+            # Not UTF-8: latin-1 maps every byte, so this always succeeds
+            text_content = self.path.read_bytes().decode("latin-1")
+        line_count = len(text_content.splitlines()) if text_content else 0
+        return self.size, self._hasher.hexdigest(), text_content, line_count
+
+
 class FileUploadService:
     def __init__(self):
         self.upload_dir = Path(settings.UPLOAD_DIR)
@@ -23,12 +82,15 @@ class FileUploadService:
         
     def validate_file(self, file: UploadFile) -> Dict[str, Any]:
         """Validate uploaded file for security and format checks"""
-        # Check file size
-        if hasattr(file.file, 'seek') and hasattr(file.file, 'tell'):
+        # Check file size; Starlette records it while parsing the upload, so only
+        # seek through the spooled file when it is unknown
+        size = getattr(file, 'size', None)
+        if size is None and hasattr(file.file, 'seek') and hasattr(file.file, 'tell'):
             file.file.seek(0, 2)  # Seek to end
             size = file.file.tell()
             file.file.seek(0)  # Reset to beginning
-            
+        
+        if size is not None:
             if size > settings.MAX_FILE_SIZE:
                 raise HTTPException(
                     status_code=413,
@@ -37,7 +99,7 @@ class FileUploadService:
         
         # Check file extension
         if file.filename:
-            file_ext = Path(file.filename).suffix.lower()
+            file_ext = os.path.splitext(file.filename)[1].lower()
             if file_ext not in settings.ALLOWED_FILE_EXTENSIONS:
                 raise HTTPException(
                     status_code=400,
@@ -49,7 +111,7 @@ class FileUploadService:
         return {
             "filename": file.filename,
             "content_type": file.content_type,
-            "size": size if 'size' in locals() else None,
+            "size": size,
             "extension": file_ext
         }
     
@@ -66,45 +128,33 @@ class FileUploadService:
             temp_filename = f"{file_id}_{original_name}"
             temp_path = self.upload_dir / "temporary" / temp_filename
             
-            # Read and save file content
-            content = await file.read()
-            
-            # Calculate file hash for integrity
-            file_hash = hashlib.sha256(content).hexdigest()
-            
-            # Save to temporary location
-            with open(temp_path, "wb") as f:
-                f.write(content)
-            
-            # Try to decode as text for code analysis
+            # Stream the upload to the temporary location; hashing, writing and
+            # decoding each chunk runs in a worker thread to keep the event loop free
+            sink = _UploadSink(temp_path)
             try:
-                # Try different encodings
-                for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                    try:
-                        text_content = content.decode(encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    # If all encodings fail, treat as binary
-                    text_content = None
-            except Exception:
-                text_content = None
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(sink.write, chunk)
+                sink.close()
+                size, file_hash, text_content, line_count = await asyncio.to_thread(sink.finish)
+            except BaseException:
+                # Don't leave a partial file behind if the stream, the disk or the request fails midway
+                sink.discard()
+                raise
             
             file_info = {
                 "file_id": file_id,
                 "original_name": original_name,
                 "temp_path": str(temp_path),
-                "size": len(content),
+                "size": size,
                 "hash": file_hash,
                 "extension": extension,
                 "content_type": validation_info["content_type"],
                 "text_content": text_content,
                 "is_text": text_content is not None,
-                "line_count": len(text_content.splitlines()) if text_content else 0
+                "line_count": line_count
             }
             
-            logger.info(f"Saved temporary file: {original_name} ({len(content)} bytes)")
+            logger.info(f"Saved temporary file: {original_name} ({size} bytes)")
             return file_info
             
         except HTTPException:
@@ -115,62 +165,69 @@ class FileUploadService:
     
     async def process_uploaded_files(self, files: List[UploadFile]) -> List[Dict[str, Any]]:
         """Process multiple uploaded files for vulnerability analysis"""
-        processed_files = []
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
         
-        for file in files:
-            try:
-                file_info = await self.save_temporary_file(file)
-                
-                # Additional processing for code files
-                if file_info["is_text"] and file_info["text_content"]:
-                    # Basic code analysis metadata
-                    content = file_info["text_content"]
-                    
-                    # Count lines of actual code (non-empty, non-comment)
-                    lines = content.splitlines()
-                    code_lines = []
-                    comment_lines = []
-                    
-                    for line in lines:
-                        stripped = line.strip()
-                        if not stripped:
-                            continue
-                        elif stripped.startswith(('#', '//', '/*', '*', '<--')):
-                            comment_lines.append(line)
-                        else:
-                            code_lines.append(line)
-                    
-                    # Extract imports/includes
-                    imports = []
-                    for line in lines[:50]:  # Check first 50 lines for imports
-                        stripped = line.strip()
-                        if any(stripped.startswith(keyword) for keyword in [
-                            'import ', 'from ', 'include ', '#include', 'require', 'use '
-                        ]):
-                            imports.append(stripped)
-                    
-                    file_info.update({
-                        "total_lines": len(lines),
-                        "code_lines": len(code_lines),
-                        "comment_lines": len(comment_lines),
-                        "imports": imports[:10],  # Limit to first 10 imports
-                        "preview": content[:500] + "..." if len(content) > 500 else content
-                    })
-                
-                processed_files.append(file_info)
-                
-            except HTTPException as e:
-                # Add error info but continue processing other files
-                processed_files.append({
-                    "original_name": getattr(file, 'filename', 'unknown'),
-                    "error": e.detail,
-                    "status": "error"
-                })
+        async def process_with_limit(file: UploadFile) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._process_uploaded_file(file)
         
-        return processed_files
+        # gather keeps results in the same order as the uploaded files
+        return list(await asyncio.gather(*[process_with_limit(file) for file in files]))
     
-    def cleanup_temporary_files(self, file_ids: List[str]):
-        """Clean up temporary files after processing"""
+    async def _process_uploaded_file(self, file: UploadFile) -> Dict[str, Any]:
+        """Save one uploaded file and attach code metadata, or return its error info"""
+        try:
+            file_info = await self.save_temporary_file(file)
+        except HTTPException as e:
+            # Add error info but continue processing other files
+            return {
+                "original_name": getattr(file, 'filename', 'unknown'),
+                "error": e.detail,
+                "status": "error"
+            }
+        
+        # Additional processing for code files
+        if file_info["is_text"] and file_info["text_content"]:
+            # Line scanning is CPU-bound, so keep it off the event loop
+            file_info.update(await asyncio.to_thread(self._code_metadata, file_info["text_content"]))
+        
+        return file_info
+    
+    @staticmethod
+    def _code_metadata(content: str) -> Dict[str, Any]:
+        """Basic code analysis metadata for a decoded text file"""
+        # Count lines of actual code (non-empty, non-comment); each line is stripped once
+        stripped_lines = [line.strip() for line in content.splitlines()]
+        non_empty_lines = sum(1 for stripped in stripped_lines if stripped)
+        comment_lines = sum(1 for stripped in stripped_lines if stripped.startswith(COMMENT_LINE_PREFIXES))
+        
+        # Extract imports/includes
+        imports = [
+            stripped for stripped in stripped_lines[:50]  # Check first 50 lines for imports
+            if stripped.startswith(IMPORT_LINE_PREFIXES)
+        ]
+        
+        return {
+            "total_lines": len(stripped_lines),
+            "code_lines": non_empty_lines - comment_lines,
+            "comment_lines": comment_lines,
+            "imports": imports[:10],  # Limit to first 10 imports
+            "preview": content[:500] + "..." if len(content) > 500 else content
+        }
+    
+    def cleanup_temporary_files(self, temp_paths: List[str]):
+        """Clean up temporary files after processing, given the temp_path of each saved file"""
+        for temp_path in temp_paths:
+            try:
+                os.unlink(temp_path)
+                logger.info(f"Cleaned up temporary file: {temp_path}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Error cleaning up file {temp_path}: {e}")
+    
+    def cleanup_temporary_files_by_id(self, file_ids: List[str]):
+        """Clean up temporary files by file_id when their paths are unknown (lists the directory per id)"""
         for file_id in file_ids:
             try:
                 # Find and remove temporary files with this file_id
@@ -184,13 +241,12 @@ class FileUploadService:
     def get_file_content(self, file_path: str) -> Optional[str]:
         """Safely read file content for analysis"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except UnicodeDecodeError:
-            try:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    return f.read()
-            except Exception:
-                return None
+            with open(file_path, 'rb') as f:
+                content = f.read()
         except Exception:
-            return None
\ No newline at end of file
+            return None
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            # latin-1 maps every byte, so this fallback never raises
+            return content.decode('latin-1')
\ No newline at end of file
@@ -1,62 +1,104 @@
 # backend/app/services/github_pr_service.py
 
+import time
 import httpx
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
-from sqlalchemy.orm import Session
-from datetime import datetime
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, timezone
 import base64
+import codecs
 
 from app.models.user import User
 from app.models.repository import Repository
 from app.models.vulnerability import Vulnerability
 from app.utils.encryption import encrypt, decrypt
+from app.services.github_service import (
+    cache_token_validation,
+    get_cached_token_validation,
+    github_json,
+    github_request,
+    github_stream,
+    token_validation_from_user,
+)
 
 logger = logging.getLogger(__name__)
 
+# user_id -> (expires_at, decrypted PAT). GitHubPRService is created per request, so the
+# cache lives at module level; entries are dropped on save/delete and expire after the TTL
+PAT_CACHE_SIZE = 1024
+PAT_CACHE_TTL_SECONDS = 300
+_pat_cache: "OrderedDict[int, Tuple[float, str]]" = OrderedDict()
+
+BRANCH_TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+# createCommitOnBranch takes the whole change set base64-encoded in one request body, so
+# larger change sets go through the REST Git Data API (blobs -> tree -> commit -> ref)
+GRAPHQL_MAX_COMMIT_BYTES = 10 * 1024 * 1024
+
+CREATE_COMMIT_ON_BRANCH_MUTATION = """
+mutation($input: CreateCommitOnBranchInput!) {
+  createCommitOnBranch(input: $input) {
+    commit { oid url }
+  }
+}
+"""
+
 
 class GitHubPRService:
     """Service for creating GitHub Pull Requests with vulnerability fixes"""
     
-    GITHUB_API_BASE = "https://api.github.com"
+    # Cap on concurrent GitHub requests per workflow (secondary rate limits)
+    MAX_CONCURRENT_REQUESTS = 8
     
     def __init__(self, db: Session):
         self.db = db
+        # One service instance serves one request/workflow, so auth headers are built once per token
+        self._headers_by_token: Dict[str, Dict[str, str]] = {}
+    
+    def _auth_headers(self, pat_token: str) -> Dict[str, str]:
+        """Authorization header for a PAT (Accept/User-Agent/API version come from the shared client)"""
+        headers = self._headers_by_token.get(pat_token)
+        if headers is None:
+            headers = self._headers_by_token[pat_token] = {"Authorization": f"token {pat_token}"}
+        return headers
     
     async def validate_pat_token(self, pat_token: str) -> Dict[str, Any]:
         """
-        Validate GitHub Personal Access Token
+        Validate GitHub Personal Access Token (successful validations are cached for
+        TOKEN_VALIDATION_TTL_SECONDS, or until GitHub rejects the token)
         
         Returns:
             Dict with user info if valid, raises exception if invalid
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.GITHUB_API_BASE}/user",
-                    headers={
-                        "Authorization": f"token {pat_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    },
-                    timeout=10.0
-                )
+            headers = self._auth_headers(pat_token)
+            cached = get_cached_token_validation(headers["Authorization"])
+            if cached is not None:
+                return dict(cached)
+            
+            response = await github_request(
+                "GET",
+                "/user",
+                headers=headers,
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                validation = token_validation_from_user(response)
+                logger.info(f"PAT token validated for GitHub user: {validation['github_username']}")
+                cache_token_validation(headers["Authorization"], validation)
+                return dict(validation)
+            elif response.status_code == 401:
+                logger.warning("Invalid GitHub PAT token")
+                return {"valid": False, "error": "Invalid token"}
+            else: 
+                logger.error(f"GitHub API error: {response.status_code}")
+                return {"valid": False, "error": f"GitHub API error: {response.status_code}"}
                 
-                if response.status_code == 200:
-                    user_data = response.json()
-                    logger.info(f"PAT token validated for GitHub user: {user_data.get('login')}")
-                    return {
-                        "valid": True,
-                        "github_username": user_data.get("login"),
-                        "github_id": user_data.get("id"),
-                        "scopes": response.headers.get("X-OAuth-Scopes", "").split(", ")
-                    }
-                elif response.status_code == 401:
-                    logger.warning("Invalid GitHub PAT token")
-                    return {"valid": False, "error": "Invalid token"}
-                else: 
-                    logger.error(f"GitHub API error: {response.status_code}")
-                    return {"valid": False, "error": f"GitHub API error: {response.status_code}"}
-                    
         except httpx.TimeoutException:
             logger.error("GitHub API timeout during PAT validation")
             return {"valid": False, "error": "Request timeout"}
@@ -90,9 +132,10 @@ class GitHubPRService:
                 raise ValueError("User not found")
             
             user.github_pat_encrypted = encrypted_token
-            user.github_pat_created_at = datetime.utcnow()
+            user.github_pat_created_at = datetime.now(timezone.utc)
             
             self.db.commit()
+            _pat_cache.pop(user_id, None)
             logger.info(f"PAT token saved for user {user_id}")
             return True
             
@@ -103,18 +146,30 @@ class GitHubPRService:
     
     async def get_pat_token(self, user_id: int) -> Optional[str]:
         """
-        Retrieve and decrypt PAT token for user
+        Retrieve and decrypt PAT token for user (cached for PAT_CACHE_TTL_SECONDS)
         
         Returns:
             Decrypted PAT token or None if not found
         """
         try:
+            cached = _pat_cache.get(user_id)
+            if cached and cached[0] > time.monotonic():
+                _pat_cache.move_to_end(user_id)
+                return cached[1]
+            
             user = self.db.query(User).filter(User.id == user_id).first()
             if not user or not user.github_pat_encrypted:
+                _pat_cache.pop(user_id, None)
                 return None
             
             # Decrypt token
             decrypted_token = decrypt(user.github_pat_encrypted)
+            
+            _pat_cache[user_id] = (time.monotonic() + PAT_CACHE_TTL_SECONDS, decrypted_token)
+            _pat_cache.move_to_end(user_id)
+            if len(_pat_cache) > PAT_CACHE_SIZE:
+                _pat_cache.popitem(last=False)
+            
             return decrypted_token
             
         except Exception as e:
@@ -132,6 +187,7 @@ class GitHubPRService:
             user.github_pat_created_at = None
             
             self.db.commit()
+            _pat_cache.pop(user_id, None)
             logger.info(f"PAT token deleted for user {user_id}")
             return True
             
@@ -155,38 +211,54 @@ class GitHubPRService:
             Dict with content, sha, and encoding
         """
         try:
-            url = f"{self.GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{file_path}"
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "Authorization": f"token {pat_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    },
-                    params={"ref": branch},
-                    timeout=15.0
-                )
+            url = f"/repos/{owner}/{repo}/contents/{file_path}"
+            
+            response = await github_request(
+                "GET",
+                url,
+                headers=self._auth_headers(pat_token),
+                params={"ref": branch},
+                timeout=15.0
+            )
+            
+            if response.status_code == 200:
+                data = github_json(response)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    
+                if data["encoding"] == "base64":
                     # Decode base64 content
                     content = base64.b64decode(data["content"]).decode("utf-8")
-                    
-                    return {
-                        "success": True,
-                        "content": content,
-                        "sha": data["sha"],
-                        "encoding": data["encoding"]
-                    }
-                elif response.status_code == 404:
-                    logger.warning(f"File not found: {file_path}")
-                    return {"success": False, "error": "File not found"}
-                else: 
-                    logger.error(f"GitHub API error: {response.status_code}")
-                    return {"success": False, "error": f"GitHub API error: {response.status_code}"}
-                    
+                else:
+                    # Files over 1MB come back without inline content (encoding "none");
+                    # the raw media type returns the bytes directly, with no base64 step, and
+                    # decoding as chunks arrive avoids holding the whole body next to the text
+                    decoder = codecs.getincrementaldecoder("utf-8")()
+                    parts = []
+                    async with github_stream(
+                        "GET",
+                        url,
+                        headers={**self._auth_headers(pat_token), "Accept": "application/vnd.github.v3.raw"},
+                        params={"ref": branch},
+                        timeout=30.0
+                    ) as raw_response:
+                        raw_response.raise_for_status()
+                        async for chunk in raw_response.aiter_bytes():
+                            parts.append(decoder.decode(chunk))
+                    parts.append(decoder.decode(b"", final=True))
+                    content = "".join(parts)
+                
+                return {
+                    "success": True,
+                    "content": content,
+                    "sha": data["sha"],
+                    "encoding": data["encoding"]
+                }
+            elif response.status_code == 404:
+                logger.warning(f"File not found: {file_path}")
+                return {"success": False, "error": "File not found"}
+            else: 
+                logger.error(f"GitHub API error: {response.status_code}")
+                return {"success": False, "error": f"GitHub API error: {response.status_code}"}
+                
         except Exception as e:
             logger.error(f"Error fetching file content: {str(e)}")
             return {"success": False, "error": str(e)}
@@ -207,122 +279,285 @@ class GitHubPRService:
         """
         try: 
             # Get base branch SHA
-            base_ref_url = f"{self.GITHUB_API_BASE}/repos/{owner}/{repo}/git/ref/heads/{base_branch}"
-            
-            async with httpx.AsyncClient() as client:
-                # Get base branch reference
-                base_response = await client.get(
-                    base_ref_url,
-                    headers={
-                        "Authorization": f"token {pat_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    },
-                    timeout=10.0
-                )
-                
-                if base_response.status_code != 200:
-                    return {"success": False, "error": "Base branch not found"}
-                
-                base_sha = base_response.json()["object"]["sha"]
-                
-                # Create new branch
-                create_ref_url = f"{self.GITHUB_API_BASE}/repos/{owner}/{repo}/git/refs"
-                
-                create_response = await client.post(
-                    create_ref_url,
-                    headers={
-                        "Authorization": f"token {pat_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    },
-                    json={
-                        "ref": f"refs/heads/{branch_name}",
-                        "sha": base_sha
-                    },
+            base_ref_url = f"/repos/{owner}/{repo}/git/ref/heads/{base_branch}"
+            
+            # Get base branch reference
+            base_response = await github_request(
+                "GET",
+                base_ref_url,
+                headers=self._auth_headers(pat_token),
+                timeout=10.0
+            )
+            
+            if base_response.status_code != 200:
+                return {"success": False, "error": "Base branch not found"}
+            
+            base_sha = github_json(base_response)["object"]["sha"]
+            
+            # Create new branch
+            create_ref_url = f"/repos/{owner}/{repo}/git/refs"
+            
+            create_response = await github_request(
+                "POST",
+                create_ref_url,
+                headers=self._auth_headers(pat_token),
+                json={
+                    "ref": f"refs/heads/{branch_name}",
+                    "sha": base_sha
+                },
+                timeout=10.0
+            )
+            
+            if create_response.status_code == 201:
+                logger.info(f"Branch created: {branch_name}")
+                return {
+                    "success": True,
+                    "ref": github_json(create_response)["ref"],
+                    "sha": base_sha,
+                    "created": True
+                }
+            elif create_response.status_code == 422:
+                # Branch already exists; report its own head, which may have moved past base_sha
+                logger.info(f"Branch already exists: {branch_name}")
+                head_response = await github_request(
+                    "GET",
+                    f"/repos/{owner}/{repo}/git/ref/heads/{branch_name}",
+                    headers=self._auth_headers(pat_token),
                     timeout=10.0
                 )
+                head_sha = github_json(head_response)["object"]["sha"] if head_response.status_code == 200 else base_sha
+                return {"success": True, "ref": f"refs/heads/{branch_name}", "sha": head_sha, "created": False}
+            else:
+                error_msg = github_json(create_response).get("message", "Unknown error")
+                logger.error(f"Error creating branch: {error_msg}")
+                return {"success": False, "error": error_msg}
                 
-                if create_response.status_code == 201:
-                    logger.info(f"Branch created: {branch_name}")
-                    return {
-                        "success": True,
-                        "ref": create_response.json()["ref"],
-                        "sha": base_sha
-                    }
-                elif create_response.status_code == 422:
-                    # Branch already exists
-                    logger.info(f"Branch already exists: {branch_name}")
-                    return {"success": True, "ref": f"refs/heads/{branch_name}", "sha": base_sha}
-                else:
-                    error_msg = create_response.json().get("message", "Unknown error")
-                    logger.error(f"Error creating branch: {error_msg}")
-                    return {"success": False, "error": error_msg}
-                    
         except Exception as e:
             logger.error(f"Error creating branch: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    async def commit_file_change(
+    async def get_tree_blobs(
+        self,
+        owner: str,
+        repo: str,
+        commit_sha: str,
+        pat_token: str
+    ) -> Dict[str, Any]:
+        """
+        List every file in a commit's tree with one recursive tree read
+        
+        Returns:
+            Dict with the root tree_sha, blobs (path -> {"sha", "mode"}) and whether GitHub truncated the listing
+        """
+        try:
+            response = await github_request(
+                "GET",
+                f"/repos/{owner}/{repo}/git/trees/{commit_sha}",
+                headers=self._auth_headers(pat_token),
+                params={"recursive": "1"},
+                timeout=15.0
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"GitHub API error fetching tree: {response.status_code}")
+                return {"success": False, "error": f"GitHub API error: {response.status_code}"}
+            
+            data = github_json(response)
+            return {
+                "success": True,
+                "tree_sha": data["sha"],
+                "blobs": {
+                    entry["path"]: {"sha": entry["sha"], "mode": entry["mode"]}
+                    for entry in data.get("tree", [])
+                    if entry.get("type") == "blob"
+                },
+                "truncated": data.get("truncated", False)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error fetching repository tree: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    async def _graphql(self, query: str, variables: Dict[str, Any], pat_token: str) -> Dict[str, Any]:
+        """
+        Run a GitHub GraphQL query/mutation
+        
+        Returns:
+            Dict with success status and the response data
+        """
+        try:
+            response = await github_request(
+                "POST",
+                "/graphql",
+                headers=self._auth_headers(pat_token),
+                json={"query": query, "variables": variables},
+                timeout=30.0
+            )
+            payload = github_json(response)
+            # GraphQL reports most failures with a 200 and an "errors" list
+            if response.status_code != 200 or payload.get("errors"):
+                errors = payload.get("errors") or [{"message": payload.get("message", "Unknown error")}]
+                return {"success": False, "error": "; ".join(e.get("message", "Unknown error") for e in errors)}
+            return {"success": True, "data": payload.get("data") or {}}
+            
+        except Exception as e:
+            logger.error(f"GraphQL request failed: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    async def _commit_files(
         self,
         owner: str,
         repo: str,
         branch: str,
-        file_path: str,
-        new_content: str,
+        files: List[Tuple[str, str, str]],
+        parent_sha: str,
+        base_tree_sha: str,
         commit_message: str,
         pat_token: str
     ) -> Dict[str, Any]:
         """
-        Commit a file change to GitHub
+        Commit several files on a branch, in one GraphQL createCommitOnBranch call when possible
+        
+        Falls back to the REST Git Data API for large change sets, for files whose mode must be
+        kept (createCommitOnBranch has no mode field), or when the mutation fails - it is atomic,
+        so a failed mutation leaves the branch untouched
+        """
+        encoded = [
+            (path, base64.b64encode(content.encode("utf-8")).decode("ascii"), mode)
+            for path, content, mode in files
+        ]
+        
+        if (
+            all(mode == "100644" for _, _, mode in encoded)
+            and sum(len(contents) for _, contents, _ in encoded) <= GRAPHQL_MAX_COMMIT_BYTES
+        ):
+            headline, _, body = commit_message.partition("\n")
+            result = await self._graphql(
+                CREATE_COMMIT_ON_BRANCH_MUTATION,
+                {
+                    "input": {
+                        "branch": {"repositoryNameWithOwner": f"{owner}/{repo}", "branchName": branch},
+                        "message": {"headline": headline, "body": body.strip()},
+                        "fileChanges": {"additions": [{"path": path, "contents": contents} for path, contents, _ in encoded]},
+                        "expectedHeadOid": parent_sha
+                    }
+                },
+                pat_token
+            )
+            
+            commit = ((result.get("data") or {}).get("createCommitOnBranch") or {}).get("commit")
+            if result.get("success") and commit:
+                logger.info(f"Committed {len(files)} file(s) on {branch} via GraphQL")
+                return {"success": True, "commit_sha": commit["oid"], "commit_url": commit["url"]}
+            
+            logger.warning(f"GraphQL commit failed, falling back to REST: {result.get('error')}")
+        
+        return await self._create_tree_commit(
+            owner, repo, branch, files, parent_sha, base_tree_sha, commit_message, pat_token
+        )
+    
+    async def _create_tree_commit(
+        self,
+        owner: str,
+        repo: str,
+        branch: str,
+        files: List[Tuple[str, str, str]],
+        parent_sha: str,
+        base_tree_sha: str,
+        commit_message: str,
+        pat_token: str
+    ) -> Dict[str, Any]:
+        """
+        Commit several files at once with the Git Data API: one blob per file (created
+        concurrently), then a single tree, commit and branch ref update
+        
+        files holds (path, content, mode) tuples
         
         Returns:
             Dict with success status and commit info
         """
-        try: 
-            # Get current file SHA
-            file_info = await self.get_file_content(owner, repo, file_path, branch, pat_token)
-            
-            if not file_info.get("success"):
-                return {"success": False, "error": "Could not fetch current file"}
-            
-            file_sha = file_info["sha"]
-            
-            # Encode new content to base64
-            encoded_content = base64.b64encode(new_content.encode("utf-8")).decode("utf-8")
-            
-            # Update file
-            url = f"{self.GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{file_path}"
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.put(
-                    url,
-                    headers={
-                        "Authorization": f"token {pat_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    },
-                    json={
-                        "message": commit_message,
-                        "content": encoded_content,
-                        "sha": file_sha,
-                        "branch": branch
-                    },
-                    timeout=15.0
-                )
-                
-                if response.status_code == 200:
-                    commit_data = response.json()
-                    logger.info(f"File committed: {file_path} on {branch}")
-                    return {
-                        "success": True,
-                        "commit_sha": commit_data["commit"]["sha"],
-                        "commit_url": commit_data["commit"]["html_url"]
-                    }
-                else:
-                    error_msg = response.json().get("message", "Unknown error")
-                    logger.error(f"Error committing file: {error_msg}")
+        try:
+            headers = self._auth_headers(pat_token)
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+            
+            async def create_blob(content: str) -> httpx.Response:
+                async with semaphore:
+                    return await github_request(
+                        "POST",
+                        f"/repos/{owner}/{repo}/git/blobs",
+                        headers=headers,
+                        json={
+                            # The Git Data API accepts text as-is, so no client-side base64 copy
+                            "content": content,
+                            "encoding": "utf-8"
+                        },
+                        timeout=15.0
+                    )
+            
+            blob_responses = await asyncio.gather(*[create_blob(content) for _, content, _ in files])
+            for (path, _, _), blob_response in zip(files, blob_responses):
+                if blob_response.status_code != 201:
+                    error_msg = github_json(blob_response).get("message", "Unknown error")
+                    logger.error(f"Error creating blob for {path}: {error_msg}")
                     return {"success": False, "error": error_msg}
-                    
+            
+            tree_response = await github_request(
+                "POST",
+                f"/repos/{owner}/{repo}/git/trees",
+                headers=headers,
+                json={
+                    "base_tree": base_tree_sha,
+                    "tree": [
+                        {"path": path, "mode": mode, "type": "blob", "sha": github_json(blob_response)["sha"]}
+                        for (path, _, mode), blob_response in zip(files, blob_responses)
+                    ]
+                },
+                timeout=15.0
+            )
+            if tree_response.status_code != 201:
+                error_msg = github_json(tree_response).get("message", "Unknown error")
+                logger.error(f"Error creating tree: {error_msg}")
+                return {"success": False, "error": error_msg}
+            
+            commit_response = await github_request(
+                "POST",
+                f"/repos/{owner}/{repo}/git/commits",
+                headers=headers,
+                json={
+                    "message": commit_message,
+                    "tree": github_json(tree_response)["sha"],
+                    "parents": [parent_sha]
+                },
+                timeout=15.0
+            )
+            if commit_response.status_code != 201:
+                error_msg = github_json(commit_response).get("message", "Unknown error")
+                logger.error(f"Error creating commit: {error_msg}")
+                return {"success": False, "error": error_msg}
+            
+            commit_data = github_json(commit_response)
+            
+            ref_response = await github_request(
+                "PATCH",
+                f"/repos/{owner}/{repo}/git/refs/heads/{branch}",
+                headers=headers,
+                json={"sha": commit_data["sha"]},
+                timeout=10.0
+            )
+            if ref_response.status_code != 200:
+                error_msg = github_json(ref_response).get("message", "Unknown error")
+                logger.error(f"Error updating branch {branch}: {error_msg}")
+                return {"success": False, "error": error_msg}
+            
+            logger.info(f"Committed {len(files)} file(s) on {branch}")
+            return {
+                "success": True,
+                "commit_sha": commit_data["sha"],
+                "commit_url": commit_data["html_url"]
+            }
+            
         except Exception as e:
-            logger.error(f"Error committing file change: {str(e)}")
+            logger.error(f"Error committing files: {str(e)}")
             return {"success": False, "error": str(e)}
     
     async def create_pull_request(
@@ -342,40 +577,37 @@ class GitHubPRService:
             Dict with PR number, URL, and status
         """
         try:
-            url = f"{self.GITHUB_API_BASE}/repos/{owner}/{repo}/pulls"
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    headers={
-                        "Authorization": f"token {pat_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    },
-                    json={
-                        "title": title,
-                        "body": body,
-                        "head": head_branch,
-                        "base": base_branch
-                    },
-                    timeout=15.0
-                )
+            url = f"/repos/{owner}/{repo}/pulls"
+            
+            response = await github_request(
+                "POST",
+                url,
+                headers=self._auth_headers(pat_token),
+                json={
+                    "title": title,
+                    "body": body,
+                    "head": head_branch,
+                    "base": base_branch
+                },
+                timeout=15.0
+            )
+            
+            if response.status_code == 201:
+                pr_data = github_json(response)
+                logger.info(f"Pull request created: #{pr_data['number']}")
+                return {
+                    "success": True,
+                    "pr_number": pr_data["number"],
+                    "pr_url": pr_data["html_url"],
+                    "pr_id": pr_data["id"],
+                    "state": pr_data["state"]
+                }
+            else: 
+                error_msg = github_json(response).get("message", "Unknown error")
+                errors = github_json(response).get("errors", [])
+                logger.error(f"Error creating PR: {error_msg} - {errors}")
+                return {"success": False, "error": error_msg, "details": errors}
                 
-                if response.status_code == 201:
-                    pr_data = response.json()
-                    logger.info(f"Pull request created: #{pr_data['number']}")
-                    return {
-                        "success": True,
-                        "pr_number": pr_data["number"],
-                        "pr_url": pr_data["html_url"],
-                        "pr_id": pr_data["id"],
-                        "state": pr_data["state"]
-                    }
-                else: 
-                    error_msg = response.json().get("message", "Unknown error")
-                    errors = response.json().get("errors", [])
-                    logger.error(f"Error creating PR: {error_msg} - {errors}")
-                    return {"success": False, "error": error_msg, "details": errors}
-                    
         except Exception as e:
             logger.error(f"Error creating pull request: {str(e)}")
             return {"success": False, "error": str(e)}
@@ -400,29 +632,39 @@ class GitHubPRService:
             if not pat_token:
                 return {"success": False, "error": "GitHub PAT token not found. Please add it in settings."}
             
-            # Get repository info
-            repository = self.db.query(Repository).filter(Repository.id == repository_id).first()
-            if not repository:
-                return {"success": False, "error": "Repository not found"}
-            
-            # Parse owner/repo from full_name
-            owner, repo_name = repository.full_name.split("/")
-            base_branch = repository.default_branch or "main"
-            
-            # Get vulnerability fixes
             from app.models.vulnerability import VulnerabilityFix
             
-            fixes = self.db.query(VulnerabilityFix).filter(
-                VulnerabilityFix.id.in_(vulnerability_fix_ids),
-                VulnerabilityFix.user_id == user_id
-            ).all()
+            # Repository info and the fixes in one round trip: the fixes are outer-joined onto the
+            # repository row, so a missing repository yields no rows and no matching fixes yields
+            # one row without a fix. The commit message and PR description read each fix's
+            # vulnerability, so that is loaded in the same query
+            rows = self.db.execute(
+                select(Repository.owner_login, Repository.full_name, Repository.name, Repository.default_branch, VulnerabilityFix)
+                .outerjoin(
+                    VulnerabilityFix,
+                    and_(
+                        VulnerabilityFix.id.in_(vulnerability_fix_ids),
+                        VulnerabilityFix.user_id == user_id
+                    )
+                )
+                .where(Repository.id == repository_id)
+                .options(joinedload(VulnerabilityFix.vulnerability))
+            ).unique().all()
+            if not rows:
+                return {"success": False, "error": "Repository not found"}
+            
+            # owner_login is NULL on rows add_repository_owner_login.py has not backfilled yet
+            owner = rows[0].owner_login or rows[0].full_name.split("/", 1)[0]
+            repo_name = rows[0].name
+            base_branch = rows[0].default_branch or "main"
+            fixes = [row.VulnerabilityFix for row in rows if row.VulnerabilityFix is not None]
             
             if not fixes:
                 return {"success": False, "error": "No fixes found"}
             
             # Generate branch name if not provided
             if not branch_name:
-                timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+                timestamp = datetime.now(timezone.utc).strftime(BRANCH_TIMESTAMP_FORMAT)
                 branch_name = f"fix/security-vulnerabilities-{timestamp}"
             
             # Create branch
@@ -432,22 +674,48 @@ class GitHubPRService:
             if not branch_result.get("success"):
                 return {"success": False, "error": f"Failed to create branch: {branch_result.get('error')}"}
             
-            # Commit each fix
-            committed_files = []
+            # Commit all fixes as one commit: the branch head's tree tells us which
+            # files exist (and their modes), then blobs, tree, commit and ref update
+            head_sha = branch_result["sha"]
+            tree_result = await self.get_tree_blobs(owner, repo_name, head_sha, pat_token)
+            if not tree_result.get("success"):
+                return {"success": False, "error": f"Failed to read repository tree: {tree_result.get('error')}"}
+            
+            blobs = tree_result["blobs"]
+            committed_fixes = []
             for fix in fixes:
-                commit_msg = f"Fix: {fix.vulnerability.title if fix.vulnerability else 'Security vulnerability'}"
+                # Only existing files are fixed (a truncated listing cannot rule a path out)
+                if fix.file_path in blobs or tree_result["truncated"]:
+                    committed_fixes.append(fix)
+                else:
+                    logger.warning(f"Failed to commit {fix.file_path}: File not found")
+            
+            if committed_fixes:
+                # Later fixes to the same file win, as with one commit per fix
+                files = {
+                    fix.file_path: (fix.file_path, fix.fixed_code, blobs.get(fix.file_path, {}).get("mode", "100644"))
+                    for fix in committed_fixes
+                }
+                titles = [fix.vulnerability.title if fix.vulnerability else 'Security vulnerability' for fix in committed_fixes]
+                if len(titles) == 1:
+                    commit_msg = f"Fix: {titles[0]}"
+                else:
+                    commit_msg = f"Fix {len(titles)} security vulnerabilities\n\n" + "\n".join(f"- {title}" for title in titles)
                 
-                commit_result = await self.commit_file_change(
-                    owner, repo_name, branch_name, fix.file_path,
-                    fix.fixed_code, commit_msg, pat_token
+                commit_result = await self._commit_files(
+                    owner, repo_name, branch_name, list(files.values()),
+                    head_sha, tree_result["tree_sha"], commit_msg, pat_token
                 )
                 
                 if commit_result.get("success"):
-                    committed_files.append(fix.file_path)
-                    # Update fix status
-                    fix.status = "pr_created"
+                    for fix in committed_fixes:
+                        # Update fix status
+                        fix.status = "pr_created"
                 else:
-                    logger.warning(f"Failed to commit {fix.file_path}: {commit_result.get('error')}")
+                    logger.warning(f"Failed to commit fixes: {commit_result.get('error')}")
+                    committed_fixes = []
+            
+            committed_files = [fix.file_path for fix in committed_fixes]
             
             if not committed_files:
                 return {"success": False, "error": "Failed to commit any fixes"}
@@ -506,22 +774,23 @@ class GitHubPRService:
     
     def _generate_pr_description(self, fixes: List[Any], files: List[str]) -> str:
         """Generate formatted PR description"""
-        description = "## 🔒 Security Vulnerability Fixes\n\n"
-        description += "This PR addresses the following security vulnerabilities:\n\n"
+        parts = [
+            "## 🔒 Security Vulnerability Fixes\n\n",
+            "This PR addresses the following security vulnerabilities:\n\n",
+        ]
         
         for i, fix in enumerate(fixes, 1):
             vuln = fix.vulnerability if hasattr(fix, 'vulnerability') else None
-            description += f"### {i}. {vuln.title if vuln else 'Security Issue'}\n"
-            description += f"- **Severity:** {vuln.severity if vuln else 'Unknown'}\n"
-            description += f"- **File:** `{fix.file_path}`\n"
-            description += f"- **Fix Type:** {fix.fix_type.replace('_', ' ').title()}\n\n"
+            parts.append(f"### {i}. {vuln.title if vuln else 'Security Issue'}\n")
+            parts.append(f"- **Severity:** {vuln.severity if vuln else 'Unknown'}\n")
+            parts.append(f"- **File:** `{fix.file_path}`\n")
+            parts.append(f"- **Fix Type:** {fix.fix_type.replace('_', ' ').title()}\n\n")
         
-        description += "---\n\n"
-        description += "### Files Changed:\n"
-        for file in files:
-            description += f"- `{file}`\n"
+        parts.append("---\n\n")
+        parts.append("### Files Changed:\n")
+        parts.extend(f"- `{file}`\n" for file in files)
         
-        description += "\n---\n"
-        description += "*This PR was automatically generated by SecureThread VMS*\n"
+        parts.append("\n---\n")
+        parts.append("*This PR was automatically generated by SecureThread VMS*\n")
         
-        return description
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file
@@ -1,64 +1,452 @@
 import httpx
+import orjson
+import random
+import hashlib
+import secrets
+import asyncio
 import requests
-from typing import Optional, List, Dict, Any
-from github import Github
+import threading
+import time
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from urllib.parse import urlencode
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Iterator
 from app.core.settings import settings
+import importlib.util
 import logging
 
 logger = logging.getLogger(__name__)
 
+GITHUB_API_BASE = "https://api.github.com"
+
+# Everything but the per-request state is fixed for the process, so it is encoded once
+GITHUB_AUTHORIZE_URL = "https://github.com/login/oauth/authorize?" + urlencode({
+    "client_id": settings.GITHUB_CLIENT_ID,
+    "redirect_uri": settings.GITHUB_REDIRECT_URI,
+    "scope": "repo,user:email"
+})
+
+# One keep-alive async client (and one sync session) per process for GitHub API calls,
+# instead of a new client (and TLS handshake) per request; closed on app shutdown
+_github_client: Optional[httpx.AsyncClient] = None
+_github_session: Optional[requests.Session] = None
+
+# Retries for rate limits (403/429) and transient server errors in github_request
+GITHUB_RETRY_STATUSES = {429, 500, 502, 503, 504}
+GITHUB_MAX_ATTEMPTS = 5
+GITHUB_RETRY_BASE_DELAY = 0.5
+GITHUB_MAX_RETRY_WAIT = 60.0
+
+# httpx raises ImportError for http2=True without the h2 package (httpx[http2]), so fall back to HTTP/1.1
+GITHUB_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+def get_github_client() -> httpx.AsyncClient:
+    """Shared async client for api.github.com (absolute URLs, e.g. OAuth on github.com, also work)"""
+    global _github_client
+    if _github_client is None or _github_client.is_closed:
+        # httpx negotiates Accept-Encoding itself: gzip/deflate, plus br with httpx[brotli] installed.
+        # HTTP/2 (httpx[http2]) multiplexes concurrent requests, e.g. gathered pages, as streams
+        # on one connection per origin instead of opening a TLS connection per request
+        if not GITHUB_HTTP2:
+            logger.warning("⚠️ h2 is not installed, GitHub API client falls back to HTTP/1.1")
+        _github_client = httpx.AsyncClient(
+            base_url=GITHUB_API_BASE,
+            http2=GITHUB_HTTP2,
+            headers={
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": "SecureThread-App/1.0",
+                "X-GitHub-Api-Version": "2022-11-28"
+            },
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+        )
+    return _github_client
+
+
+def get_github_session() -> requests.Session:
+    """
+    Shared keep-alive session for the sync GitHub calls (per-file content/tree fetches from scan
+    worker threads, repo listings, token checks), so TLS handshakes are amortized across requests.
+    Transient 5xx errors are retried by the adapter; rate limits (403/429) are left to the callers,
+    which cap the wait instead of sleeping out a long Retry-After
+    """
+    global _github_session
+    if _github_session is None:
+        session = requests.Session()
+        session.headers.update({
+            "Accept": "application/vnd.github.v3+json",
+            "User-Agent": "SecureThread-App/1.0"
+        })
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=GITHUB_MAX_ATTEMPTS - 1,
+                backoff_factor=GITHUB_RETRY_BASE_DELAY,
+                status_forcelist=[500, 502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        session.mount("https://", adapter)
+        _github_session = session
+    return _github_session
+
+
+class GitHubRateLimiter:
+    """
+    Client-side view of one token's primary rate limit, kept from the X-RateLimit headers of
+    each response, so bursts pause before GitHub starts rejecting them; also caps the token's
+    requests in flight, since GitHub's secondary limits punish large concurrent bursts
+    """
+    
+    LOW_REMAINING = 5
+    MAX_IN_FLIGHT = 20
+    
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        # Created on first use, inside the event loop that shares the GitHub client
+        self._in_flight: Optional[asyncio.Semaphore] = None
+    
+    @property
+    def in_flight(self) -> asyncio.Semaphore:
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.MAX_IN_FLIGHT)
+        return self._in_flight
+    
+    async def acquire(self):
+        """Wait for the reset when nearly out of requests (if the wait is short enough), then count one"""
+        if self.remaining is not None and self.remaining < self.LOW_REMAINING:
+            wait = self.reset_at - time.time()
+            if 0 < wait <= GITHUB_MAX_RETRY_WAIT:
+                logger.warning(f"GitHub rate limit nearly exhausted, pausing {wait:.1f}s until reset")
+                await asyncio.sleep(wait)
+            if time.time() >= self.reset_at:
+                self.remaining = None  # New window; the next response reports the real count
+        if self.remaining is not None:
+            self.remaining -= 1
+    
+    def update(self, response: httpx.Response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        try:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = float(reset)
+        except ValueError:
+            pass
+
+
+# GitHub rate-limits per token; limiters are keyed by a hash so tokens are not kept in memory.
+# OAuth tokens change on every login, so the least recently used limiters are evicted
+RATE_LIMITER_CACHE_SIZE = 1024
+_rate_limiters: "OrderedDict[str, GitHubRateLimiter]" = OrderedDict()
+
+
+def _token_key(authorization: str) -> str:
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def get_rate_limiter(authorization: str) -> GitHubRateLimiter:
+    key = _token_key(authorization)
+    limiter = _rate_limiters.get(key)
+    if limiter is None:
+        limiter = _rate_limiters[key] = GitHubRateLimiter()
+        if len(_rate_limiters) > RATE_LIMITER_CACHE_SIZE:
+            _rate_limiters.popitem(last=False)
+    else:
+        _rate_limiters.move_to_end(key)
+    return limiter
+
+
+# Authorization hash -> (expires_at, validation result), so re-submitting or re-checking the
+# same PAT skips the GitHub round trip; github_request drops an entry on any 401 for its token
+TOKEN_VALIDATION_CACHE_SIZE = 1024
+TOKEN_VALIDATION_TTL_SECONDS = 600
+_token_validations: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+# The token-validation and ETag caches are used from the event loop and from scan worker
+# threads (sync session calls), so every read-modify-write on them holds this lock
+_cache_lock = threading.Lock()
+
+
+def token_validation_from_user(response) -> Dict[str, Any]:
+    """Validation result for a token from its successful GET /user response (httpx or requests)"""
+    user_data = github_json(response)
+    return {
+        "valid": True,
+        "github_username": user_data.get("login"),
+        "github_id": user_data.get("id"),
+        "scopes": response.headers.get("X-OAuth-Scopes", "").split(", ")
+    }
+
+
+def get_cached_token_validation(authorization: str) -> Optional[Dict[str, Any]]:
+    key = _token_key(authorization)
+    with _cache_lock:
+        cached = _token_validations.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del _token_validations[key]
+            return None
+        _token_validations.move_to_end(key)
+        return cached[1]
+
+
+def cache_token_validation(authorization: str, validation: Dict[str, Any]):
+    key = _token_key(authorization)
+    with _cache_lock:
+        _token_validations[key] = (time.monotonic() + TOKEN_VALIDATION_TTL_SECONDS, validation)
+        _token_validations.move_to_end(key)
+        if len(_token_validations) > TOKEN_VALIDATION_CACHE_SIZE:
+            _token_validations.popitem(last=False)
+
+
+def forget_token_validation(authorization: str):
+    """Drop a token's cached validation (GitHub rejected it with a 401)"""
+    with _cache_lock:
+        _token_validations.pop(_token_key(authorization), None)
+
+
+# (token hash, URL, params) -> (ETag, body, Link header) for conditional GETs: GitHub answers an
+# unchanged resource with 304 Not Modified, which does not count against the rate limit. Keyed by
+# token so users never see each other's responses; bounded because repo-list pages are large
+ETAG_CACHE_SIZE = 256
+_etag_cache: "OrderedDict[str, Tuple[str, bytes, Optional[str]]]" = OrderedDict()
+
+
+def _etag_cache_key(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]]) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+    return f"{_token_key(headers.get('Authorization', ''))}:{url}?{query}"
+
+
+def _etag_lookup(key: str, headers: Dict[str, str]) -> Tuple[Optional[Tuple[str, bytes, Optional[str]]], Dict[str, str]]:
+    """Cached entry for key (if any) and the request headers, with If-None-Match when cached"""
+    with _cache_lock:
+        cached = _etag_cache.get(key)
+        if cached is None:
+            return None, headers
+        _etag_cache.move_to_end(key)
+    return cached, {**headers, "If-None-Match": cached[0]}
+
+
+def _etag_store(key: str, etag: Optional[str], content: bytes, link: Optional[str]):
+    if not etag:
+        return
+    with _cache_lock:
+        _etag_cache[key] = (etag, content, link)
+        _etag_cache.move_to_end(key)
+        if len(_etag_cache) > ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+
+
+# GraphQL counterpart of GET /user/repos, selecting only the fields _repository_summaries keeps
+VIEWER_REPOSITORIES_QUERY = """
+query($cursor: String) {
+  viewer {
+    repositories(
+      first: 100
+      after: $cursor
+      affiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]
+      ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]
+      orderBy: {field: UPDATED_AT, direction: DESC}
+    ) {
+      pageInfo { endCursor hasNextPage }
+      nodes {
+        databaseId name nameWithOwner description url
+        defaultBranchRef { name }
+        primaryLanguage { name }
+        isPrivate isFork isArchived isDisabled visibility
+        createdAt updatedAt diskUsage stargazerCount forkCount
+        issues(states: OPEN) { totalCount }
+        pullRequests(states: OPEN) { totalCount }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+      }
+    }
+  }
+}
+"""
+
+
+def github_json(response) -> Any:
+    """Parse a GitHub JSON response (httpx or requests) with orjson, which is much faster on large repo lists and trees"""
+    return orjson.loads(response.content)
+
+
+def github_retry_delay(response: httpx.Response, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying a GitHub response, or None if it should not be retried:
+    rate limits honour Retry-After / X-RateLimit-Reset, 429 and 5xx otherwise back off exponentially
+    """
+    if response.status_code in (403, 429):
+        retry_after = response.headers.get("Retry-After")
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        try:
+            if retry_after is not None:
+                delay = max(float(retry_after), 1.0)
+            elif remaining == "0" and reset is not None:
+                delay = max(float(reset) - time.time(), 1.0)
+            elif response.status_code == 429:
+                delay = None
+            else:
+                return None  # A plain permission 403, not rate limiting
+        except ValueError:
+            return None
+        if delay is not None:
+            # Waiting out a long rate-limit window would stall the request; fail instead
+            return delay if delay <= GITHUB_MAX_RETRY_WAIT else None
+    elif response.status_code not in GITHUB_RETRY_STATUSES:
+        return None
+    
+    return min(GITHUB_RETRY_BASE_DELAY * 2 ** attempt, GITHUB_MAX_RETRY_WAIT) + random.uniform(0, 0.5)
+
+
+async def github_request(method: str, url: str, max_attempts: int = GITHUB_MAX_ATTEMPTS, **kwargs) -> httpx.Response:
+    """
+    Send a request through the shared GitHub client, pacing it by its token's rate limit and
+    retrying rate limits and transient 5xx errors
+    """
+    client = get_github_client()
+    if "json" in kwargs:
+        kwargs["content"] = orjson.dumps(kwargs.pop("json"))
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+    authorization = (kwargs.get("headers") or {}).get("Authorization")
+    rate_limiter = get_rate_limiter(authorization) if authorization else None
+    for attempt in range(max_attempts):
+        if rate_limiter:
+            await rate_limiter.acquire()
+            async with rate_limiter.in_flight:
+                response = await client.request(method, url, **kwargs)
+            rate_limiter.update(response)
+        else:
+            response = await client.request(method, url, **kwargs)
+        if response.status_code == 401 and authorization:
+            forget_token_validation(authorization)
+        logger.debug(f"GitHub {method} {url} -> {response.status_code} ({response.http_version}, {response.headers.get('Content-Encoding', 'identity')})")
+        delay = github_retry_delay(response, attempt)
+        if delay is None or attempt == max_attempts - 1:
+            return response
+        logger.warning(f"GitHub {method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    return response
+
+
+async def github_cached_get(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None, **kwargs) -> httpx.Response:
+    """
+    GET through github_request with If-None-Match from the ETag cache; a 304 is answered from the
+    cache as a 200 carrying the stored body and Link header, so callers handle both the same way
+    """
+    key = _etag_cache_key(url, headers, params)
+    cached, request_headers = _etag_lookup(key, headers)
+    response = await github_request("GET", url, headers=request_headers, params=params, **kwargs)
+    if response.status_code == 304 and cached is not None:
+        return httpx.Response(
+            200,
+            content=cached[1],
+            headers={"ETag": cached[0], **({"Link": cached[2]} if cached[2] else {})},
+            request=response.request
+        )
+    if response.status_code == 200:
+        _etag_store(key, response.headers.get("ETag"), response.content, response.headers.get("Link"))
+    return response
+
+
+@asynccontextmanager
+async def github_stream(method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """
+    Streaming variant of github_request for large bodies, read with response.aiter_bytes();
+    paced by the token's rate limit but not retried, since the body is consumed as it arrives
+    """
+    authorization = (kwargs.get("headers") or {}).get("Authorization")
+    rate_limiter = get_rate_limiter(authorization) if authorization else None
+    if rate_limiter is None:
+        async with get_github_client().stream(method, url, **kwargs) as response:
+            yield response
+        return
+    await rate_limiter.acquire()
+    async with rate_limiter.in_flight, get_github_client().stream(method, url, **kwargs) as response:
+        rate_limiter.update(response)
+        if response.status_code == 401:
+            forget_token_validation(authorization)
+        yield response
+
+
+async def close_github_client():
+    """Close the shared GitHub clients (FastAPI shutdown hook)"""
+    global _github_client, _github_session
+    if _github_client is not None:
+        await _github_client.aclose()
+        _github_client = None
+    if _github_session is not None:
+        _github_session.close()
+        _github_session = None
+
 
 class GitHubService:
     def __init__(self):
         self.client_id = settings.GITHUB_CLIENT_ID
         self.client_secret = settings.GITHUB_CLIENT_SECRET
         self.redirect_uri = settings.GITHUB_REDIRECT_URI
+        
+        # Process-wide keep-alive pool, shared by every GitHubService instance
+        self.session = get_github_session()
+        
+        # Shared rate-limit gate: once any fetch is told to back off, every
+        # concurrent fetch waits until the time GitHub gave us
+        self._rate_limit_lock = threading.Lock()
+        self._rate_limited_until = 0.0
+        self.MAX_RATE_LIMIT_WAIT = 60.0
 
     async def exchange_code_for_token(self, code: str) -> Optional[str]:
         """Exchange authorization code for access token with enhanced error handling"""
         logger.info(f"Attempting to exchange OAuth code: {code[:10]}...")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    "https://github.com/login/oauth/access_token",
-                    data={
-                        "client_id": self.client_id,
-                        "client_secret": self.client_secret,
-                        "code": code,
-                        "redirect_uri": self.redirect_uri,
-                    },
-                    headers={"Accept": "application/json"}
-                )
-                
-                logger.info(f"GitHub OAuth response status: {response.status_code}")
+            client = get_github_client()
+            response = await client.post(
+                "https://github.com/login/oauth/access_token",
+                data={
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "code": code,
+                    "redirect_uri": self.redirect_uri,
+                },
+                headers={"Accept": "application/json"},
+                timeout=30.0
+            )
+            
+            logger.info(f"GitHub OAuth response status: {response.status_code}")
+            
+            if response.status_code == 200:
+                data = github_json(response)
                 
-                if response.status_code == 200:
-                    data = response.json()
+                # Check for error in response
+                if "error" in data:
+                    error_description = data.get("error_description", "Unknown error")
+                    logger.error(f"GitHub OAuth error: {data['error']} - {error_description}")
                     
-                    # Check for error in response
-                    if "error" in data:
-                        error_description = data.get("error_description", "Unknown error")
-                        logger.error(f"GitHub OAuth error: {data['error']} - {error_description}")
-                        
-                        # Handle specific OAuth errors
-                        if data["error"] == "bad_verification_code":
-                            logger.warning("OAuth code already used or invalid")
-                            return None
-                        
+                    # Handle specific OAuth errors
+                    if data["error"] == "bad_verification_code":
+                        logger.warning("OAuth code already used or invalid")
                         return None
                     
-                    access_token = data.get("access_token")
-                    if access_token:
-                        logger.info("Successfully exchanged OAuth code for access token")
-                        return access_token
-                    else:
-                        logger.error("No access token in successful response")
-                        return None
+                    return None
+                
+                access_token = data.get("access_token")
+                if access_token:
+                    logger.info("Successfully exchanged OAuth code for access token")
+                    return access_token
                 else:
-                    logger.error(f"GitHub OAuth request failed: {response.status_code} - {response.text}")
+                    logger.error("No access token in successful response")
                     return None
-                    
+            else:
+                logger.error(f"GitHub OAuth request failed: {response.status_code} - {response.text}")
+                return None
+                
         except httpx.TimeoutException:
             logger.error("Timeout while exchanging OAuth code")
             return None
@@ -71,39 +459,125 @@ class GitHubService:
 
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get user information from GitHub"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.github.com/user",
-                headers={
-                    "Authorization": f"token {access_token}",
-                    "Accept": "application/vnd.github.v3+json",
-                    "User-Agent": "SecureThread-App/1.0"
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            return None
+        response = await github_request(
+            "GET",
+            "https://api.github.com/user",
+            headers={
+                "Authorization": f"token {access_token}",
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": "SecureThread-App/1.0"
+            }
+        )
+        
+        if response.status_code == 200:
+            return github_json(response)
+        return None
 
     async def get_user_email(self, access_token: str) -> Optional[str]:
         """Get primary email from GitHub"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.github.com/user/emails",
-                headers={
-                    "Authorization": f"token {access_token}",
-                    "Accept": "application/vnd.github.v3+json",
-                    "User-Agent": "SecureThread-App/1.0"
-                }
-            )
-            
-            if response.status_code == 200:
-                emails = response.json()
-                for email in emails:
-                    if email.get("primary", False):
-                        return email.get("email")
-            return None
+        response = await github_request(
+            "GET",
+            "https://api.github.com/user/emails",
+            headers={
+                "Authorization": f"token {access_token}",
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": "SecureThread-App/1.0"
+            }
+        )
+        
+        if response.status_code == 200:
+            emails = github_json(response)
+            for email in emails:
+                if email.get("primary", False):
+                    return email.get("email")
+        return None
 
+    def _cached_get(self, url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None, timeout: float = 30) -> requests.Response:
+        """Session GET with If-None-Match from the ETag cache (sync counterpart of github_cached_get)"""
+        key = _etag_cache_key(url, headers, params)
+        cached, request_headers = _etag_lookup(key, headers)
+        response = self.session.get(url, headers=request_headers, params=params, timeout=timeout)
+        if response.status_code == 401:
+            forget_token_validation(headers.get("Authorization", ""))
+        if response.status_code == 304 and cached is not None:
+            response.status_code = 200
+            response._content = cached[1]
+            if cached[2]:
+                response.headers["Link"] = cached[2]
+        elif response.status_code == 200:
+            _etag_store(key, response.headers.get("ETag"), response.content, response.headers.get("Link"))
+        return response
+
+    def _iter_pages_sync(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        params: Dict[str, Any],
+        per_page: int,
+        max_pages: int,
+        items_key: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield each page of a paginated GitHub listing (the list itself, or payload[items_key]),
+        following the Link rel="next" URL until there is none, max_pages, or an error; short
+        rate-limit windows are waited out and the page retried, so the pages fetched so far are kept
+        """
+        page_url: Optional[str] = url
+        page_params: Optional[Dict[str, Any]] = {**params, "page": 1, "per_page": per_page}
+        for page in range(1, max_pages + 1):
+            logger.debug(f"Fetching from: {page_url} with params: {page_params}")
+            
+            try:
+                for attempt in range(GITHUB_MAX_ATTEMPTS):
+                    self._wait_for_rate_limit()
+                    response = self._cached_get(page_url, headers, page_params, timeout=30)
+                    
+                    retry_after = self._register_rate_limit(response)
+                    if retry_after is None or retry_after > self.MAX_RATE_LIMIT_WAIT or attempt == GITHUB_MAX_ATTEMPTS - 1:
+                        break
+                    logger.warning(f"⏳ GitHub rate limit hit on page {page}, retrying in {retry_after:.1f}s")
+            except requests.exceptions.Timeout:
+                logger.error("Request to GitHub API timed out")
+                return
+            except requests.exceptions.ConnectionError:
+                logger.error("Connection error while fetching from GitHub API")
+                return
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request exception: {e}")
+                return
+            
+            logger.debug(f"GitHub API response status: {response.status_code}")
+            
+            if response.status_code == 401:
+                logger.error("GitHub API authentication failed - invalid token")
+                raise Exception("Invalid GitHub token")
+            
+            if response.status_code in (403, 429):
+                logger.error(f"GitHub API rate limit exceeded: {response.headers.get('X-RateLimit-Remaining', 'unknown')} remaining")
+                return
+            
+            if response.status_code != 200:
+                logger.error(f"GitHub API error: {response.status_code} - {response.text}")
+                return
+            
+            payload = github_json(response)
+            page_items = payload.get(items_key, []) if items_key else payload
+            if not page_items:
+                logger.debug("No more results found, stopping pagination")
+                return
+            
+            logger.debug(f"Fetched {len(page_items)} results on page {page}")
+            yield page_items
+            
+            # The next URL carries every query parameter, so it is requested as-is
+            page_url = response.links.get("next", {}).get("url")
+            if not page_url:
+                logger.debug(f"No next page after page {page}, pagination complete")
+                return
+            page_params = None
+        
+        logger.debug(f"Reached maximum page limit ({max_pages}), stopping pagination")
+    
     def get_user_repositories(self, access_token: str) -> List[Dict[str, Any]]:
         """Get user repositories using requests for better error handling"""
         try:
@@ -114,103 +588,17 @@ class GitHubService:
                 "User-Agent": "SecureThread-App/1.0"
             }
             
-            repos = []
-            page = 1
-            per_page = 100
+            logger.debug("Starting to fetch repositories for user")
             
-            logger.info("Starting to fetch repositories for user")
-            
-            while True:
-                url = "https://api.github.com/user/repos"
-                params = {
-                    "page": page,
-                    "per_page": per_page,
-                    "sort": "updated",
-                    "affiliation": "owner,collaborator,organization_member"
-                }
-                
-                logger.info(f"Fetching repositories from: {url} with params: {params}")
-                
-                try:
-                    response = requests.get(
-                        url, 
-                        headers=headers, 
-                        params=params,
-                        timeout=30
-                    )
-                    
-                    logger.info(f"GitHub API response status: {response.status_code}")
-                    
-                    if response.status_code == 401:
-                        logger.error("GitHub API authentication failed - invalid token")
-                        raise Exception("Invalid GitHub token")
-                    
-                    if response.status_code == 403:
-                        logger.error(f"GitHub API rate limit exceeded: {response.headers.get('X-RateLimit-Remaining', 'unknown')} remaining")
-                        raise Exception("GitHub API rate limit exceeded")
-                    
-                    if response.status_code != 200:
-                        logger.error(f"GitHub API error: {response.status_code} - {response.text}")
-                        break
-                    
-                    page_repos = response.json()
-                    
-                    if not page_repos:
-                        logger.info("No more repositories found, breaking pagination loop")
-                        break
-                    
-                    logger.info(f"Fetched {len(page_repos)} repositories on page {page}")
-                    
-                    for repo in page_repos:
-                        try:
-                            repo_data = {
-                                "id": repo["id"],
-                                "name": repo["name"],
-                                "full_name": repo["full_name"],
-                                "description": repo.get("description"),
-                                "html_url": repo["html_url"],
-                                "clone_url": repo["clone_url"],
-                                "default_branch": repo.get("default_branch", "main"),
-                                "language": repo.get("language"),
-                                "private": repo["private"],
-                                "fork": repo["fork"],
-                                "created_at": repo["created_at"],
-                                "updated_at": repo["updated_at"],
-                                "size": repo.get("size", 0),
-                                "stargazers_count": repo.get("stargazers_count", 0),
-                                "forks_count": repo.get("forks_count", 0),
-                                "open_issues_count": repo.get("open_issues_count", 0),
-                                "topics": repo.get("topics", []),
-                                "visibility": repo.get("visibility", "private" if repo["private"] else "public"),
-                                "archived": repo.get("archived", False),
-                                "disabled": repo.get("disabled", False),
-                            }
-                            repos.append(repo_data)
-                        except KeyError as e:
-                            logger.warning(f"Missing key in repository data: {e}, skipping repository {repo.get('name', 'unknown')}")
-                            continue
-                    
-                    # If we got fewer repos than per_page, we're done
-                    if len(page_repos) < per_page:
-                        logger.info(f"Received {len(page_repos)} repositories, less than {per_page}, pagination complete")
-                        break
-                    
-                    page += 1
-                    
-                    # Safety check to prevent infinite loops
-                    if page > 50:  # Max 5000 repos
-                        logger.warning("Reached maximum page limit (50), stopping pagination")
-                        break
-                        
-                except requests.exceptions.Timeout:
-                    logger.error("Request to GitHub API timed out")
-                    break
-                except requests.exceptions.ConnectionError:
-                    logger.error("Connection error while fetching from GitHub API")
-                    break
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"Request exception: {e}")
-                    break
+            repos = []
+            for page_repos in self._iter_pages_sync(
+                "https://api.github.com/user/repos",
+                headers,
+                {"sort": "updated", "affiliation": "owner,collaborator,organization_member"},
+                per_page=100,
+                max_pages=50  # Max 5000 repos
+            ):
+                repos.extend(self._repository_summaries(page_repos))
             
             logger.info(f"Successfully fetched {len(repos)} repositories total")
             return repos
@@ -220,114 +608,190 @@ class GitHubService:
             return []
 
     async def get_user_repositories_async(self, access_token: str) -> List[Dict[str, Any]]:
-        """Async version of get_user_repositories for async contexts"""
+        """
+        Async version of get_user_repositories for async contexts. Page 1's Link header gives the
+        last page, so the remaining pages are fetched concurrently instead of one after another
+        """
         try:
             headers = {
                 "Authorization": f"token {access_token}",
                 "Accept": "application/vnd.github.v3+json",
                 "User-Agent": "SecureThread-App/1.0"
             }
-            
-            repos = []
-            page = 1
+            url = "https://api.github.com/user/repos"
             per_page = 100
+            max_pages = 50  # Max 5000 repos
+            # Cap on pages in flight at once, to stay clear of GitHub's secondary rate limits
+            semaphore = asyncio.Semaphore(8)
+            rate_limited = False
             
-            logger.info("Starting to fetch repositories for user (async)")
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                while True:
-                    url = "https://api.github.com/user/repos"
-                    params = {
-                        "page": page,
-                        "per_page": per_page,
-                        "sort": "updated",
-                        "affiliation": "owner,collaborator,organization_member"
-                    }
-                    
-                    logger.info(f"Fetching repositories from: {url} with params: {params}")
-                    
-                    try:
-                        response = await client.get(url, headers=headers, params=params)
-                        
-                        logger.info(f"GitHub API response status: {response.status_code}")
-                        
-                        if response.status_code == 401:
-                            logger.error("GitHub API authentication failed - invalid token")
-                            raise Exception("Invalid GitHub token")
-                        
-                        if response.status_code == 403:
-                            logger.error("GitHub API rate limit exceeded")
-                            raise Exception("GitHub API rate limit exceeded")
-                        
-                        if response.status_code != 200:
-                            logger.error(f"GitHub API error: {response.status_code} - {response.text}")
-                            break
-                        
-                        page_repos = response.json()
-                        
-                        if not page_repos:
-                            logger.info("No more repositories found, breaking pagination loop")
-                            break
-                        
-                        logger.info(f"Fetched {len(page_repos)} repositories on page {page}")
-                        
-                        for repo in page_repos:
-                            try:
-                                repo_data = {
-                                    "id": repo["id"],
-                                    "name": repo["name"],
-                                    "full_name": repo["full_name"],
-                                    "description": repo.get("description"),
-                                    "html_url": repo["html_url"],
-                                    "clone_url": repo["clone_url"],
-                                    "default_branch": repo.get("default_branch", "main"),
-                                    "language": repo.get("language"),
-                                    "private": repo["private"],
-                                    "fork": repo["fork"],
-                                    "created_at": repo["created_at"],
-                                    "updated_at": repo["updated_at"],
-                                    "size": repo.get("size", 0),
-                                    "stargazers_count": repo.get("stargazers_count", 0),
-                                    "forks_count": repo.get("forks_count", 0),
-                                    "open_issues_count": repo.get("open_issues_count", 0),
-                                    "topics": repo.get("topics", []),
-                                    "visibility": repo.get("visibility", "private" if repo["private"] else "public"),
-                                    "archived": repo.get("archived", False),
-                                    "disabled": repo.get("disabled", False),
-                                }
-                                repos.append(repo_data)
-                            except KeyError as e:
-                                logger.warning(f"Missing key in repository data: {e}, skipping repository {repo.get('name', 'unknown')}")
-                                continue
-                        
-                        # If we got fewer repos than per_page, we're done
-                        if len(page_repos) < per_page:
-                            logger.info(f"Received {len(page_repos)} repositories, less than {per_page}, pagination complete")
-                            break
-                        
-                        page += 1
-                        
-                        # Safety check to prevent infinite loops
-                        if page > 50:  # Max 5000 repos
-                            logger.warning("Reached maximum page limit (50), stopping pagination")
-                            break
-                            
-                    except httpx.TimeoutException:
-                        logger.error("Request to GitHub API timed out")
-                        break
-                    except httpx.ConnectError:
-                        logger.error("Connection error while fetching from GitHub API")
-                        break
-                    except httpx.RequestError as e:
-                        logger.error(f"Request exception: {e}")
-                        break
+            async def fetch_page(page: int) -> Optional[httpx.Response]:
+                nonlocal rate_limited
+                params = {
+                    "page": page,
+                    "per_page": per_page,
+                    "sort": "updated",
+                    "affiliation": "owner,collaborator,organization_member"
+                }
+                try:
+                    async with semaphore:
+                        response = await github_cached_get(url, headers, params, timeout=30.0)
+                except httpx.TimeoutException:
+                    logger.error(f"Request to GitHub API timed out (page {page})")
+                    return None
+                except httpx.ConnectError:
+                    logger.error(f"Connection error while fetching from GitHub API (page {page})")
+                    return None
+                except httpx.RequestError as e:
+                    logger.error(f"Request exception (page {page}): {e}")
+                    return None
+                
+                if response.status_code == 401:
+                    logger.error("GitHub API authentication failed - invalid token")
+                    raise Exception("Invalid GitHub token")
+                
+                if response.status_code in (403, 429):
+                    # github_request already waited out short rate-limit windows; keep the earlier pages
+                    logger.error(f"GitHub API rate limit exceeded (page {page})")
+                    rate_limited = True
+                    return None
+                
+                if response.status_code != 200:
+                    logger.error(f"GitHub API error: {response.status_code} - {response.text}")
+                    return None
+                
+                return response
+            
+            logger.debug("Starting to fetch repositories for user (async)")
+            
+            first_response = await fetch_page(1)
+            if first_response is None:
+                if rate_limited:
+                    # GraphQL has its own rate-limit budget, so the listing can still be served
+                    logger.info("REST rate limit exhausted, listing repositories via GraphQL")
+                    return await self.get_user_repositories_graphql(access_token)
+                return []
             
-            logger.info(f"Successfully fetched {len(repos)} repositories total (async)")
+            last_url = first_response.links.get("last", {}).get("url")
+            last_page = int(httpx.URL(last_url).params.get("page", 1)) if last_url else 1
+            if last_page > max_pages:
+                logger.warning(f"Reached maximum page limit ({max_pages}), stopping pagination")
+                last_page = max_pages
+            
+            other_responses = await asyncio.gather(*[fetch_page(page) for page in range(2, last_page + 1)])
+            
+            repos = self._repository_summaries(github_json(first_response))
+            for response in other_responses:
+                if response is None:
+                    break  # Keep the pages before a failed one, as sequential paging would
+                repos.extend(self._repository_summaries(github_json(response)))
+            
+            logger.info(f"Successfully fetched {len(repos)} repositories total from {last_page} page(s) (async)")
             return repos
             
         except Exception as e:
             logger.error(f"Error fetching repositories (async): {e}")
             return []
+    
+    async def get_user_repositories_graphql(self, access_token: str) -> List[Dict[str, Any]]:
+        """
+        List the user's repositories through GraphQL viewer.repositories, asking only for the fields
+        the app stores; returns the same summaries as the REST listings. Pages follow the cursor,
+        so they are fetched one after another
+        """
+        try:
+            # A distinct scheme keys a separate client-side limiter: GraphQL has its own budget
+            headers = {"Authorization": f"bearer {access_token}"}
+            repos = []
+            cursor = None
+            
+            for _ in range(50):  # Max 5000 repos
+                response = await github_request(
+                    "POST",
+                    "/graphql",
+                    headers=headers,
+                    json={"query": VIEWER_REPOSITORIES_QUERY, "variables": {"cursor": cursor}},
+                    timeout=30.0
+                )
+                payload = github_json(response)
+                if response.status_code != 200 or payload.get("errors"):
+                    logger.error(f"GitHub GraphQL error: {payload.get('errors') or response.status_code}")
+                    break
+                
+                connection = payload["data"]["viewer"]["repositories"]
+                repos.extend(self._repository_summaries([self._graphql_repository(node) for node in connection["nodes"]]))
+                
+                if not connection["pageInfo"]["hasNextPage"]:
+                    break
+                cursor = connection["pageInfo"]["endCursor"]
+            
+            logger.info(f"Successfully fetched {len(repos)} repositories total (GraphQL)")
+            return repos
+            
+        except Exception as e:
+            logger.error(f"Error fetching repositories (GraphQL): {e}")
+            return []
+    
+    @staticmethod
+    def _graphql_repository(node: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a GraphQL repository node onto the REST field names _repository_summaries reads"""
+        return {
+            "id": node["databaseId"],
+            "name": node["name"],
+            "full_name": node["nameWithOwner"],
+            "description": node.get("description"),
+            "html_url": node["url"],
+            "clone_url": f"{node['url']}.git",
+            "default_branch": (node.get("defaultBranchRef") or {}).get("name", "main"),
+            "language": (node.get("primaryLanguage") or {}).get("name"),
+            "private": node["isPrivate"],
+            "fork": node["isFork"],
+            "created_at": node["createdAt"],
+            "updated_at": node["updatedAt"],
+            "size": node.get("diskUsage") or 0,
+            "stargazers_count": node.get("stargazerCount", 0),
+            "forks_count": node.get("forkCount", 0),
+            # REST's open_issues_count includes open pull requests
+            "open_issues_count": node["issues"]["totalCount"] + node["pullRequests"]["totalCount"],
+            "topics": [topic["topic"]["name"] for topic in node["repositoryTopics"]["nodes"]],
+            "visibility": node["visibility"].lower(),
+            "archived": node["isArchived"],
+            "disabled": node["isDisabled"],
+        }
+    
+    @staticmethod
+    def _repository_summaries(page_repos: List[Dict[str, Any]], include_owner: bool = False) -> List[Dict[str, Any]]:
+        """Project GitHub repository payloads onto the fields the app stores (plus the owner login for search results)"""
+        repos = []
+        for repo in page_repos:
+            try:
+                repos.append({
+                    "id": repo["id"],
+                    "name": repo["name"],
+                    "full_name": repo["full_name"],
+                    "description": repo.get("description"),
+                    "html_url": repo["html_url"],
+                    "clone_url": repo["clone_url"],
+                    "default_branch": repo.get("default_branch", "main"),
+                    "language": repo.get("language"),
+                    "private": repo["private"],
+                    "fork": repo["fork"],
+                    "created_at": repo["created_at"],
+                    "updated_at": repo["updated_at"],
+                    "size": repo.get("size", 0),
+                    "stargazers_count": repo.get("stargazers_count", 0),
+                    "forks_count": repo.get("forks_count", 0),
+                    "open_issues_count": repo.get("open_issues_count", 0),
+                    "topics": repo.get("topics", []),
+                    "visibility": repo.get("visibility", "private" if repo["private"] else "public"),
+                    "archived": repo.get("archived", False),
+                    "disabled": repo.get("disabled", False),
+                })
+                if include_owner:
+                    repos[-1]["owner"] = repo.get("owner", {}).get("login", "")
+            except KeyError as e:
+                logger.warning(f"Missing key in repository data: {e}, skipping repository {repo.get('name', 'unknown')}")
+        return repos
 
     def search_public_repositories(self, access_token: str, query: str) -> List[Dict[str, Any]]:
         """Search for public GitHub repositories"""
@@ -338,102 +802,18 @@ class GitHubService:
                 "User-Agent": "SecureThread-App/1.0"
             }
             
-            repos = []
-            page = 1
-            per_page = 30  # GitHub search API has lower limits
-            
             logger.info(f"Searching for repositories with query: {query}")
             
-            # Limit to 3 pages to avoid overwhelming results
-            while page <= 3:
-                url = "https://api.github.com/search/repositories"
-                params = {
-                    "q": query,
-                    "page": page,
-                    "per_page": per_page,
-                    "sort": "stars",
-                    "order": "desc"
-                }
-                
-                logger.info(f"Searching repositories from: {url} with params: {params}")
-                
-                try:
-                    response = requests.get(
-                        url, 
-                        headers=headers, 
-                        params=params,
-                        timeout=30
-                    )
-                    
-                    logger.info(f"GitHub Search API response status: {response.status_code}")
-                    
-                    if response.status_code == 401:
-                        logger.error("GitHub API authentication failed - invalid token")
-                        raise Exception("Invalid GitHub token")
-                    
-                    if response.status_code == 403:
-                        logger.error("GitHub API rate limit exceeded")
-                        raise Exception("GitHub API rate limit exceeded")
-                    
-                    if response.status_code != 200:
-                        logger.error(f"GitHub API error: {response.status_code} - {response.text}")
-                        break
-                    
-                    search_results = response.json()
-                    page_repos = search_results.get("items", [])
-                    
-                    if not page_repos:
-                        logger.info("No more repositories found, breaking search loop")
-                        break
-                    
-                    logger.info(f"Found {len(page_repos)} repositories on page {page}")
-                    
-                    for repo in page_repos:
-                        try:
-                            repo_data = {
-                                "id": repo["id"],
-                                "name": repo["name"],
-                                "full_name": repo["full_name"],
-                                "description": repo.get("description"),
-                                "html_url": repo["html_url"],
-                                "clone_url": repo["clone_url"],
-                                "default_branch": repo.get("default_branch", "main"),
-                                "language": repo.get("language"),
-                                "private": repo["private"],
-                                "fork": repo["fork"],
-                                "created_at": repo.get("created_at"),
-                                "updated_at": repo.get("updated_at"),
-                                "size": repo.get("size", 0),
-                                "stargazers_count": repo.get("stargazers_count", 0),
-                                "forks_count": repo.get("forks_count", 0),
-                                "open_issues_count": repo.get("open_issues_count", 0),
-                                "topics": repo.get("topics", []),
-                                "visibility": repo.get("visibility", "private" if repo["private"] else "public"),
-                                "archived": repo.get("archived", False),
-                                "disabled": repo.get("disabled", False),
-                                "owner": repo.get("owner", {}).get("login", ""),
-                            }
-                            repos.append(repo_data)
-                        except KeyError as e:
-                            logger.warning(f"Missing key in repository data: {e}, skipping repository {repo.get('name', 'unknown')}")
-                            continue
-                    
-                    # Check if we have more results
-                    if len(page_repos) < per_page:
-                        logger.info(f"Received {len(page_repos)} repositories, less than {per_page}, search complete")
-                        break
-                    
-                    page += 1
-                        
-                except requests.exceptions.Timeout:
-                    logger.error("Request to GitHub API timed out")
-                    break
-                except requests.exceptions.ConnectionError:
-                    logger.error("Connection error while searching GitHub API")
-                    break
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"Request exception: {e}")
-                    break
+            repos = []
+            for page_repos in self._iter_pages_sync(
+                "https://api.github.com/search/repositories",
+                headers,
+                {"q": query, "sort": "stars", "order": "desc"},
+                per_page=30,  # GitHub search API has lower limits
+                max_pages=3,  # Limit to 3 pages to avoid overwhelming results
+                items_key="items"
+            ):
+                repos.extend(self._repository_summaries(page_repos, include_owner=True))
             
             logger.info(f"Successfully found {len(repos)} repositories total")
             return repos
@@ -442,12 +822,17 @@ class GitHubService:
             logger.error(f"Error searching repositories: {e}")
             return []
 
-    def get_repository_content(self, access_token: str, repo_full_name: str, path: str = "") -> Optional[List[Dict[str, Any]]]:
-        """Get repository content for scanning"""
+    async def get_repository_content(self, access_token: str, repo_full_name: str, path: str = "") -> Optional[List[Dict[str, Any]]]:
+        """Get repository content for scanning (one contents-API call on the shared async client)"""
         try:
-            g = Github(access_token)
-            repo = g.get_repo(repo_full_name)
-            contents = repo.get_contents(path)
+            response = await github_request(
+                "GET",
+                f"/repos/{repo_full_name}/contents/{path}",
+                headers={"Authorization": f"token {access_token}"},
+                timeout=30.0
+            )
+            response.raise_for_status()
+            contents = github_json(response)
             
             if not isinstance(contents, list):
                 contents = [contents]
@@ -455,11 +840,11 @@ class GitHubService:
             result = []
             for content in contents:
                 result.append({
-                    "name": content.name,
-                    "path": content.path,
-                    "type": content.type,
-                    "size": content.size,
-                    "download_url": content.download_url,
+                    "name": content["name"],
+                    "path": content["path"],
+                    "type": content["type"],
+                    "size": content["size"],
+                    "download_url": content.get("download_url"),
                 })
             
             return result
@@ -477,10 +862,10 @@ class GitHubService:
             }
             
             url = f"https://api.github.com/repos/{repo_full_name}"
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self._cached_get(url, headers, timeout=30)
             
             if response.status_code == 200:
-                repo = response.json()
+                repo = github_json(response)
                 return {
                     "id": repo["id"],
                     "name": repo["name"],
@@ -517,18 +902,29 @@ class GitHubService:
             }
             
             url = f"https://api.github.com/repos/{repo_full_name}/contents/{file_path}"
-            logger.info(f"Fetching file content from: {url}")
+            logger.debug(f"Fetching file content from: {url}")
             
-            response = requests.get(url, headers=headers, timeout=30)
+            for attempt in range(2):
+                self._wait_for_rate_limit()
+                response = self.session.get(url, headers=headers, timeout=30)
+                
+                retry_after = self._register_rate_limit(response)
+                if retry_after is None or retry_after > self.MAX_RATE_LIMIT_WAIT or attempt == 1:
+                    break
+                logger.warning(f"⏳ GitHub rate limit hit fetching {file_path}, retrying in {retry_after:.1f}s")
             
             if response.status_code == 200:
-                file_data = response.json()
+                file_data = github_json(response)
                 
                 # Decode base64 content if it's a file
                 if file_data.get("type") == "file" and file_data.get("content"):
                     import base64
                     try:
-                        decoded_content = base64.b64decode(file_data["content"]).decode('utf-8')
+                        raw_content = base64.b64decode(file_data["content"])
+                        # NUL byte in the first 8KB: binary blob, don't bother decoding it
+                        if b'\x00' in raw_content[:8192]:
+                            raise ValueError("NUL byte found, treating as binary")
+                        decoded_content = raw_content.decode('utf-8')
                         return {
                             "content": decoded_content,
                             "encoding": "utf-8",
@@ -565,7 +961,6 @@ class GitHubService:
         """
 
         # ✅✅✅ ADD THESE LINES HERE ✅✅✅
-        import time
         start_time = time.time()
         print(f"\n{'='*80}")
         print(f"🔧 GITHUB API CALLED at {time.strftime('%H:%M:%S')}")
@@ -594,10 +989,10 @@ class GitHubService:
             
             try:
                 # ✅ First attempt with timeout
-                response = requests.get(url, headers=headers, timeout=30)
+                response = self.session.get(url, headers=headers, timeout=30)
                 
                 if response.status_code == 200:
-                    tree_data = response.json()
+                    tree_data = github_json(response)
 
                     # ✅✅✅ ADD THESE LINES HERE ✅✅✅
                     elapsed = time.time() - start_time
@@ -617,10 +1012,10 @@ class GitHubService:
                     url = f"https://api.github.com/repos/{repo_full_name}/git/trees/HEAD?recursive=1"
                     
                     try:
-                        response = requests.get(url, headers=headers, timeout=30)
+                        response = self.session.get(url, headers=headers, timeout=30)
                         
                         if response.status_code == 200:
-                            tree_data = response.json()
+                            tree_data = github_json(response)
 
                             # ✅✅✅ ADD THESE LINES HERE ✅✅✅
                             elapsed = time.time() - start_time
@@ -661,26 +1056,61 @@ class GitHubService:
             return None
     
     def validate_token(self, access_token: str) -> bool:
-        """Validate if the GitHub token is still valid"""
+        """Validate if the GitHub token is still valid (successes are cached, see _token_validations)"""
         try:
             headers = {
                 "Authorization": f"token {access_token}",
                 "Accept": "application/vnd.github.v3+json",
                 "User-Agent": "SecureThread-App/1.0"
             }
+            if get_cached_token_validation(headers["Authorization"]) is not None:
+                return True
             
-            response = requests.get(
-                "https://api.github.com/user",
-                headers=headers,
-                timeout=10
-            )
+            response = self._cached_get("https://api.github.com/user", headers, timeout=10)
             
-            return response.status_code == 200
+            if response.status_code == 200:
+                cache_token_validation(headers["Authorization"], token_validation_from_user(response))
+                return True
+            return False
             
         except Exception as e:
             logger.error(f"Error validating token: {e}")
             return False
 
+    def _register_rate_limit(self, response: requests.Response) -> Optional[float]:
+        """
+        If the response is a rate-limit rejection, record when requests may resume
+        (from Retry-After or X-RateLimit-Reset) and return the wait in seconds
+        """
+        if response.status_code not in (403, 429):
+            return None
+        
+        retry_after = response.headers.get("Retry-After")
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        
+        try:
+            if retry_after is not None:
+                delay = float(retry_after)
+            elif remaining == "0" and reset is not None:
+                delay = float(reset) - time.time()
+            else:
+                return None  # A plain permission 403, not rate limiting
+        except ValueError:
+            return None
+        
+        delay = max(delay, 1.0)
+        with self._rate_limit_lock:
+            self._rate_limited_until = max(self._rate_limited_until, time.time() + delay)
+        return delay
+    
+    def _wait_for_rate_limit(self):
+        """Block until a recorded rate-limit window (if any, and not too long) has passed"""
+        with self._rate_limit_lock:
+            wait = self._rate_limited_until - time.time()
+        if 0 < wait <= self.MAX_RATE_LIMIT_WAIT:
+            time.sleep(wait)
+    
     def get_rate_limit_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get current rate limit information"""
         try:
@@ -690,14 +1120,14 @@ class GitHubService:
                 "User-Agent": "SecureThread-App/1.0"
             }
             
-            response = requests.get(
+            response = self.session.get(
                 "https://api.github.com/rate_limit",
                 headers=headers,
                 timeout=10
             )
             
             if response.status_code == 200:
-                return response.json()
+                return github_json(response)
             return None
             
         except Exception as e:
@@ -706,11 +1136,5 @@ class GitHubService:
 
     @staticmethod
     def get_authorization_url() -> str:
-        """Get GitHub OAuth authorization URL"""
-        return (
-            f"https://github.com/login/oauth/authorize"
-            f"?client_id={settings.GITHUB_CLIENT_ID}"
-            f"&redirect_uri={settings.GITHUB_REDIRECT_URI}"
-            f"&scope=repo,user:email"
-            f"&state=random_state_string"  # Add CSRF protection
-        )
\ No newline at end of file
+        """Get GitHub OAuth authorization URL (fresh random state per call)"""
+        return f"{GITHUB_AUTHORIZE_URL}&state={secrets.token_urlsafe(16)}"
\ No newline at end of file
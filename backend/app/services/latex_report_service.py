@@ -27,6 +27,9 @@ from app.services.latex_templates.appendix_section import generate_appendix_sect
 
 logger = logging.getLogger(__name__)
 
+# Hotspot weight per severity (unknown severities count as 'low')
+HOTSPOT_SEVERITY_SCORES = {'critical': 10, 'high': 5, 'medium': 2, 'low': 1}
+
 class LaTeXReportService:
     """
     SecureThread OPS - Enterprise Reporting Engine v4.0
@@ -404,23 +407,18 @@ class LaTeXReportService:
     def _identify_security_hotspots(self, vulns: List[Vulnerability]) -> Dict[str, Any]:
         """Identify security hotspots (high-risk areas)"""
         
-        # File-based hotspots
+        # File- and directory-based hotspots in one pass
         file_scores = {}
+        dir_scores = {}
         for v in vulns:
+            severity_score = HOTSPOT_SEVERITY_SCORES.get(v.severity.lower() if v.severity else 'low', 1)
             file_path = v.file_path or "Unknown"
-            severity_score = {'critical': 10, 'high': 5, 'medium': 2, 'low': 1}.get(v.severity.lower() if v.severity else 'low', 1)
             file_scores[file_path] = file_scores.get(file_path, 0) + severity_score
-        
-        top_hotspot_files = dict(sorted(file_scores.items(), key=lambda x: x[1], reverse=True)[:10])
-        
-        # Directory-based hotspots
-        dir_scores = {}
-        for v in vulns:
             if v.file_path:
-                dir_path = '/'.join(v.file_path.split('/')[:-1]) or 'root'
-                severity_score = {'critical': 10, 'high': 5, 'medium': 2, 'low': 1}.get(v.severity.lower() if v.severity else 'low', 1)
+                dir_path = v.file_path.rpartition('/')[0] or 'root'
                 dir_scores[dir_path] = dir_scores.get(dir_path, 0) + severity_score
         
+        top_hotspot_files = dict(sorted(file_scores.items(), key=lambda x: x[1], reverse=True)[:10])
         top_hotspot_dirs = dict(sorted(dir_scores.items(), key=lambda x: x[1], reverse=True)[:5])
         
         return {
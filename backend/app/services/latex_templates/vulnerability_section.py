@@ -60,11 +60,17 @@ def generate_vulnerability_sections(doc, data):
         # GROUP VULNERABILITIES BY SEVERITY
         # =====================================================================
         
-        critical_vulns = [v for v in vulnerabilities if v['severity'] == 'critical']
-        high_vulns = [v for v in vulnerabilities if v['severity'] == 'high']
-        medium_vulns = [v for v in vulnerabilities if v['severity'] == 'medium']
-        low_vulns = [v for v in vulnerabilities if v['severity'] == 'low']
-        info_vulns = [v for v in vulnerabilities if v['severity'] == 'info']
+        by_severity = {'critical': [], 'high': [], 'medium': [], 'low': [], 'info': []}
+        for v in vulnerabilities:
+            bucket = by_severity.get(v['severity'])
+            if bucket is not None:
+                bucket.append(v)
+        
+        critical_vulns = by_severity['critical']
+        high_vulns = by_severity['high']
+        medium_vulns = by_severity['medium']
+        low_vulns = by_severity['low']
+        info_vulns = by_severity['info']
         
         # =====================================================================
         # CRITICAL SEVERITY SECTION
@@ -14,6 +14,7 @@ from datetime import datetime
 from pathlib import Path
 
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from openai import OpenAI
 
 from app.models.vulnerability import Scan, Vulnerability
@@ -221,30 +222,7 @@ If no vulnerabilities found, return: {{"vulnerabilities": []}}
         """Save a vulnerability to database"""
         try:
             vulnerability = Vulnerability(
-                scan_id=scan_id,
-                repository_id=repository_id,
-                detection_method='llm_based',
-                rule_id=None,
-                
-                title=vuln_data.get('title', 'Untitled Vulnerability'),
-                description=vuln_data.get('description', ''),
-                severity=vuln_data.get('severity', 'medium').lower(),
-                category=vuln_data.get('category', 'Unknown'),
-                cwe_id=vuln_data.get('cwe_id'),
-                owasp_category=vuln_data.get('owasp_category'),
-                
-                file_path=file_path,
-                line_number=vuln_data.get('line_number'),
-                line_end_number=vuln_data.get('line_end_number'),
-                code_snippet=vuln_data.get('code_snippet'),
-                
-                llm_explanation=vuln_data.get('explanation'),
-                llm_solution=vuln_data.get('solution'),
-                llm_code_example=vuln_data.get('code_example'),
-                confidence_score=vuln_data.get('confidence'),
-                
-                recommendation=vuln_data.get('solution', 'No recommendation provided'),
-                status='open'
+                **self._build_vulnerability_row(scan_id, repository_id, file_path, vuln_data)
             )
             
             self.db.add(vulnerability)
@@ -258,6 +236,77 @@ If no vulnerabilities found, return: {{"vulnerabilities": []}}
             self.db.rollback()
             return None
 
+    def save_vulnerabilities(
+        self,
+        scan_id: int,
+        repository_id: int,
+        file_path: str,
+        vulnerabilities: List[Dict]
+    ) -> List[Dict]:
+        """
+        Save all vulnerabilities found in one file with a single INSERT and commit.
+        If that fails they are retried one per transaction, so one bad row doesn't
+        lose the rest. Returns the rows that were saved.
+        """
+        try:
+            rows = [
+                self._build_vulnerability_row(scan_id, repository_id, file_path, vuln_data)
+                for vuln_data in vulnerabilities
+            ]
+            self.db.execute(insert(Vulnerability), rows)
+            self.db.commit()
+            return rows
+        except Exception as e:
+            logger.error(f"Error saving {len(vulnerabilities)} vulnerabilities for {file_path}, retrying one by one: {str(e)}")
+            self.db.rollback()
+        
+        saved_rows = []
+        for vuln_data in vulnerabilities:
+            try:
+                row = self._build_vulnerability_row(scan_id, repository_id, file_path, vuln_data)
+                self.db.execute(insert(Vulnerability), [row])
+                self.db.commit()
+                saved_rows.append(row)
+            except Exception as e:
+                logger.error(f"Error saving vulnerability: {str(e)}")
+                self.db.rollback()
+        return saved_rows
+    
+    def _build_vulnerability_row(
+        self,
+        scan_id: int,
+        repository_id: int,
+        file_path: str,
+        vuln_data: Dict
+    ) -> Dict:
+        """Map an LLM finding to a vulnerabilities table row"""
+        return {
+            'scan_id': scan_id,
+            'repository_id': repository_id,
+            'detection_method': 'llm_based',
+            'rule_id': None,
+            
+            'title': vuln_data.get('title', 'Untitled Vulnerability'),
+            'description': vuln_data.get('description', ''),
+            'severity': vuln_data.get('severity', 'medium').lower(),
+            'category': vuln_data.get('category', 'Unknown'),
+            'cwe_id': vuln_data.get('cwe_id'),
+            'owasp_category': vuln_data.get('owasp_category'),
+            
+            'file_path': file_path,
+            'line_number': vuln_data.get('line_number'),
+            'line_end_number': vuln_data.get('line_end_number'),
+            'code_snippet': vuln_data.get('code_snippet'),
+            
+            'llm_explanation': vuln_data.get('explanation'),
+            'llm_solution': vuln_data.get('solution'),
+            'llm_code_example': vuln_data.get('code_example'),
+            'confidence_score': vuln_data.get('confidence'),
+            
+            'recommendation': vuln_data.get('solution', 'No recommendation provided'),
+            'status': 'open'
+        }
+    
     def _fetch_llm_analysis_sync(self, repo_path: str, relative_file_path: str, priority: str) -> Tuple[str, List[Dict], int, int]:
         """Helper to run LLM analysis in a separate thread"""
         full_file_path = os.path.join(repo_path, relative_file_path)
@@ -368,17 +417,17 @@ If no vulnerabilities found, return: {{"vulnerabilities": []}}
                         if vulnerabilities:
                             logger.info(f"   ⚠️ Found {len(vulnerabilities)} vulnerabilities in {relative_path}")
                             
-                            for vuln_data in vulnerabilities:
-                                vuln = self.save_vulnerability(
-                                    scan_id, repository.id, relative_path, vuln_data
-                                )
-                                
-                                if vuln:
-                                    total_vulnerabilities += 1
-                                    severity = vuln.severity.lower()
-                                    if severity in severity_counts:
-                                        severity_counts[severity] += 1
-                                        logger.debug(f"   📌 {severity.upper()}: {vuln.title}")
+                            # One INSERT + commit per file instead of one per vulnerability
+                            saved_rows = self.save_vulnerabilities(
+                                scan_id, repository.id, relative_path, vulnerabilities
+                            )
+                            
+                            for row in saved_rows:
+                                total_vulnerabilities += 1
+                                severity = row['severity']
+                                if severity in severity_counts:
+                                    severity_counts[severity] += 1
+                                    logger.debug(f"   📌 {severity.upper()}: {row['title']}")
                                         
                         # Update progress incrementally
                         if scanned_count % 5 == 0 or scanned_count == total_files:
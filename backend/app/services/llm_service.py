@@ -222,6 +222,7 @@ Do not include any text outside the JSON array.
                 return []
             
             # Create enhancement prompt
+            file_content = self._build_code_context(file_content, vulnerabilities)
             prompt = self._create_vulnerability_enhancement_prompt(file_path, file_content, vulnerabilities)
             
             logger.info(f"🚀 Sending request to DeepSeek API...")
@@ -256,9 +257,8 @@ Do not include any text outside the JSON array.
         Use AI to enhance vulnerability explanations with context-aware details
         """
         try:
-            # Limit file content to avoid token exhaustion
-            if len(file_content) > 10000:
-                file_content = file_content[:10000] + "\n...  (truncated)"
+            # Only send the code around the findings to avoid token exhaustion
+            file_content = self._build_code_context(file_content, vulnerabilities[:5])
             
             # Create vulnerability summary
             vuln_summary = "\n".join([
@@ -296,24 +296,7 @@ Format your response as JSON:
                 # Try to parse JSON response
                 try:
                     result = json.loads(response)
-                    
-                    # Validate the response structure
-                    validated_result = {
-                        'explanation': result.get('explanation', '')[:2000],
-                        'fix_suggestion': result.get('fix_suggestion', '')[:2000],
-                        'best_practices': result.get('best_practices', [])
-                    }
-                    
-                    # Ensure best_practices is a list
-                    if not isinstance(validated_result['best_practices'], list):
-                        validated_result['best_practices'] = []
-                    else:
-                        # Limit each practice to reasonable length
-                        validated_result['best_practices'] = [
-                            str(practice)[:500] for practice in validated_result['best_practices'][:10]
-                        ]
-                    
-                    return validated_result
+                    return self._validate_explanation(result)
                     
                 except json.JSONDecodeError:
                     logger.warning("❌ Could not parse JSON from enhancement response, returning as plain text")
@@ -330,6 +313,162 @@ Format your response as JSON:
             logger.error(f"💥 Error enhancing vulnerability explanation: {e}", exc_info=True)
             return None
     
+    async def enhance_vulnerability_explanations_batch(
+        self,
+        contexts: List[Dict[str, Any]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Enhance several files' vulnerabilities with a single API call.
+
+        Each context is {'file_path', 'file_content', 'vulnerabilities'}. Returns one
+        result per context, in order (None where no explanation could be produced).
+        The instructions come first and are identical for every batch so the
+        provider can reuse its cached prompt prefix.
+        """
+        if not contexts:
+            return []
+        
+        if len(contexts) == 1:
+            context = contexts[0]
+            return [await self.enhance_vulnerability_explanation(
+                context['file_content'], context['file_path'], context['vulnerabilities']
+            )]
+        
+        try:
+            file_sections = []
+            for i, context in enumerate(contexts):
+                file_content = self._build_code_context(
+                    context.get('file_content', ''), context.get('vulnerabilities', [])[:5]
+                )
+                
+                vuln_summary = "\n".join([
+                    f"- {v['severity'].upper()}: {v['title']} at line {v.get('line_number', '?')}"
+                    for v in context.get('vulnerabilities', [])[:5]  # Limit to 5 vulnerabilities
+                ])
+                
+                file_sections.append(f"""=== FILE {i + 1}: {context.get('file_path', '')} ===
+
+Detected Issues:
+{vuln_summary}
+
+Code:
+{file_content}""")
+            
+            prompt = f"""You are a security expert. Analyze each file below and provide detailed explanations for its detected vulnerabilities.
+
+For each file, provide:
+1. A clear explanation of why its issues are dangerous
+2. Specific fix recommendations with code examples
+3. Best practices to prevent similar issues
+
+Format your response as a JSON array with exactly one object per file, in the same order as the files:
+[
+    {{
+        "explanation": "Detailed explanation of the security issues...",
+        "fix_suggestion": "Specific steps to fix with code examples...",
+        "best_practices": ["Practice 1", "Practice 2", ...]
+    }}
+]
+
+{chr(10).join(file_sections)}"""
+
+            logger.info(f"🚀 Sending batched explanation enhancement request for {len(contexts)} files")
+            response = await self._call_deepseek_api(prompt, max_tokens=min(8000, 2000 * len(contexts)))
+            
+            if response:
+                json_start = response.find('[')
+                json_end = response.rfind(']') + 1
+                if json_start >= 0 and json_end > json_start:
+                    try:
+                        results = json.loads(response[json_start:json_end])
+                        if isinstance(results, list) and len(results) == len(contexts):
+                            logger.info(f"✅ Received batched explanation enhancement for {len(results)} files")
+                            return [
+                                self._validate_explanation(result) if isinstance(result, dict) else None
+                                for result in results
+                            ]
+                    except json.JSONDecodeError:
+                        pass
+            
+            logger.warning("❌ Could not parse batched enhancement response, falling back to per-file requests")
+            
+        except Exception as e:
+            logger.error(f"💥 Error in batched vulnerability explanation: {e}", exc_info=True)
+        
+        return [
+            await self.enhance_vulnerability_explanation(
+                context['file_content'], context['file_path'], context['vulnerabilities']
+            )
+            for context in contexts
+        ]
+    
+    def _build_code_context(
+        self,
+        file_content: str,
+        vulnerabilities: List[Dict[str, Any]],
+        context_lines: int = 30,
+        max_chars: int = 8000
+    ) -> str:
+        """
+        Cut the file down to the lines around each vulnerability (±context_lines),
+        merging overlapping windows. Falls back to the head of the file when no
+        line numbers are known. Capped at max_chars (~2000 tokens).
+        """
+        line_numbers = sorted({
+            v['line_number'] for v in vulnerabilities
+            if isinstance(v.get('line_number'), int) and v['line_number'] > 0
+        })
+        
+        if not line_numbers:
+            if len(file_content) > max_chars:
+                return file_content[:max_chars] + "\n...  (truncated)"
+            return file_content
+        
+        lines = file_content.split('\n')
+        
+        # Merge overlapping inclusive [start, end] windows (1-based line numbers)
+        windows = []
+        for line_number in line_numbers:
+            start = max(1, line_number - context_lines)
+            end = min(len(lines), line_number + context_lines)
+            if windows and start <= windows[-1][1] + 1:
+                windows[-1][1] = max(windows[-1][1], end)
+            else:
+                windows.append([start, end])
+        
+        sections = []
+        total_chars = 0
+        for start, end in windows:
+            section = f"// lines {start}-{end}\n" + "\n".join(lines[start - 1:end])
+            if total_chars + len(section) > max_chars:
+                remaining = max_chars - total_chars
+                if remaining > 0:
+                    sections.append(section[:remaining] + "\n...  (truncated)")
+                break
+            sections.append(section)
+            total_chars += len(section)
+        
+        return "\n---\n".join(sections)
+    
+    def _validate_explanation(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate an explanation enhancement object"""
+        validated_result = {
+            'explanation': str(result.get('explanation', ''))[:2000],
+            'fix_suggestion': str(result.get('fix_suggestion', ''))[:2000],
+            'best_practices': result.get('best_practices', [])
+        }
+        
+        # Ensure best_practices is a list
+        if not isinstance(validated_result['best_practices'], list):
+            validated_result['best_practices'] = []
+        else:
+            # Limit each practice to reasonable length
+            validated_result['best_practices'] = [
+                str(practice)[:500] for practice in validated_result['best_practices'][:10]
+            ]
+        
+        return validated_result
+    
     def _create_vulnerability_enhancement_prompt(
         self, 
         file_path: str, 
@@ -356,7 +495,8 @@ SECURITY ANALYSIS REQUEST:
 
 File: {file_path}
 
-Code Context (first 4000 chars):{file_content}
+Code Context:
+{file_content}
 
 DETECTED VULNERABILITIES (from security rules):
 {vulnerabilities_text}
@@ -2,6 +2,7 @@ import re
 import json
 import logging
 import math
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
@@ -13,6 +14,29 @@ from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+# Estimated hours to fix one vulnerability, by severity (anything else: 2h)
+SEVERITY_FIX_HOURS = {'critical': 16, 'high': 8, 'medium': 4, 'low': 1}
+
+# Risk multiplier applied to severity weights, by repository language (default 1.0)
+LANGUAGE_RISK_MULTIPLIERS = {
+    'php': 1.3,
+    'javascript': 1.25,
+    'python': 1.1,
+    'java': 1.15,
+    'c': 1.4,
+    'c++': 1.4,
+    'ruby': 1.2,
+    'go': 0.95,
+    'rust': 0.85,
+    'typescript': 1.15,
+    'swift': 0.9,
+    'kotlin': 1.0,
+    'c#': 1.05,
+    'scala': 1.1,
+    'shell': 1.35,
+    'powershell': 1.35,
+}
+
 class MetricsService:
     """Advanced metrics calculation service"""
     
@@ -391,26 +415,7 @@ class MetricsService:
 
     def _get_language_risk_multiplier(self, language: str) -> float:
         """Get dynamic risk multiplier based on language characteristics"""
-        language_risks = {
-            'php': 1.3,
-            'javascript': 1.25,
-            'python': 1.1,
-            'java': 1.15,
-            'c': 1.4,
-            'c++': 1.4,
-            'ruby': 1.2,
-            'go': 0.95,
-            'rust': 0.85,
-            'typescript': 1.15,
-            'swift': 0.9,
-            'kotlin': 1.0,
-            'c#': 1.05,
-            'scala': 1.1,
-            'shell': 1.35,
-            'powershell': 1.35,
-        }
-        
-        return language_risks.get(language, 1.0)
+        return LANGUAGE_RISK_MULTIPLIERS.get(language, 1.0)
 
     def _get_historical_adjustment(self, current_scan: Scan) -> float:
         """Get historical context adjustment based on previous scans"""
@@ -584,10 +589,8 @@ class MetricsService:
             logger.info(f"- No latest scans found, vulnerabilities: 0")
         
         # Technical debt calculation (hours to fix)
-        debt_hours = 0
-        for vuln in vulnerabilities:
-            severity_hours = {'critical': 16, 'high': 8, 'medium': 4, 'low': 1}
-            debt_hours += severity_hours.get(vuln.severity.lower(), 2)
+        severity_counts = Counter(vuln.severity.lower() for vuln in vulnerabilities)
+        debt_hours = sum(SEVERITY_FIX_HOURS.get(severity, 2) * count for severity, count in severity_counts.items())
         
         # Code coverage from latest scans
         coverage_scores = [scan.code_coverage for scan in latest_scans if scan.code_coverage]
@@ -851,8 +854,9 @@ class MetricsService:
             }
         
         # Overall compliance scores
-        total_critical = len([v for v in vulnerabilities if v.severity == 'critical'])
-        total_high = len([v for v in vulnerabilities if v.severity == 'high'])
+        severity_counts = Counter(v.severity for v in vulnerabilities)
+        total_critical = severity_counts['critical']
+        total_high = severity_counts['high']
         
         compliance_scores = {
             'owasp_top10': round(sum(c['compliance_score'] for c in owasp_coverage.values()) / len(owasp_coverage), 1),
@@ -988,7 +992,7 @@ class MetricsService:
         """Generate compliance recommendations"""
         recommendations = []
         
-        critical_count = len([v for v in vulnerabilities if v.severity == 'critical'])
+        critical_count = sum(1 for v in vulnerabilities if v.severity == 'critical')
         if critical_count > 0:
             recommendations.append(f"Address {critical_count} critical vulnerabilities immediately for compliance")
         
@@ -3,11 +3,23 @@ Rule Parser Service - Convert YARA-style rules to executable Python regex patter
 """
 import re
 import logging
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Union
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Static regexes used to pull rules apart, compiled once at import
+STRINGS_SECTION_RE = re.compile(r'strings:\s*\n(.*?)(?:condition:|$)', re.DOTALL)
+CONDITION_SECTION_RE = re.compile(r'condition:\s*\n(.*?)(?:$)', re.DOTALL)
+META_SECTION_RE = re.compile(r'meta:\s*\n(.*?)(?:strings:|condition:|$)', re.DOTALL)
+N_OF_THEM_RE = re.compile(r"(\d+)\s+of\s+them")
+REGEX_LITERAL_RE = re.compile(r'/(.*?)/([a-z]*)')
+DOUBLE_QUOTED_RE = re.compile(r'"([^"]*)"')
+SINGLE_QUOTED_RE = re.compile(r"'([^']*)'")
+SIMPLE_CONDITION_RE = re.compile(r"(any|all|\d+)\s+of\s+them")
+CONDITION_TOKEN_RE = re.compile(r"\s*(?:(\$\w*\*?)|(\d+)|([a-z]+)|([(),]))")
+
 
 class PatternType(Enum):
     """Types of patterns we support"""
@@ -22,8 +34,52 @@ class RuleParser:
     Converts YARA-style syntax to Python-compatible regex patterns
     """
     
+    PARSED_RULE_CACHE_SIZE = 1024
+    
     def __init__(self):
         self.valid_patterns_cache = {}
+        # rule_content -> parsed rule; rule text is immutable input, so entries never go stale
+        self.parsed_rule_cache: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+    
+    def parse_rule(self, rule_content: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a rule once: compiled patterns, metadata and condition.
+        Results are memoized by rule text, so repeated scans with the same
+        rules skip re-parsing and re-compiling.
+        
+        Returns: {patterns, meta, condition} or None if no pattern compiles
+        """
+        if rule_content in self.parsed_rule_cache:
+            self.parsed_rule_cache.move_to_end(rule_content)
+            parsed = self.parsed_rule_cache[rule_content]
+        else:
+            parsed = None
+            compiled_patterns = []
+            for p in self.parse_yara_rule(rule_content):
+                compiled = self.compile_pattern(p)
+                if compiled:
+                    compiled_patterns.append({**p, "compiled": compiled})
+            
+            if compiled_patterns:
+                parsed = {
+                    'patterns': compiled_patterns,
+                    'meta': self.extract_metadata(rule_content),
+                    'condition': self.parse_condition(rule_content),
+                }
+            
+            self.parsed_rule_cache[rule_content] = parsed
+            if len(self.parsed_rule_cache) > self.PARSED_RULE_CACHE_SIZE:
+                self.parsed_rule_cache.popitem(last=False)
+        
+        if parsed is None:
+            return None
+        
+        # Callers get their own containers; the compiled patterns are shared
+        return {
+            'patterns': [dict(p) for p in parsed['patterns']],
+            'meta': dict(parsed['meta']),
+            'condition': dict(parsed['condition']),
+        }
     
     def parse_yara_rule(self, rule_content: str) -> List[Dict[str, Any]]:
         """
@@ -35,7 +91,7 @@ class RuleParser:
         
         try:
             # Extract strings section from YARA rule
-            strings_match = re.search(r'strings:\s*\n(.*?)(?:condition:|$)', rule_content, re.DOTALL)
+            strings_match = STRINGS_SECTION_RE.search(rule_content)
             
             if not strings_match:
                 logger.warning("No strings section found in rule")
@@ -105,23 +161,33 @@ class RuleParser:
 
     def parse_condition(self, rule_content: str) -> Dict[str, Any]:
         """
-        Parse a minimal subset of YARA condition:
+        Parse a subset of YARA condition:
           - any of them
           - all of them
           - N of them   (e.g., '2 of them')
+          - boolean expressions over $vars and 'any/all/N of (...)' with and/or/not
+            and parentheses, parsed once into a tuple tree (type 'expression')
         Defaults to 'any'.
         """
         try:
-            cond_match = re.search(r'condition:\s*\n(.*?)(?:$)', rule_content, re.DOTALL)
+            cond_match = CONDITION_SECTION_RE.search(rule_content)
             if not cond_match:
                 return {"type": "any", "n": None}
 
             cond = cond_match.group(1).strip().lower()
 
+            simple = SIMPLE_CONDITION_RE.fullmatch(cond.rstrip('}').strip())
+            if not simple:
+                try:
+                    expr = _ConditionExpressionParser(cond).parse()
+                    return {"type": "expression", "n": None, "expr": expr}
+                except ValueError as e:
+                    logger.debug(f"Condition not parsed as an expression ({e}), using keyword match")
+
             if "all of them" in cond:
                 return {"type": "all", "n": None}
 
-            m = re.search(r"(\d+)\s+of\s+them", cond)
+            m = N_OF_THEM_RE.search(cond)
             if m:
                 return {"type": "n_of_them", "n": int(m.group(1))}
 
@@ -136,7 +202,7 @@ class RuleParser:
         """
         try:
             # Extract pattern between slashes
-            regex_match = re.match(r'/(.*?)/([a-z]*)', pattern_part)
+            regex_match = REGEX_LITERAL_RE.match(pattern_part)
             
             if not regex_match:
                 logger.warning(f"Invalid regex format for {var_name}")
@@ -154,9 +220,9 @@ class RuleParser:
             if 's' in modifiers:
                 flags |= re.DOTALL
             
-            # Validate the pattern compiles
+            # Validate the pattern compiles (and keep the result)
             try:
-                re.compile(pattern, flags)
+                compiled = re.compile(pattern, flags)
             except re.error as e:
                 logger.warning(f"Invalid regex pattern for {var_name}: {e}")
                 return None
@@ -167,7 +233,7 @@ class RuleParser:
                 'type': PatternType.REGEX.value,
                 'flags': flags,
                 'modifiers': modifiers,
-                'compiled': None  # Will compile when needed
+                'compiled': compiled
             }
             
         except Exception as e:
@@ -181,9 +247,9 @@ class RuleParser:
         try:
             # Extract string content
             if pattern_part.startswith('"'):
-                string_match = re.match(r'"([^"]*)"', pattern_part)
+                string_match = DOUBLE_QUOTED_RE.match(pattern_part)
             else:
-                string_match = re.match(r"'([^']*)'", pattern_part)
+                string_match = SINGLE_QUOTED_RE.match(pattern_part)
             
             if not string_match:
                 return None
@@ -202,6 +268,7 @@ class RuleParser:
             return {
                 'variable': var_name,
                 'pattern': escaped_pattern,
+                'literal': literal_string,  # lets scanners use plain substring search
                 'type': PatternType.STRING.value,
                 'flags': flags,
                 'modifiers': 'nocase' if case_insensitive else '',
@@ -216,6 +283,10 @@ class RuleParser:
         """
         Compile a pattern dictionary into a regex pattern object
         """
+        # Already compiled (parse_rule results, repeated match_content calls)
+        if isinstance(pattern_dict.get('compiled'), re.Pattern):
+            return pattern_dict['compiled']
+        
         try:
             pattern = pattern_dict['pattern']
             flags = pattern_dict.get('flags', 0)
@@ -261,7 +332,18 @@ class RuleParser:
                     compilation_errors.append(f"Pattern {pattern_dict['variable']} failed to compile")
             
             errors.extend(compilation_errors)
-            
+
+            # The scanner reports a finding at the first matched string, so a condition that holds
+            # with no string matched (e.g. 'not $a' on its own) could never produce one
+            condition = self.parse_condition(rule_content)
+            if patterns and condition["type"] == "expression" and evaluate_condition(
+                condition["expr"], set(), [p['variable'].lower() for p in patterns]
+            ):
+                errors.append(
+                    "Condition is true when no string matches (e.g. only negations like 'not $a'); "
+                    "it must require at least one string, e.g. '$a and not $b'"
+                )
+
             return {
                 'valid': len(errors) == 0,
                 'errors': errors,
@@ -295,7 +377,7 @@ class RuleParser:
         
         try:
             # Extract meta section
-            meta_match = re.search(r'meta:\s*\n(.*?)(?:strings:|condition:|$)', rule_content, re.DOTALL)
+            meta_match = META_SECTION_RE.search(rule_content)
             
             if meta_match:
                 meta_section = meta_match.group(1)
@@ -340,15 +422,19 @@ class RuleParser:
             if not compiled:
                 continue
             
-            pattern_matches = compiled.finditer(content)
-            for match in pattern_matches:
+            # finditer yields matches in order, so count newlines incrementally
+            line_num = 1
+            last_pos = 0
+            for match in compiled.finditer(content):
+                line_num += content.count('\n', last_pos, match.start())
+                last_pos = match.start()
                 matches.append({
                     'variable': pattern_dict['variable'],
                     'type': pattern_dict['type'],
                     'match': match.group(),
                     'start': match.start(),
                     'end': match.end(),
-                    'line': content[:match.start()].count('\n') + 1
+                    'line': line_num
                 })
         
         return matches
@@ -379,5 +465,134 @@ class RuleParser:
         }
 
 
+class _ConditionExpressionParser:
+    """
+    Recursive-descent parser for boolean YARA conditions, e.g.
+    '$a and ($b or 2 of ($c*))' or 'any of them and not $x'.
+    Precedence: not > and > or. Produces a tuple tree:
+      ('var', '$a'), ('not', x), ('and', x, y), ('or', x, y),
+      ('of', 'any' | 'all' | N, None for them / tuple of '$name' or '$prefix*')
+    """
+
+    def __init__(self, text: str):
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        tokens = []
+        pos = 0
+        text = text.rstrip().rstrip('}').rstrip()  # condition section runs to the rule's closing brace
+        while pos < len(text):
+            m = CONDITION_TOKEN_RE.match(text, pos)
+            if not m:
+                if text[pos:].strip():
+                    raise ValueError(f"Unexpected condition text: {text[pos:pos + 20]!r}")
+                break
+            tokens.append(m.group(m.lastindex))
+            pos = m.end()
+        return tokens
+
+    def parse(self) -> tuple:
+        expr = self._parse_or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected token {self.tokens[self.pos]!r}")
+        return expr
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _take(self, expected: Optional[str] = None) -> str:
+        token = self._peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(f"Expected {expected or 'more input'}, got {token!r}")
+        self.pos += 1
+        return token
+
+    def _parse_or(self) -> tuple:
+        expr = self._parse_and()
+        while self._peek() == 'or':
+            self._take()
+            expr = ('or', expr, self._parse_and())
+        return expr
+
+    def _parse_and(self) -> tuple:
+        expr = self._parse_not()
+        while self._peek() == 'and':
+            self._take()
+            expr = ('and', expr, self._parse_not())
+        return expr
+
+    def _parse_not(self) -> tuple:
+        if self._peek() == 'not':
+            self._take()
+            return ('not', self._parse_not())
+        return self._parse_primary()
+
+    def _parse_primary(self) -> tuple:
+        token = self._take()
+        if token == '(':
+            expr = self._parse_or()
+            self._take(')')
+            return expr
+        if token.startswith('$'):
+            return ('var', token)
+        if token in ('any', 'all') or token.isdigit():
+            quantifier = int(token) if token.isdigit() else token
+            self._take('of')
+            if self._peek() == 'them':
+                self._take()
+                return ('of', quantifier, None)
+            self._take('(')
+            selectors = [self._take()]
+            while self._peek() == ',':
+                self._take()
+                selectors.append(self._take())
+            self._take(')')
+            if not all(selector.startswith('$') for selector in selectors):
+                raise ValueError("String sets may only contain $variables")
+            return ('of', quantifier, tuple(selectors))
+        raise ValueError(f"Unexpected token {token!r}")
+
+
+def _select_variables(selectors: Optional[tuple], variables: List[str]) -> List[str]:
+    if selectors is None:
+        return variables
+    selected = []
+    for variable in variables:
+        for selector in selectors:
+            if variable == selector or (selector.endswith('*') and variable.startswith(selector[:-1])):
+                selected.append(variable)
+                break
+    return selected
+
+
+def evaluate_condition(expr: tuple, hit_variables: set, variables: List[str]) -> bool:
+    """
+    Evaluate a parsed condition expression for one file.
+    hit_variables: lower-cased names of the strings that matched
+    variables: lower-cased names of all strings in the rule
+    """
+    op = expr[0]
+    if op == 'var':
+        return expr[1] in hit_variables
+    if op == 'and':
+        return evaluate_condition(expr[1], hit_variables, variables) and evaluate_condition(expr[2], hit_variables, variables)
+    if op == 'or':
+        return evaluate_condition(expr[1], hit_variables, variables) or evaluate_condition(expr[2], hit_variables, variables)
+    if op == 'not':
+        return not evaluate_condition(expr[1], hit_variables, variables)
+
+    # ('of', quantifier, selectors)
+    selected = _select_variables(expr[2], variables)
+    hits = sum(1 for variable in selected if variable in hit_variables)
+    quantifier = expr[1]
+    if quantifier == 'any':
+        return hits >= 1
+    if quantifier == 'all':
+        return bool(selected) and hits == len(selected)
+    return hits >= quantifier
+
+
 # Singleton instance
 rule_parser = RuleParser()
\ No newline at end of file
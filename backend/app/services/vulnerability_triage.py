@@ -8,10 +8,17 @@ Goal:
 """
 from __future__ import annotations
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Any, Optional, Tuple
 import re
 
 
+@lru_cache(maxsize=None)
+def _needles_re(needles: Tuple[str, ...]) -> re.Pattern:
+    """Case-insensitive alternation of the needles, compiled once per hint tuple."""
+    return re.compile("|".join(map(re.escape, needles)), re.IGNORECASE)
+
+
 @dataclass
 class TriageDecision:
     should_report: bool
@@ -39,6 +46,15 @@ class VulnerabilityTriage:
         "left", "top", "transform", "transition", "framer", "motion", "style"
     )
 
+    # path hints with either separator, so paths need no normalising copy
+    FRONTEND_PATH_RE = re.compile(
+        "|".join(re.escape(hint).replace("/", r"[/\\]") for hint in FRONTEND_PATH_HINTS),
+        re.IGNORECASE,
+    )
+
+    # "@app.put(" / "@router.delete(" style route decorators
+    PUT_DELETE_ROUTE_RE = re.compile(r"@\s*(app|router)\.(put|delete)\s*\(")
+
     def decide(
         self,
         *,
@@ -70,7 +86,7 @@ class VulnerabilityTriage:
         # If rule says idempotency not enforced but only evidence is method decorator, suppress.
         if category in ("api_security", "api") and "idempotency" in title:
             # If the snippet is basically "@app.put(" or "@router.put(" etc => design-level, not vuln
-            if re.search(r"@\s*(app|router)\.(put|delete)\s*\(", context_snippet):
+            if self.PUT_DELETE_ROUTE_RE.search(context_snippet):
                 return TriageDecision(
                     should_report=False,
                     reason="Suppressed: PUT/DELETE presence alone is not a security vulnerability.",
@@ -93,9 +109,14 @@ class VulnerabilityTriage:
         return TriageDecision(True, "Reported: no triage suppression rule triggered.", "medium")
 
     def _looks_like_frontend(self, file_path: str) -> bool:
-        fp = file_path.replace("\\", "/").lower()
-        return any(hint in fp for hint in self.FRONTEND_PATH_HINTS)
+        return _path_looks_like_frontend(file_path)
 
     def _contains_any(self, text: str, needles: Tuple[str, ...] | list[str]) -> bool:
-        t = (text or "").lower()
-        return any(n.lower() in t for n in needles)
\ No newline at end of file
+        # one scan of the text instead of a lowered copy plus a pass per needle
+        return _needles_re(tuple(needles)).search(text or "") is not None
+
+
+@lru_cache(maxsize=4096)
+def _path_looks_like_frontend(file_path: str) -> bool:
+    """Path-only check, cached: every match in a file asks about the same path."""
+    return VulnerabilityTriage.FRONTEND_PATH_RE.search(file_path) is not None